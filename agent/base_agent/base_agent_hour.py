@@ -4,7 +4,6 @@ Extends BaseAgent with hour-level specific functionality
 """
 
 import os
-import json
 import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
@@ -20,7 +19,9 @@ import sys
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
-from tools.general_tools import extract_conversation, extract_tool_messages, get_config_value, write_config_value
+from tools.general_tools import DeadlineExceeded, extract_conversation, extract_tool_messages, get_config_value, write_config_value
+from tools.json_codec import decode_price_doc
+from tools.ledger_tools import get_ledger_index
 from tools.price_tools import add_no_trade_record
 from prompts.agent_prompt import get_agent_system_prompt, STOP_SIGNAL
 
@@ -104,6 +105,10 @@ class BaseAgent_Hour(BaseAgent):
                 self._log_message(log_file, new_messages[0])
                 self._log_message(log_file, new_messages[1])
                 
+            except DeadlineExceeded as e:
+                print(f"⏰ {e}, ending trading session after {current_step - 1} completed steps")
+                break
+
             except Exception as e:
                 print(f"❌ Trading session error: {str(e)}")
                 print(f"Error details: {e}")
@@ -150,7 +155,7 @@ class BaseAgent_Hour(BaseAgent):
                 if not line.strip():
                     continue
                 try:
-                    doc = json.loads(line)
+                    doc = decode_price_doc(line)
                     # 查找所有以 "Time Series" 开头的键
                     for key, value in doc.items():
                         if key.startswith("Time Series"):
@@ -167,27 +172,9 @@ class BaseAgent_Hour(BaseAgent):
         
         last_processed_dt = None
         if os.path.exists(self.position_file):
-            max_date = None
-            with open(self.position_file, "r") as f:
-                for line in f:
-                    doc = json.loads(line)
-                    current_date = doc['date']
-                    if max_date is None:
-                        max_date = current_date
-                    else:
-                        if ' ' in current_date:
-                            current_date_obj = datetime.strptime(current_date, "%Y-%m-%d %H:%M:%S")
-                        else:
-                            current_date_obj = datetime.strptime(current_date, "%Y-%m-%d")
-                        
-                        if ' ' in max_date:
-                            max_date_obj = datetime.strptime(max_date, "%Y-%m-%d %H:%M:%S")
-                        else:
-                            max_date_obj = datetime.strptime(max_date, "%Y-%m-%d")
-                        
-                        if current_date_obj > max_date_obj:
-                            max_date = current_date
-            
+            # Latest date from the ledger's date index (ISO timestamps sort chronologically)
+            max_date = get_ledger_index(self.position_file).max_key()
+
             if max_date:
                 if has_time:
                     last_processed_dt = datetime.strptime(max_date, "%Y-%m-%d %H:%M:%S")
@@ -260,7 +247,7 @@ class BaseAgent_Hour(BaseAgent):
         for date in trading_dates:
             print(f"🔄 Processing {self.signature} - Date: {date}")
             
-            # Set configuration
+            # Set configuration (runtime env file, for tool servers that do not read session headers)
             write_config_value("TODAY_DATE", date)
             write_config_value("SIGNATURE", self.signature)
             
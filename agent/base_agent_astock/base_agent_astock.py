@@ -9,6 +9,8 @@ import json
 import os
 # Import project tools
 import sys
+import time
+from contextlib import AsyncExitStack
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -18,6 +20,7 @@ from langchain.agents import create_agent
 from langchain_core.messages import AIMessage
 from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
 from langchain_openai import ChatOpenAI
 
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -84,8 +87,12 @@ class DeepSeekChatOpenAI(ChatOpenAI):
 
 from prompts.agent_prompt_astock import (STOP_SIGNAL,
                                          get_agent_system_prompt_astock)
-from tools.general_tools import (extract_conversation, extract_tool_messages,
-                                 get_config_value, write_config_value)
+from tools.general_tools import (DeadlineExceeded, deadline_remaining,
+                                 extract_conversation, extract_tool_messages,
+                                 get_config_value, session_headers,
+                                 session_scope, write_config_value)
+from tools.json_codec import dumps
+from tools.ledger_tools import get_ledger_index, make_position_record
 from tools.price_tools import add_no_trade_record
 
 # Load environment variables
@@ -174,6 +181,9 @@ class BaseAgentAStock:
         initial_cash: float = 100000.0,  # 默认10万人民币
         init_date: str = "2025-10-09",
         market: str = "cn",  # 接受但忽略此参数，始终使用"cn"
+        mcp_transport: str = "http",
+        session_timeout: Optional[float] = None,
+        step_timeout: Optional[float] = None,
     ):
         """
         Initialize BaseAgentAStock
@@ -192,6 +202,11 @@ class BaseAgentAStock:
             initial_cash: Initial cash amount (default: 100000.0 RMB)
             init_date: Initialization date
             market: Market type (accepted for compatibility, but always uses "cn")
+            mcp_transport: How tools are reached: "http" (separate tool servers), "tool_host"
+                (combined tool host over HTTP) or "in_process" (combined tool host in this process)
+            session_timeout: Wall-clock budget in seconds for one trading date, retries included;
+                tools and their outbound requests see it as the session's DEADLINE
+            step_timeout: Time limit in seconds for one agent step (model call plus tool calls)
         """
         self.signature = signature
         self.basemodel = basemodel
@@ -206,10 +221,13 @@ class BaseAgentAStock:
         self.max_steps = max_steps
         self.max_retries = max_retries
         self.base_delay = base_delay
+        self.session_timeout = session_timeout
+        self.step_timeout = step_timeout
         self.initial_cash = initial_cash
         self.init_date = init_date
 
         # Set MCP configuration
+        self.mcp_transport = mcp_transport
         self.mcp_config = mcp_config or self._get_default_mcp_config()
 
         # Set log path - A股专用路径
@@ -237,6 +255,14 @@ class BaseAgentAStock:
 
     def _get_default_mcp_config(self) -> Dict[str, Dict[str, Any]]:
         """Get default MCP configuration"""
+        if self.mcp_transport == "tool_host":
+            # All tools on one port, see agent_tools/tool_host.py
+            return {
+                "tools": {
+                    "transport": "streamable_http",
+                    "url": f"http://localhost:{os.getenv('TOOL_HOST_HTTP_PORT', '8010')}/mcp",
+                },
+            }
         return {
             "math": {
                 "transport": "streamable_http",
@@ -269,11 +295,9 @@ class BaseAgentAStock:
             print("⚠️  OpenAI base URL not set, using default")
 
         try:
-            # Create MCP client
-            self.client = MultiServerMCPClient(self.mcp_config)
-
-            # Get tools
-            self.tools = await self.client.get_tools()
+            # Load tools once to check they are reachable, each session reloads them
+            async with AsyncExitStack() as stack:
+                await self._load_session_tools({}, stack)
             if not self.tools:
                 print("⚠️  Warning: No MCP tools loaded. MCP services may not be running.")
                 print(f"   MCP configuration: {self.mcp_config}")
@@ -324,18 +348,38 @@ class BaseAgentAStock:
         """Log messages to log file"""
         log_entry = {"timestamp": datetime.now().isoformat(), "signature": self.signature, "new_messages": new_messages}
         with open(log_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+            f.write(dumps(log_entry) + "\n")
+
+    def _step_time_limit(self) -> Optional[float]:
+        """Time limit of the next agent step: step_timeout, capped by the time left before the session deadline"""
+        remaining = deadline_remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("Session deadline reached")
+        limits = [limit for limit in (self.step_timeout, remaining) if limit is not None]
+        return min(limits) if limits else None
 
     async def _ainvoke_with_retry(self, message: List[Dict[str, str]]) -> Any:
-        """Agent invocation with retry"""
+        """Agent invocation with retry, each attempt bounded by the step and session time limits"""
         for attempt in range(1, self.max_retries + 1):
+            time_limit = self._step_time_limit()
             try:
-                return await self.agent.ainvoke({"messages": message}, {"recursion_limit": 100})
+                return await asyncio.wait_for(
+                    self.agent.ainvoke({"messages": message}, {"recursion_limit": 100}), timeout=time_limit
+                )
             except Exception as e:
+                # Only wait_for's own timeout is reworded; without a time limit any TimeoutError
+                # (also asyncio.TimeoutError on Python 3.11+) comes from the agent and is kept as is
+                timed_out = time_limit is not None and isinstance(e, asyncio.TimeoutError)
+                error = f"Agent step timed out after {time_limit:.1f}s" if timed_out else e
                 if attempt == self.max_retries:
-                    raise e
+                    if timed_out:
+                        raise TimeoutError(error) from e
+                    raise
+                remaining = deadline_remaining()
+                if remaining is not None and remaining <= self.base_delay * attempt:
+                    raise DeadlineExceeded("Session deadline reached, not retrying the agent step") from e
                 print(f"⚠️ Attempt {attempt} failed, retrying after {self.base_delay * attempt} seconds...")
-                print(f"Error details: {e}")
+                print(f"Error details: {error}")
                 await asyncio.sleep(self.base_delay * attempt)
 
     async def run_trading_session(self, today_date: str) -> None:
@@ -401,6 +445,10 @@ class BaseAgentAStock:
                 self._log_message(log_file, new_messages[0])
                 self._log_message(log_file, new_messages[1])
 
+            except DeadlineExceeded as e:
+                print(f"⏰ {e}, ending trading session after {current_step - 1} completed steps")
+                break
+
             except Exception as e:
                 print(f"❌ Trading session error: {str(e)}")
                 print(f"Error details: {e}")
@@ -411,7 +459,8 @@ class BaseAgentAStock:
 
     async def _handle_trading_result(self, today_date: str) -> None:
         """Handle trading results"""
-        if_trade = get_config_value("IF_TRADE")
+        # Tool servers in other processes cannot set the session's IF_TRADE; their trades show up in the ledger
+        if_trade = get_config_value("IF_TRADE") or self._has_ledger_record(today_date)
         if if_trade:
             write_config_value("IF_TRADE", False)
             print("✅ Trading completed")
@@ -438,11 +487,11 @@ class BaseAgentAStock:
             print(f"📁 Created position directory: {position_dir}")
 
         # Create initial positions
-        init_position = {symbol: 0 for symbol in self.stock_symbols}
-        init_position["CASH"] = self.initial_cash
+        # Sparse positions: only non-zero holdings plus CASH are stored
+        init_position = {"CASH": self.initial_cash}
 
         with open(self.position_file, "w") as f:  # Use "w" mode to ensure creating new file
-            f.write(json.dumps({"date": self.init_date, "id": 0, "positions": init_position}) + "\n")
+            f.write(dumps(make_position_record(self.init_date, 0, init_position)) + "\n")
 
         print(f"✅ A-shares agent {self.signature} registration completed")
         print(f"📁 Position file: {self.position_file}")
@@ -469,18 +518,8 @@ class BaseAgentAStock:
             self.register_agent()
             max_date = init_date
         else:
-            # Read existing position file, find latest date
-            with open(self.position_file, "r") as f:
-                for line in f:
-                    doc = json.loads(line)
-                    current_date = doc["date"]
-                    if max_date is None:
-                        max_date = current_date
-                    else:
-                        current_date_obj = datetime.strptime(current_date, "%Y-%m-%d")
-                        max_date_obj = datetime.strptime(max_date, "%Y-%m-%d")
-                        if current_date_obj > max_date_obj:
-                            max_date = current_date
+            # Latest date from the ledger's date index (ISO dates sort chronologically)
+            max_date = get_ledger_index(self.position_file).max_key()
 
         # Check if new dates need to be processed
         max_date_obj = datetime.strptime(max_date, "%Y-%m-%d")
@@ -502,12 +541,55 @@ class BaseAgentAStock:
 
         return trading_dates
 
+    def _get_session_config(self, today_date: str, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Session state for one trading session, shared with the tools through session_scope"""
+        return {
+            "SIGNATURE": self.signature,
+            "TODAY_DATE": today_date,
+            "MARKET": self.market,
+            "LOG_PATH": self.base_log_path,
+            "IF_TRADE": False,
+            "DEADLINE": deadline,
+        }
+
+    async def _load_session_tools(self, session: Dict[str, Any], stack: AsyncExitStack) -> None:
+        """Load MCP tools bound to a session, connections stay open until the stack is closed"""
+        if self.mcp_transport == "in_process":
+            from agent_tools.tool_host import open_in_process_client
+
+            # Entered inside session_scope(), so the host's tasks run with this session's config
+            client = await stack.enter_async_context(open_in_process_client())
+            self.tools = await load_mcp_tools(client.session)
+            return
+
+        # Over HTTP the session state travels as request headers
+        headers = session_headers(session)
+        mcp_config = {}
+        for name, connection in self.mcp_config.items():
+            connection = dict(connection)
+            if connection.get("transport") in ("streamable_http", "sse"):
+                connection["headers"] = {**connection.get("headers", {}), **headers}
+            mcp_config[name] = connection
+
+        self.client = MultiServerMCPClient(mcp_config)
+        self.tools = await self.client.get_tools()
+
+    def _has_ledger_record(self, today_date: str) -> bool:
+        """Whether the ledger has a record for the date, e.g. a trade written by a tool server"""
+        return bool(get_ledger_index(self.position_file).records(today_date))
+
     async def run_with_retry(self, today_date: str) -> None:
         """Run method with retry"""
+        # One deadline for the whole date, so retries cannot extend the session's budget
+        deadline = time.time() + self.session_timeout if self.session_timeout else None
         for attempt in range(1, self.max_retries + 1):
             try:
                 print(f"🔄 Attempting to run {self.signature} - {today_date} (Attempt {attempt})")
-                await self.run_trading_session(today_date)
+                # Session state lives in the context of this attempt, not in .runtime_env.json
+                with session_scope(**self._get_session_config(today_date, deadline)) as session:
+                    async with AsyncExitStack() as stack:
+                        await self._load_session_tools(session, stack)
+                        await self.run_trading_session(today_date)
                 print(f"✅ {self.signature} - {today_date} run successful")
                 return
             except Exception as e:
@@ -515,6 +597,9 @@ class BaseAgentAStock:
                 if attempt == self.max_retries:
                     print(f"💥 {self.signature} - {today_date} all retries failed")
                     raise
+                elif deadline is not None and time.time() + self.base_delay * attempt >= deadline:
+                    print(f"⏰ {self.signature} - {today_date} session deadline reached, not retrying")
+                    raise
                 else:
                     wait_time = self.base_delay * attempt
                     print(f"⏳ Waiting {wait_time} seconds before retry...")
@@ -543,7 +628,7 @@ class BaseAgentAStock:
         for date in trading_dates:
             print(f"🔄 Processing {self.signature} - Date: {date}")
 
-            # Set configuration
+            # Set configuration (runtime env file, for tool servers that do not read session headers)
             write_config_value("TODAY_DATE", date)
             write_config_value("SIGNATURE", self.signature)
 
@@ -561,20 +646,18 @@ class BaseAgentAStock:
         if not os.path.exists(self.position_file):
             return {"error": "Position file does not exist"}
 
-        positions = []
-        with open(self.position_file, "r") as f:
-            for line in f:
-                positions.append(json.loads(line))
-
-        if not positions:
+        # Resolves forked ledgers, whose own file may hold only the fork header
+        index = get_ledger_index(self.position_file)
+        latest_date = index.max_key()
+        if latest_date is None:
             return {"error": "No position records"}
 
-        latest_position = positions[-1]
+        latest_position = max(index.records(latest_date), key=lambda x: x.get("id", -1))
         return {
             "signature": self.signature,
             "latest_date": latest_position.get("date"),
             "positions": latest_position.get("positions", {}),
-            "total_records": len(positions),
+            "total_records": len(index),
         }
 
     def __str__(self) -> str:
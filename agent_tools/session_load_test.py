@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Multi-session load test for the MCP tool servers
+
+Runs many simulated agent sessions against one running LocalPrices + TradeTools pair.
+Every session has its own signature and trading date, carried in the X-AITrader-*
+request headers (see tools.general_tools.SESSION_HEADERS), and writes to a scratch
+ledger under data/agent_data_loadtest. The test reports throughput and latency and
+checks that no session saw another session's date or wrote to another session's ledger.
+
+Usage (with the services from start_mcp_services.py running):
+
+    python agent_tools/session_load_test.py [--sessions 32] [--rounds 5] [--symbol NVDA]
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+from fastmcp import Client
+from fastmcp.client.transports import StreamableHttpTransport
+
+# Add project root directory to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tools.general_tools import session_headers, session_scope
+from tools.json_codec import decode_price_doc, dumps
+from tools.ledger_tools import (get_position_file_path, load_ledger_records,
+                                make_position_record)
+
+load_dotenv()
+
+LOAD_TEST_LOG_PATH = "./data/agent_data_loadtest"
+
+
+def _session_dates(symbol: str, count: int) -> List[str]:
+    """Pick distinct bar times of a symbol from data/merged.jsonl, one per session"""
+    merged_file = Path(project_root) / "data" / "merged.jsonl"
+    with merged_file.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            doc = decode_price_doc(line)
+            if doc.get("Meta Data", {}).get("2. Symbol") != symbol:
+                continue
+            series_key = next(key for key in doc if key.startswith("Time Series"))
+            dates = sorted(doc[series_key])
+            if len(dates) < count:
+                raise ValueError(f"{symbol} has only {len(dates)} bars, fewer than {count} sessions")
+            # Spread the sessions over the available bars
+            step = len(dates) // count
+            return [dates[i * step] for i in range(count)]
+    raise ValueError(f"Symbol {symbol} not found in {merged_file}")
+
+
+def _seed_ledger(session: Dict[str, Any], initial_cash: float) -> Path:
+    """Register a scratch ledger for a session, like BaseAgent.register_agent"""
+    with session_scope(**session):
+        position_file = get_position_file_path(session["SIGNATURE"])
+    position_file.parent.mkdir(parents=True, exist_ok=True)
+    record = make_position_record(session["TODAY_DATE"], 0, {"CASH": initial_cash})
+    position_file.write_text(dumps(record) + "\n", encoding="utf-8")
+    return position_file
+
+
+def _tool_payload(result: Any) -> Any:
+    """Extract the tool's return value from a CallToolResult"""
+    if getattr(result, "data", None) is not None:
+        return result.data
+    return getattr(result, "structured_content", None)
+
+
+async def _run_session(
+    session: Dict[str, Any], price_url: str, trade_url: str, symbol: str, rounds: int
+) -> Dict[str, Any]:
+    """Run one simulated agent session: each round reads today's price and buys one share"""
+    headers = session_headers(session)
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    price_client = Client(StreamableHttpTransport(price_url, headers=headers))
+    trade_client = Client(StreamableHttpTransport(trade_url, headers=headers))
+    async with price_client, trade_client:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            price = _tool_payload(
+                await price_client.call_tool("get_price_local", {"symbol": symbol, "date": session["TODAY_DATE"]})
+            )
+            latencies.append(time.perf_counter() - start)
+            # The server only hides the close for the date it believes is "today"
+            if not isinstance(price, dict) or "can not" not in str(price.get("ohlcv", {}).get("close", "")):
+                errors.append(f"price for {session['TODAY_DATE']} not masked as today: {price}")
+
+            start = time.perf_counter()
+            positions = _tool_payload(await trade_client.call_tool("buy", {"symbol": symbol, "amount": 1}))
+            latencies.append(time.perf_counter() - start)
+            if not isinstance(positions, dict) or "error" in positions:
+                errors.append(f"buy failed: {positions}")
+
+    return {"latencies": latencies, "errors": errors}
+
+
+def _check_ledger(session: Dict[str, Any], position_file: Path, symbol: str, rounds: int) -> List[str]:
+    """Check that a session's ledger holds exactly its own trades"""
+    records = load_ledger_records(position_file)
+    problems = []
+    if len(records) != rounds + 1:
+        problems.append(f"expected {rounds + 1} records, found {len(records)}")
+    foreign_dates = {record.get("date") for record in records} - {session["TODAY_DATE"]}
+    if foreign_dates:
+        problems.append(f"records from other sessions' dates: {sorted(foreign_dates)}")
+    if records and records[-1].get("positions", {}).get(symbol) != rounds:
+        problems.append(f"expected {rounds} {symbol}, found {records[-1].get('positions', {}).get(symbol)}")
+    return problems
+
+
+async def run_load_test(
+    sessions: int, rounds: int, symbol: str, price_url: str, trade_url: str, initial_cash: float
+) -> bool:
+    """
+    Run concurrent sessions against the tool servers and report throughput and isolation
+
+    Returns:
+        True if every call succeeded and every session stayed isolated
+    """
+    dates = _session_dates(symbol, sessions)
+    session_configs = [
+        {"SIGNATURE": f"loadtest-{i:03d}", "TODAY_DATE": date, "MARKET": "us", "LOG_PATH": LOAD_TEST_LOG_PATH}
+        for i, date in enumerate(dates)
+    ]
+    position_files = [_seed_ledger(session, initial_cash) for session in session_configs]
+
+    print(f"🚀 {sessions} sessions x {rounds} rounds against {price_url} and {trade_url}")
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(_run_session(session, price_url, trade_url, symbol, rounds) for session in session_configs),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    latencies: List[float] = []
+    failures = 0
+    for session, position_file, result in zip(session_configs, position_files, results):
+        if isinstance(result, Exception):
+            print(f"❌ {session['SIGNATURE']}: {result}")
+            failures += 1
+            continue
+        latencies.extend(result["latencies"])
+        problems = result["errors"] + _check_ledger(session, position_file, symbol, rounds)
+        if problems:
+            failures += 1
+            for problem in problems[:3]:
+                print(f"❌ {session['SIGNATURE']} ({session['TODAY_DATE']}): {problem}")
+
+    if latencies:
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"📊 {len(latencies)} tool calls in {elapsed:.2f}s: {len(latencies) / elapsed:.1f} calls/s")
+        print(f"   latency p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+    if failures:
+        print(f"❌ {failures}/{sessions} sessions failed or leaked state")
+    else:
+        print(f"✅ All {sessions} sessions isolated: each saw only its own date and wrote only its own ledger")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent multi-session load test for the MCP tool servers")
+    parser.add_argument("--sessions", type=int, default=32, help="Concurrent agent sessions")
+    parser.add_argument("--rounds", type=int, default=5, help="Price lookups and buys per session")
+    parser.add_argument("--symbol", default="NVDA", help="Symbol to trade")
+    parser.add_argument("--initial-cash", type=float, default=10000.0)
+    parser.add_argument(
+        "--price-url", default=f"http://localhost:{os.getenv('GETPRICE_HTTP_PORT', '8003')}/mcp", help="LocalPrices server"
+    )
+    parser.add_argument(
+        "--trade-url", default=f"http://localhost:{os.getenv('TRADE_HTTP_PORT', '8002')}/mcp", help="TradeTools server"
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch ledgers for inspection")
+    args = parser.parse_args()
+
+    try:
+        ok = asyncio.run(
+            run_load_test(args.sessions, args.rounds, args.symbol, args.price_url, args.trade_url, args.initial_cash)
+        )
+    finally:
+        if not args.keep:
+            shutil.rmtree(Path(project_root) / LOAD_TEST_LOG_PATH[2:], ignore_errors=True)
+    sys.exit(0 if ok else 1)
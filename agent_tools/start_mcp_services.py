@@ -2,6 +2,11 @@
 """
 MCP Service Startup Script (Python Version)
 Start all four MCP services: Math, Search, TradeTools, LocalPrices
+
+Usage:
+    python start_mcp_services.py            # one process per service
+    python start_mcp_services.py combined   # all tools in one process on TOOL_HOST_HTTP_PORT (tool_host.py)
+    python start_mcp_services.py status
 """
 
 import os
@@ -10,6 +15,7 @@ import subprocess
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -18,7 +24,7 @@ load_dotenv()
 
 
 class MCPServiceManager:
-    def __init__(self):
+    def __init__(self, combined=False):
         self.services = {}
         self.running = True
 
@@ -28,6 +34,7 @@ class MCPServiceManager:
             "search": int(os.getenv("SEARCH_HTTP_PORT", "8001")),
             "trade": int(os.getenv("TRADE_HTTP_PORT", "8002")),
             "price": int(os.getenv("GETPRICE_HTTP_PORT", "8003")),
+            "tools": int(os.getenv("TOOL_HOST_HTTP_PORT", "8010")),
         }
 
         # Service configurations
@@ -38,6 +45,17 @@ class MCPServiceManager:
             "trade": {"script": "tool_trade.py", "name": "TradeTools", "port": self.ports["trade"]},
             "price": {"script": "tool_get_price_local.py", "name": "LocalPrices", "port": self.ports["price"]},
         }
+        if combined:
+            # One process serving every tool, for agents with mcp_transport "tool_host"
+            self.service_configs = {
+                "tools": {"script": "tool_host.py", "name": "ToolHost", "port": self.ports["tools"]},
+            }
+
+        # Seconds a service may take from launch to accepting connections. Price and trade
+        # servers load prices and ledger indexes before binding their port, so they get longer.
+        ready_timeout = float(os.getenv("MCP_READY_TIMEOUT", "30"))
+        for service_id, config in self.service_configs.items():
+            config["ready_timeout"] = ready_timeout * (2 if service_id in ("trade", "price", "tools") else 1)
 
         # Create logs directory
         self.log_dir = Path("../logs")
@@ -120,7 +138,13 @@ class MCPServiceManager:
                     [sys.executable, script_path], stdout=f, stderr=subprocess.STDOUT, cwd=os.getcwd()
                 )
 
-            self.services[service_id] = {"process": process, "name": service_name, "port": port, "log_file": log_file}
+            self.services[service_id] = {
+                "process": process,
+                "name": service_name,
+                "port": port,
+                "log_file": log_file,
+                "started_at": time.monotonic(),
+            }
 
             print(f"✅ {service_name} service started (PID: {process.pid}, Port: {port})")
             return True
@@ -170,7 +194,8 @@ class MCPServiceManager:
 
         print("\n🔄 Starting services...")
 
-        # Start all services
+        # Start all services, they launch and warm up in parallel
+        start_time = time.monotonic()
         success_count = 0
         for service_id, config in self.service_configs.items():
             if self.start_service(service_id, config):
@@ -180,16 +205,13 @@ class MCPServiceManager:
             print("\n❌ No services started successfully")
             return
 
-        # Wait for services to start
-        print("\n⏳ Waiting for services to start...")
-        time.sleep(3)
-
-        # Check service status
-        print("\n🔍 Checking service status...")
-        healthy_count = self.check_all_services()
+        # Wait for services to become ready
+        print("\n⏳ Waiting for services to become ready...")
+        healthy_count = self.wait_for_all_services()
 
         if healthy_count > 0:
-            print(f"\n🎉 {healthy_count}/{len(self.services)} MCP services running!")
+            elapsed = time.monotonic() - start_time
+            print(f"\n🎉 {healthy_count}/{len(self.services)} MCP services ready in {elapsed:.2f}s!")
             self.print_service_info()
             # Keep running
             self.keep_alive()
@@ -197,12 +219,35 @@ class MCPServiceManager:
             print("\n❌ All services failed to start properly")
             self.stop_all_services()
 
-    def check_all_services(self):
-        """Check all service status and return count of healthy services"""
-        healthy_count = 0
-        for service_id, service in self.services.items():
+    def wait_for_service(self, service_id, timeout):
+        """Poll a service until it accepts connections, return seconds from launch to ready or None"""
+        service = self.services[service_id]
+        deadline = service["started_at"] + timeout
+        while time.monotonic() < deadline:
+            if service["process"].poll() is not None:
+                # Exited during startup, e.g. import error or port taken
+                return None
             if self.check_service_health(service_id):
-                print(f"✅ {service['name']} service running normally")
+                return time.monotonic() - service["started_at"]
+            time.sleep(0.05)
+        return None
+
+    def wait_for_all_services(self):
+        """Poll all services in parallel, each against its own timeout, and return count of ready services"""
+        with ThreadPoolExecutor(max_workers=len(self.services)) as pool:
+            futures = {
+                service_id: pool.submit(
+                    self.wait_for_service, service_id, self.service_configs[service_id]["ready_timeout"]
+                )
+                for service_id in self.services
+            }
+
+        healthy_count = 0
+        for service_id, future in futures.items():
+            service = self.services[service_id]
+            ready_after = future.result()
+            if ready_after is not None:
+                print(f"✅ {service['name']} service ready in {ready_after:.2f}s")
                 healthy_count += 1
             else:
                 print(f"❌ {service['name']} service failed to start")
@@ -286,7 +331,7 @@ def main():
         manager.status()
     else:
         # Startup mode
-        manager = MCPServiceManager()
+        manager = MCPServiceManager(combined=len(sys.argv) > 1 and sys.argv[1] == "combined")
         manager.start_all_services()
 
 
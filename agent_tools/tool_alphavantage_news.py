@@ -12,7 +12,11 @@ import sys
 from datetime import datetime, timedelta
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from tools.general_tools import get_config_value
+from tools.circuit_breaker import CircuitOpenError, get_breaker, is_outage
+from tools.general_tools import get_config_value, request_session, request_timeout
+from tools.news_archive import TIME_FORMAT, get_news_archive, news_archive_mode
+from tools.tool_cache import memoize
+from tools.tool_metrics import enable_metrics, instrument
 
 logger = logging.getLogger(__name__)
 
@@ -88,7 +92,8 @@ def parse_date_to_standard(date_str: str) -> str:
 class AlphaVantageNewsTool:
     def __init__(self):
         self.api_key = os.environ.get("ALPHAADVANTAGE_API_KEY")
-        if not self.api_key:
+        # The offline news archive needs no key
+        if not self.api_key and news_archive_mode() != "offline":
             raise ValueError(
                 "Alpha Vantage API key not provided! Please set ALPHAADVANTAGE_API_KEY environment variable."
             )
@@ -101,6 +106,7 @@ class AlphaVantageNewsTool:
         time_from: Optional[str] = None,
         time_to: Optional[str] = None,
         sort: str = "LATEST",
+        limit: int = 20,
     ) -> List[Dict[str, Any]]:
         """
         Fetch news articles from Alpha Vantage NEWS_SENTIMENT API
@@ -111,6 +117,7 @@ class AlphaVantageNewsTool:
             time_from: Start time in YYYYMMDDTHHMM format (e.g., "20220410T0130")
             time_to: End time in YYYYMMDDTHHMM format
             sort: Sort order ("LATEST", "EARLIEST", or "RELEVANCE")
+            limit: Maximum articles (the API allows up to 1000)
 
         Returns:
             List of news articles
@@ -119,7 +126,7 @@ class AlphaVantageNewsTool:
             "function": "NEWS_SENTIMENT",
             "apikey": self.api_key,
             "sort": sort,
-            "limit": 20,  # Fixed limit
+            "limit": limit,
         }
 
         if tickers:
@@ -131,17 +138,24 @@ class AlphaVantageNewsTool:
         if time_to:
             params["time_to"] = time_to
 
+        breaker = get_breaker("alphavantage")
         try:
-            response = requests.get(self.base_url, params=params, timeout=30)
+            response = requests.get(self.base_url, params=params, timeout=request_timeout(30))
+            if is_outage(response.status_code):
+                breaker.record_failure()
             response.raise_for_status()
 
             json_data = response.json()
             
             # Check for API errors
             if "Error Message" in json_data:
+                breaker.record_success()
                 raise Exception(f"Alpha Vantage API error: {json_data['Error Message']}")
-            if "Note" in json_data:
-                raise Exception(f"Alpha Vantage API note: {json_data['Note']}")
+            # Rate limit and quota messages come back with HTTP 200
+            if "Note" in json_data or "Information" in json_data:
+                breaker.record_failure()
+                raise Exception(f"Alpha Vantage API note: {json_data.get('Note') or json_data['Information']}")
+            breaker.record_success()
 
             # Extract feed data
             feed = json_data.get("feed", [])
@@ -153,12 +167,49 @@ class AlphaVantageNewsTool:
             return feed[:params["limit"]]
 
         except requests.exceptions.RequestException as e:
+            if e.response is None:
+                # Timeout or connection error, no answer from the service at all
+                breaker.record_failure()
             logger.error(f"Alpha Vantage API request failed: {e}")
             raise Exception(f"Alpha Vantage API request failed: {e}")
         except Exception as e:
             logger.error(f"Alpha Vantage API error: {e}")
             raise
 
+    def fetch_window(
+        self,
+        time_from: str,
+        time_to: str,
+        tickers: Optional[str] = None,
+        topics: Optional[str] = None,
+        limit: int = 1000,
+        sort: str = "EARLIEST",
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch every article of a ticker or topic published in a time window, without the
+        session's date filtering or the archive (used by data/prefetch_news.py)
+
+        Args:
+            time_from: Window start in YYYYMMDDTHHMM format
+            time_to: Window end in YYYYMMDDTHHMM format
+            tickers: Stock/crypto/forex symbols
+            topics: News topics
+            limit: Maximum articles (the API allows up to 1000)
+            sort: Sort order ("LATEST", "EARLIEST", or "RELEVANCE")
+
+        Returns:
+            List of news articles
+
+        Raises:
+            CircuitOpenError: The Alpha Vantage circuit is open
+        """
+        breaker = get_breaker("alphavantage")
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.unavailable_message())
+        return self._fetch_news(
+            tickers=tickers, topics=topics, time_from=time_from, time_to=time_to, sort=sort, limit=limit
+        )
+
     def __call__(
         self,
         query: str,
@@ -182,6 +233,7 @@ class AlphaVantageNewsTool:
         today_date = get_config_value("TODAY_DATE")
         time_from = None
         time_to = None
+        today_datetime = None
         
         if today_date:
             # Convert TODAY_DATE to Alpha Vantage API format (YYYYMMDDTHHMM)
@@ -203,6 +255,23 @@ class AlphaVantageNewsTool:
         else:
             print("⚠️ TODAY_DATE not set, returning all results without date filtering")
 
+        # Serve from the prefetched archive when it holds the whole window
+        archive = get_news_archive()
+        if archive and today_datetime:
+            start = (today_datetime - timedelta(days=30)).strftime(TIME_FORMAT)
+            end = today_datetime.strftime(TIME_FORMAT)
+            key = archive.covering_key(tickers, topics, start, end)
+            if key:
+                articles = archive.query(key, tickers, topics, start, end)
+                print(f"Found {len(articles)} articles in the news archive ({key})")
+                return articles
+        if news_archive_mode() == "offline":
+            raise LookupError(f"News for tickers={tickers}, topics={topics} is not in the archive (NEWS_ARCHIVE=offline)")
+
+        breaker = get_breaker("alphavantage")
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.unavailable_message())
+
         # Fetch articles with date filtering via API
         all_articles = self._fetch_news(
             tickers=tickers,
@@ -213,6 +282,8 @@ class AlphaVantageNewsTool:
         )
 
         print(f"Found {len(all_articles)} articles after API filtering")
+        if archive:
+            archive.add_articles(all_articles)
         return all_articles
 
 
@@ -220,6 +291,9 @@ mcp = FastMCP("Search")
 
 
 @mcp.tool()
+@instrument
+@request_session
+@memoize(disk=True)
 def get_market_news(
     query: str,
     tickers: Optional[str] = None,
@@ -245,6 +319,10 @@ def get_market_news(
         - Title: Article title
         - URL: Article URL
         - Summary: Article summary
+
+        Windows prefetched into the local news archive are answered from it; otherwise the
+        API is called. While Alpha Vantage is failing repeatedly, returns an "unavailable"
+        message at once without calling it.
     """
     try:
         tool = AlphaVantageNewsTool()
@@ -304,6 +382,8 @@ Summary: {summary[:1000]}
 
         return "\n".join(formatted_results)
 
+    except CircuitOpenError as e:
+        return str(e)
     except Exception as e:
         logger.error(f"Alpha Vantage news tool execution failed: {str(e)}")
         return f"❌ Alpha Vantage news tool execution failed: {str(e)}"
@@ -312,6 +392,7 @@ Summary: {summary[:1000]}
 if __name__ == "__main__":
     # Run with streamable-http, support configuring host and port through environment variables to avoid conflicts
     print("Running Alpha Vantage News Tool as search tool")
+    enable_metrics(mcp, "search")
     port = int(os.getenv("SEARCH_HTTP_PORT", "8001"))
     mcp.run(transport="streamable-http", port=port)
 
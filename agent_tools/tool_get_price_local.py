@@ -1,10 +1,11 @@
-import json
 import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
+import numpy as np
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 
@@ -20,7 +21,17 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from tools.general_tools import get_config_value
+from tools.general_tools import get_config_value, request_session
+from tools.tool_cache import memoize
+from tools.tool_metrics import enable_metrics, instrument
+from tools.indicator_tools import (get_covariance_as_of, get_indicators_as_of,
+                                   parse_indicator, parse_screen_metric,
+                                   screen_universe)
+from tools.price_store import (get_price_store, price_data_version,
+                               warm_up_price_stores)
+from tools.price_tools import get_latest_position
+from tools.risk_tools import (min_variance_weights, risk_contributions,
+                              risk_parity_weights, top_correlated_pairs)
 
 
 def _workspace_data_path(filename: str, symbol: Optional[str] = None) -> Path:
@@ -57,7 +68,49 @@ def _validate_date_hourly(date_str: str) -> None:
     except ValueError as exc:
         raise ValueError("date must be in YYYY-MM-DD HH:MM:SS format") from exc
 
+# Tool field name -> key of the bar in merged.jsonl
+PRICE_FIELDS = {
+    "open": "1. buy price",
+    "high": "2. high",
+    "low": "3. low",
+    "close": "4. sell price",
+    "volume": "5. volume",
+}
+
+
+def _parse_fields(fields: Optional[List[str]]) -> List[str]:
+    """Validate requested price fields, defaulting to all of PRICE_FIELDS"""
+    if not fields:
+        return list(PRICE_FIELDS)
+    unknown = [field for field in fields if field not in PRICE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}, choose from {list(PRICE_FIELDS)}")
+    return list(dict.fromkeys(fields))
+
+
+def _to_number(value: Any) -> Any:
+    """Convert a price string from merged.jsonl to a number, keeping other values as-is"""
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        return int(number) if number.is_integer() else number
+    return value
+
+
+def _group_by_data_path(symbols: List[str]) -> Dict[Path, List[str]]:
+    """Group symbols by price file (US / A-shares), keeping their order within each group"""
+    by_path: Dict[Path, List[str]] = {}
+    for symbol in symbols:
+        by_path.setdefault(_workspace_data_path("merged.jsonl", symbol), []).append(symbol)
+    return by_path
+
+
 @mcp.tool()
+@instrument
+@request_session
+@memoize(version=price_data_version)
 def get_price_local(symbol: str, date: str) -> Dict[str, Any]:
     """Read OHLCV data for specified stock and date. Get historical information for specified stock.
     
@@ -115,47 +168,41 @@ def get_price_local_daily(symbol: str, date: str) -> Dict[str, Any]:
     if not data_path.exists():
         return {"error": f"Data file not found: {data_path}", "symbol": symbol, "date": date}
 
-    with data_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            doc = json.loads(line)
-            meta = doc.get("Meta Data", {})
-            if meta.get("2. Symbol") != symbol:
-                continue
-            series = doc.get("Time Series (Daily)", {})
-            day = series.get(date)
-            if day is None:
-                sample_dates = sorted(series.keys(), reverse=True)[:5]
-                return {
-                    "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
-                    "symbol": symbol,
-                    "date": date,
-                }
-            if date == get_config_value("TODAY_DATE"):
-                return {
-                    "symbol": symbol,
-                    "date": date,
-                    "ohlcv": {
-                        "open": day.get("1. buy price"),
-                        "high": "You can not get the current high price",
-                        "low": "You can not get the current low price", 
-                        "close": "You can not get the next close price",
-                        "volume": "You can not get the current volume",
-                    },
-                }
-            else:
-                return {
-                    "symbol": symbol,
-                    "date": date,
-                    "ohlcv": {
-                        "open": day.get("1. buy price"),
-                        "high": day.get("2. high"),
-                        "low": day.get("3. low"), 
-                        "close": day.get("4. sell price"),
-                        "volume": day.get("5. volume"),
-                    },
-                }
+    doc = get_price_store(data_path).get_doc(symbol)
+    if doc is not None:
+        series = doc.get("Time Series (Daily)", {})
+        day = series.get(date)
+        if day is None:
+            sample_dates = sorted(series.keys(), reverse=True)[:5]
+            return {
+                "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
+                "symbol": symbol,
+                "date": date,
+            }
+        if date == get_config_value("TODAY_DATE"):
+            return {
+                "symbol": symbol,
+                "date": date,
+                "ohlcv": {
+                    "open": day.get("1. buy price"),
+                    "high": "You can not get the current high price",
+                    "low": "You can not get the current low price", 
+                    "close": "You can not get the next close price",
+                    "volume": "You can not get the current volume",
+                },
+            }
+        else:
+            return {
+                "symbol": symbol,
+                "date": date,
+                "ohlcv": {
+                    "open": day.get("1. buy price"),
+                    "high": day.get("2. high"),
+                    "low": day.get("3. low"), 
+                    "close": day.get("4. sell price"),
+                    "volume": day.get("5. volume"),
+                },
+            }
 
 
     return {"error": f"No records found for stock {symbol} in local data", "symbol": symbol, "date": date}
@@ -181,47 +228,41 @@ def get_price_local_hourly(symbol: str, date: str) -> Dict[str, Any]:
     if not data_path.exists():
         return {"error": f"Data file not found: {data_path}", "symbol": symbol, "date": date}
 
-    with data_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            doc = json.loads(line)
-            meta = doc.get("Meta Data", {})
-            if meta.get("2. Symbol") != symbol:
-                continue
-            series = doc.get("Time Series (60min)", {})
-            day = series.get(date)
-            if day is None:
-                sample_dates = sorted(series.keys(), reverse=True)[:5]
-                return {
-                    "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
-                    "symbol": symbol,
-                    "date": date
-                }
-            if date == get_config_value("TODAY_DATE"):
-                return {
-                    "symbol": symbol,
-                    "date": date,
-                    "ohlcv": {
-                        "open": day.get("1. buy price"),
-                        "high": "You can not get the current high price",
-                        "low": "You can not get the current low price", 
-                        "close": "You can not get the next close price",
-                        "volume": "You can not get the current volume",
-                    },
-                }
-            else:
-                return {
-                    "symbol": symbol,
-                    "date": date,
-                    "ohlcv": {
-                        "open": day.get("1. buy price"),
-                        "high": day.get("2. high"),
-                        "low": day.get("3. low"), 
-                        "close": day.get("4. sell price"),
-                        "volume": day.get("5. volume"),
-                    },
-                }
+    doc = get_price_store(data_path).get_doc(symbol)
+    if doc is not None:
+        series = doc.get("Time Series (60min)", {})
+        day = series.get(date)
+        if day is None:
+            sample_dates = sorted(series.keys(), reverse=True)[:5]
+            return {
+                "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
+                "symbol": symbol,
+                "date": date
+            }
+        if date == get_config_value("TODAY_DATE"):
+            return {
+                "symbol": symbol,
+                "date": date,
+                "ohlcv": {
+                    "open": day.get("1. buy price"),
+                    "high": "You can not get the current high price",
+                    "low": "You can not get the current low price", 
+                    "close": "You can not get the next close price",
+                    "volume": "You can not get the current volume",
+                },
+            }
+        else:
+            return {
+                "symbol": symbol,
+                "date": date,
+                "ohlcv": {
+                    "open": day.get("1. buy price"),
+                    "high": day.get("2. high"),
+                    "low": day.get("3. low"), 
+                    "close": day.get("4. sell price"),
+                    "volume": day.get("5. volume"),
+                },
+            }
 
     return {"error": f"No records found for stock {symbol} in local data", "symbol": symbol, "date": date}
 
@@ -246,39 +287,406 @@ def get_price_local_function(symbol: str, date: str, filename: str = "merged.jso
     if not data_path.exists():
         return {"error": f"Data file not found: {data_path}", "symbol": symbol, "date": date}
 
-    with data_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            doc = json.loads(line)
-            meta = doc.get("Meta Data", {})
-            if meta.get("2. Symbol") != symbol:
-                continue
-            series = doc.get("Time Series (Daily)", {})
-            day = series.get(date)
-            if day is None:
-                sample_dates = sorted(series.keys(), reverse=True)[:5]
-                return {
-                    "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
-                    "symbol": symbol,
-                    "date": date,
-                }
+    doc = get_price_store(data_path).get_doc(symbol)
+    if doc is not None:
+        series = doc.get("Time Series (Daily)", {})
+        day = series.get(date)
+        if day is None:
+            sample_dates = sorted(series.keys(), reverse=True)[:5]
             return {
+                "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
                 "symbol": symbol,
                 "date": date,
-                "ohlcv": {
-                    "buy price": day.get("1. buy price"),
-                    "high": day.get("2. high"),
-                    "low": day.get("3. low"),
-                    "sell price": day.get("4. sell price"),
-                    "volume": day.get("5. volume"),
-                },
             }
+        return {
+            "symbol": symbol,
+            "date": date,
+            "ohlcv": {
+                "buy price": day.get("1. buy price"),
+                "high": day.get("2. high"),
+                "low": day.get("3. low"),
+                "sell price": day.get("4. sell price"),
+                "volume": day.get("5. volume"),
+            },
+        }
 
     return {"error": f"No records found for stock {symbol} in local data", "symbol": symbol, "date": date}
 
 
+@mcp.tool()
+@instrument
+@request_session
+@memoize(version=price_data_version)
+def get_price_history(symbol: str, start: str, end: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Read OHLCV bars of one stock over a date range in a single call.
+
+    Bars after your current time are never returned; for the current bar only the open is known.
+
+    Args:
+        symbol: Stock symbol, e.g. 'NVDA' or '600028.SH'.
+        start: First date, 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'.
+        end: Last date (inclusive), 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'. A date covers the whole day.
+        fields: Any of 'open', 'high', 'low', 'close', 'volume'. Defaults to all.
+
+    Returns:
+        Dictionary with symbol, fields, a 'dates' list and one list of values per field, aligned with 'dates'.
+    """
+    try:
+        for date in (start, end):
+            if " " in date:
+                _validate_date_hourly(date)
+            else:
+                _validate_date_daily(date)
+        selected = _parse_fields(fields)
+    except ValueError as e:
+        return {"error": str(e), "symbol": symbol, "start": start, "end": end}
+    if start > end:
+        return {"error": "start must not be after end", "symbol": symbol, "start": start, "end": end}
+
+    data_path = _workspace_data_path("merged.jsonl", symbol)
+    if not data_path.exists():
+        return {"error": f"Data file not found: {data_path}", "symbol": symbol, "start": start, "end": end}
+    store = get_price_store(data_path)
+    if store.get_doc(symbol) is None:
+        return {"error": f"No records found for stock {symbol} in local data", "symbol": symbol, "start": start, "end": end}
+
+    # Clip to the session's current time, nothing after it may leak into the agent's view
+    if " " not in end:
+        end = f"{end} 23:59:59"
+    today = get_config_value("TODAY_DATE")
+    if today and today < end:
+        end = today
+
+    result: Dict[str, Any] = {"symbol": symbol, "fields": selected, "dates": []}
+    for field in selected:
+        result[field] = []
+    for bar_time, bar in store.get_range(symbol, start, end):
+        result["dates"].append(bar_time)
+        for field in selected:
+            # At the current bar only the open is known
+            known = bar_time != today or field == "open"
+            result[field].append(_to_number(bar.get(PRICE_FIELDS[field])) if known else None)
+    if result["dates"] and result["dates"][-1] == today and selected != ["open"]:
+        result["note"] = f"{today} is the current time: only the open is available, other fields are null"
+    return result
+
+
+@mcp.tool()
+@instrument
+@request_session
+@memoize(version=price_data_version)
+def get_price_snapshot(symbols: List[str], date: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Read OHLCV data of many stocks at one date in a single call.
+
+    For your current time only the open is known, and later dates are not available.
+
+    Args:
+        symbols: Stock symbols, e.g. ['NVDA', 'AAPL'] or ['600028.SH', '601318.SH'].
+        date: Date in 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS' format. Based on your current time format.
+        fields: Any of 'open', 'high', 'low', 'close', 'volume'. Defaults to all.
+
+    Returns:
+        Dictionary with date, 'columns' (symbol followed by the fields), one row per symbol found,
+        and 'missing' symbols without data at that date.
+    """
+    try:
+        if " " in date:
+            _validate_date_hourly(date)
+        else:
+            _validate_date_daily(date)
+        selected = _parse_fields(fields)
+    except ValueError as e:
+        return {"error": str(e), "date": date}
+    today = get_config_value("TODAY_DATE")
+    if today and date > today:
+        return {"error": f"Date {date} is after the current time {today}", "date": date}
+
+    symbols = list(dict.fromkeys(symbols))
+    bars: Dict[str, Optional[Dict[str, Any]]] = {}
+    for data_path, path_symbols in _group_by_data_path(symbols).items():
+        if data_path.exists():
+            bars.update(get_price_store(data_path).get_bars(path_symbols, date))
+
+    rows, missing = [], []
+    for symbol in symbols:
+        bar = bars.get(symbol)
+        if bar is None:
+            missing.append(symbol)
+            continue
+        # At the current time only the open is known
+        rows.append(
+            [symbol]
+            + [
+                _to_number(bar.get(PRICE_FIELDS[field])) if date != today or field == "open" else None
+                for field in selected
+            ]
+        )
+    result: Dict[str, Any] = {"date": date, "columns": ["symbol"] + selected, "rows": rows, "missing": missing}
+    if date == today and selected != ["open"]:
+        result["note"] = f"{today} is the current time: only the open is available, other fields are null"
+    return result
+
+
+@mcp.tool()
+@instrument
+@request_session
+@memoize(version=price_data_version)
+def get_indicators(
+    symbols: List[str], date: str, indicators: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Read technical indicators of many stocks as of a date in a single call.
+
+    Values come from the latest completed bar at or before the date. The bar at your current
+    time is not complete yet, so for the current time the previous bar is used.
+
+    Args:
+        symbols: Stock symbols, e.g. ['NVDA', 'AAPL'].
+        date: Date in 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS' format.
+        indicators: Names with an optional window in bars, e.g. ['sma_20', 'ema_50', 'rsi_14', 'atr_14',
+            'realized_vol_20', 'momentum_5']. Defaults to ['sma_20', 'rsi_14', 'realized_vol_20'].
+
+    Returns:
+        Dictionary with date, 'as_of' bar times per market, 'columns' (symbol followed by the indicators),
+        one row per symbol found (null where there is not enough history), and 'missing' symbols.
+    """
+    indicators = list(dict.fromkeys(indicators or ["sma_20", "rsi_14", "realized_vol_20"]))
+    try:
+        if " " in date:
+            _validate_date_hourly(date)
+        else:
+            _validate_date_daily(date)
+        for name in indicators:
+            parse_indicator(name)
+    except ValueError as e:
+        return {"error": str(e), "date": date}
+
+    # Clip to the session's current time; its own bar is still open, so use the one before it
+    as_of, inclusive = (date if " " in date else f"{date} 23:59:59"), True
+    today = get_config_value("TODAY_DATE")
+    if today and today <= as_of:
+        as_of, inclusive = today, False
+
+    symbols = list(dict.fromkeys(symbols))
+    rows_by_symbol: Dict[str, List[Any]] = {}
+    bar_times: Dict[str, str] = {}
+    for data_path, path_symbols in _group_by_data_path(symbols).items():
+        if not data_path.exists():
+            continue
+        store = get_price_store(data_path)
+        found = [symbol for symbol in path_symbols if store.get_doc(symbol) is not None]
+        if not found:
+            continue
+        bar_time, values = get_indicators_as_of(store, found, indicators, as_of, inclusive)
+        if bar_time is None:
+            continue
+        market = "cn" if data_path.parent.name == "A_stock" else "us"
+        bar_times[market] = bar_time
+        for symbol in found:
+            rows_by_symbol[symbol] = [symbol] + values[symbol]
+
+    return {
+        "date": date,
+        "as_of": bar_times,
+        "columns": ["symbol"] + indicators,
+        "rows": [rows_by_symbol[symbol] for symbol in symbols if symbol in rows_by_symbol],
+        "missing": [symbol for symbol in symbols if symbol not in rows_by_symbol],
+    }
+
+
+@mcp.tool()
+@instrument
+@request_session
+@memoize(version=price_data_version, session_keys=("MARKET",))
+def screen(
+    date: str,
+    criteria: Optional[Dict[str, Dict[str, float]]] = None,
+    sort_by: str = "return_5",
+    ascending: bool = False,
+    top_k: int = 10,
+    market: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Rank the whole stock universe of a market in one call to find trading candidates.
+
+    Figures are as of the open of the bar at the date: they use only completed bars before it,
+    and 'gap' compares that bar's open with the previous close.
+
+    Metrics (N = window in bars): 'return_N' (N-bar return), 'gap', 'volume_surge_N' (last volume /
+    average of the N before), 'ma_distance_N' (close / N-bar average - 1), 'volatility_N' (annualized).
+
+    Args:
+        date: Date in 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS' format, not after your current time.
+        criteria: Filters per metric, e.g. {"return_5": {"min": 0.02}, "volatility_20": {"max": 0.6}}.
+        sort_by: Metric to rank by.
+        ascending: Rank from the lowest value instead of the highest.
+        top_k: Number of symbols to return (at most 100).
+        market: 'us' or 'cn', defaults to your current market.
+
+    Returns:
+        Dictionary with date, 'as_of' (last completed bar), 'universe' and 'matched' counts, 'columns'
+        (symbol followed by the metrics) and the top_k rows.
+    """
+    try:
+        if " " in date:
+            _validate_date_hourly(date)
+        else:
+            _validate_date_daily(date)
+        criteria = {parse_screen_metric(name): bounds for name, bounds in (criteria or {}).items()}
+        sort_by = parse_screen_metric(sort_by)
+    except ValueError as e:
+        return {"error": str(e), "date": date}
+    for name, bounds in criteria.items():
+        if not isinstance(bounds, dict) or set(bounds) - {"min", "max"}:
+            return {"error": f"Criteria for {name} must look like {{'min': x, 'max': y}}", "date": date}
+    today = get_config_value("TODAY_DATE")
+    if today and date > today:
+        return {"error": f"Date {date} is after the current time {today}", "date": date}
+    top_k = max(1, min(int(top_k), 100))
+
+    market = market or get_config_value("MARKET", "us")
+    data_path = _workspace_data_path("merged.jsonl", "X.SH" if market == "cn" else None)
+    if not data_path.exists():
+        return {"error": f"Data file not found: {data_path}", "date": date}
+    metrics = list(dict.fromkeys([sort_by, *criteria]))
+    try:
+        bar_time, as_of, symbols, values = screen_universe(get_price_store(data_path), date, metrics)
+    except ValueError as e:
+        return {"error": str(e), "date": date}
+
+    # Keep symbols with every metric available and inside every bound, then rank
+    matrix = np.column_stack([values[name] for name in metrics])
+    keep = np.isfinite(matrix).all(axis=1)
+    for name, bounds in criteria.items():
+        column = values[name]
+        if "min" in bounds:
+            keep &= column >= bounds["min"]
+        if "max" in bounds:
+            keep &= column <= bounds["max"]
+    candidates = np.flatnonzero(keep)
+    order = np.argsort(values[sort_by][candidates], kind="stable")
+    if not ascending:
+        order = order[::-1]
+    top = candidates[order[:top_k]]
+
+    return {
+        "date": bar_time,
+        "as_of": as_of,
+        "universe": len(symbols),
+        "matched": len(candidates),
+        "columns": ["symbol"] + metrics,
+        "rows": [[symbols[i]] + [round(float(v), 4) for v in matrix[i]] for i in top],
+    }
+
+
+@mcp.tool()
+@instrument
+@request_session
+def portfolio_risk(
+    positions: Optional[Dict[str, float]] = None,
+    weights: Optional[Dict[str, float]] = None,
+    date: Optional[str] = None,
+    window: int = 60,
+    suggest: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Analyze the risk and diversification of a portfolio in one call.
+
+    Uses the covariance of bar-to-bar log returns over the last `window` completed bars. Pass share
+    counts (positions), portfolio weights, or neither to analyze your current holdings.
+
+    Args:
+        positions: Shares per symbol, optionally with 'CASH', e.g. {"NVDA": 10, "AAPL": 5, "CASH": 2000}.
+        weights: Portfolio weights per symbol, the rest is cash, e.g. {"NVDA": 0.4, "AAPL": 0.3}.
+        date: Date in 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS' format, defaults to your current time.
+        window: Number of bars of returns to use (10-250).
+        suggest: Optionally 'min_variance' or 'risk_parity' to also get suggested weights for the same
+            stocks and the same invested fraction.
+
+    Returns:
+        Dictionary with 'as_of' bar, annualized 'volatility', per-holding 'weights', 'marginal_risk' and
+        'risk_contribution' (share of the volatility), 'top_correlations' pairs and optional 'suggestion'.
+    """
+    date = date or get_config_value("TODAY_DATE")
+    if not date:
+        return {"error": "date is required when there is no current session date"}
+    if suggest not in (None, "min_variance", "risk_parity"):
+        return {"error": "suggest must be 'min_variance' or 'risk_parity'", "date": date}
+    try:
+        if " " in date:
+            _validate_date_hourly(date)
+        else:
+            _validate_date_daily(date)
+    except ValueError as e:
+        return {"error": str(e), "date": date}
+    window = max(10, min(int(window), 250))
+
+    # Clip to the session's current time; its own bar is still open, so use the one before it
+    as_of, inclusive = (date if " " in date else f"{date} 23:59:59"), True
+    today = get_config_value("TODAY_DATE")
+    if today and today <= as_of:
+        as_of, inclusive = today, False
+
+    if positions is None and weights is None:
+        signature = get_config_value("SIGNATURE")
+        if signature is None:
+            return {"error": "Pass positions or weights, no current session to read holdings from", "date": date}
+        positions, _ = get_latest_position(today or date, signature)
+    holdings = {s: float(v) for s, v in (weights if weights is not None else positions).items() if s != "CASH" and v}
+    if not holdings:
+        return {"error": "Portfolio has no stock holdings", "date": date}
+    if any(value < 0 for value in holdings.values()):
+        return {"error": "Short positions are not supported", "date": date}
+    paths = _group_by_data_path(list(holdings))
+    if len(paths) > 1:
+        return {"error": "Holdings must all be US stocks or all A-shares", "date": date}
+    data_path = next(iter(paths))
+    if not data_path.exists():
+        return {"error": f"Data file not found: {data_path}", "date": date}
+    store = get_price_store(data_path)
+    unknown = [symbol for symbol in holdings if store.get_doc(symbol) is None]
+    if unknown:
+        return {"error": f"No records found for {unknown} in local data", "date": date}
+
+    symbols = list(holdings)
+    bar_time, covariance, last_close = get_covariance_as_of(store, symbols, as_of, window, inclusive)
+    if bar_time is None or np.isnan(covariance).any():
+        return {"error": f"Not enough price history before {date} for a {window}-bar window", "date": date}
+
+    if weights is not None:
+        weight = np.array([holdings[symbol] for symbol in symbols])
+    else:
+        values = np.array([holdings[symbol] for symbol in symbols]) * last_close
+        weight = values / (values.sum() + float(positions.get("CASH", 0)))
+    risk = risk_contributions(covariance, weight)
+
+    def by_symbol(vector: np.ndarray) -> Dict[str, float]:
+        return {symbol: round(float(value), 4) for symbol, value in zip(symbols, vector)}
+
+    result: Dict[str, Any] = {
+        "date": date,
+        "as_of": bar_time,
+        "window": window,
+        "volatility": round(risk["volatility"], 4),
+        "weights": by_symbol(weight),
+        "marginal_risk": by_symbol(risk["marginal"]),
+        "risk_contribution": by_symbol(risk["contribution"] / risk["volatility"] if risk["volatility"] else risk["contribution"]),
+        "top_correlations": [[a, b, round(c, 4)] for a, b, c in top_correlated_pairs(symbols, covariance)],
+    }
+    if suggest:
+        suggested = min_variance_weights(covariance) if suggest == "min_variance" else risk_parity_weights(covariance)
+        suggested = suggested * weight.sum()
+        result["suggestion"] = {
+            "method": suggest,
+            "weights": by_symbol(suggested),
+            "volatility": round(risk_contributions(covariance, suggested)["volatility"], 4),
+        }
+    return result
+
+
 if __name__ == "__main__":
-    
+    # Load prices before binding the port, so the service is only reported ready once warm
+    start = time.perf_counter()
+    symbols = warm_up_price_stores()
+    print(f"🔥 Warm-up done in {time.perf_counter() - start:.2f}s: {symbols} symbols")
+
+    enable_metrics(mcp, "price")
     port = int(os.getenv("GETPRICE_HTTP_PORT", "8003"))
     mcp.run(transport="streamable-http", port=port)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Combined MCP tool host: Math, Search, TradeTools and LocalPrices in one process
+
+The tool servers are mounted without a namespace, so tool names are the same as on the
+separate servers. The host can be reached three ways:
+
+- over streamable HTTP on one port (`python tool_host.py serve`, or
+  `python start_mcp_services.py combined`), with agents using mcp_transport "tool_host"
+- in-process, with no HTTP or JSON-RPC framing over sockets, with agents using
+  mcp_transport "in_process" (see open_in_process_client)
+- through the separate per-tool servers started by start_mcp_services.py (mcp_transport "http")
+
+Run `python tool_host.py bench` to compare per-call overhead of HTTP and in-process calls.
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from fastmcp import Client, FastMCP
+
+# Add project root and this directory to Python path, the tool modules import each other's helpers
+agent_tools_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(agent_tools_dir)
+for path in (project_root, agent_tools_dir):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+load_dotenv()
+
+# Service id -> module defining `mcp`, same choice of search backend as start_mcp_services.py
+TOOL_MODULES = {
+    "math": "tool_math",
+    "search": "tool_alphavantage_news",
+    "trade": "tool_trade",
+    "price": "tool_get_price_local",
+}
+
+_tool_host: Optional[FastMCP] = None
+
+
+def create_tool_host(services: Optional[List[str]] = None) -> FastMCP:
+    """
+    Build a FastMCP server with the tool servers mounted on it
+
+    Args:
+        services: Service ids from TOOL_MODULES, all by default
+
+    Returns:
+        Combined FastMCP server
+    """
+    host = FastMCP("AITraderTools")
+    for service in services or list(TOOL_MODULES):
+        module = importlib.import_module(TOOL_MODULES[service])
+        host.mount(module.mcp)
+    return host
+
+
+def get_tool_host() -> FastMCP:
+    """Get the process-wide combined tool host, created on first use"""
+    global _tool_host
+    if _tool_host is None:
+        _tool_host = create_tool_host()
+    return _tool_host
+
+
+def open_in_process_client() -> Client:
+    """
+    Create a client connected to the combined tool host in this process
+
+    Enter the client inside session_scope(): the host serves the client from tasks started
+    when the client is entered, so the tools see that session's config.
+
+    Returns:
+        Unconnected fastmcp Client (use `async with`)
+    """
+    return Client(get_tool_host())
+
+
+def _wait_until_ready(url: str, timeout: float) -> None:
+    """Poll the host's HTTP endpoint until it accepts MCP sessions"""
+
+    async def probe() -> None:
+        async with Client(url) as client:
+            await client.list_tools()
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            asyncio.run(probe())
+            return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Tool host at {url} not ready after {timeout:.0f}s")
+            time.sleep(0.2)
+
+
+async def _time_calls(client: Client, tool: str, arguments: Dict[str, Any], calls: int) -> List[float]:
+    """Call a tool repeatedly over an open client, returning per-call seconds"""
+    timings = []
+    async with client:
+        await client.call_tool(tool, arguments)  # warm-up
+        for _ in range(calls):
+            start = time.perf_counter()
+            await client.call_tool(tool, arguments)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmark(calls: int, port: int) -> None:
+    """
+    Measure per-tool-call latency: direct function call vs in-process MCP vs HTTP MCP
+
+    Args:
+        calls: Timed calls per tool and transport
+        port: Port for the temporary HTTP tool host
+    """
+    from tool_get_price_local import get_price_local
+    from tool_math import add
+
+    cases = [
+        ("add", {"a": 1.5, "b": 2.5}, add),
+        ("get_price_local", {"symbol": "NVDA", "date": "2025-10-15 11:00:00"}, get_price_local),
+    ]
+
+    url = f"http://localhost:{port}/mcp"
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "serve", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_until_ready(url, timeout=30)
+        print(f"📊 Per-call latency over {calls} calls (median / p95)")
+        for tool, arguments, func in cases:
+            direct = []
+            for _ in range(calls):
+                start = time.perf_counter()
+                func(**arguments)
+                direct.append(time.perf_counter() - start)
+            results = {
+                "direct": direct,
+                "in-process": asyncio.run(_time_calls(open_in_process_client(), tool, arguments, calls)),
+                "http": asyncio.run(_time_calls(Client(url), tool, arguments, calls)),
+            }
+
+            print(f"\n🔧 {tool}")
+            for transport, timings in results.items():
+                timings.sort()
+                median = statistics.median(timings)
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                print(f"   {transport:<11} {median * 1e6:10.1f} µs  {p95 * 1e6:10.1f} µs")
+            overhead = statistics.median(results["http"]) - statistics.median(results["in-process"])
+            print(f"   HTTP adds {overhead * 1e6:.1f} µs per call over in-process")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Combined MCP tool host")
+    subparsers = parser.add_subparsers(dest="command")
+    serve_parser = subparsers.add_parser("serve", help="Serve all tools over streamable HTTP (default)")
+    serve_parser.add_argument("--port", type=int, default=int(os.getenv("TOOL_HOST_HTTP_PORT", "8010")))
+    bench_parser = subparsers.add_parser("bench", help="Benchmark HTTP vs in-process tool call overhead")
+    bench_parser.add_argument("--calls", type=int, default=200)
+    bench_parser.add_argument("--port", type=int, default=18010, help="Port for the temporary HTTP host")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        run_benchmark(args.calls, args.port)
+    else:
+        from tools.ledger_tools import warm_up_ledger_indexes
+        from tools.price_store import warm_up_price_stores
+        from tools.tool_metrics import enable_metrics
+
+        port = getattr(args, "port", int(os.getenv("TOOL_HOST_HTTP_PORT", "8010")))
+        host = get_tool_host()
+        enable_metrics(host, "tool_host")
+        # Load prices and ledger indexes before binding the port, so the host is only reported ready once warm
+        start = time.perf_counter()
+        symbols = warm_up_price_stores()
+        ledgers = warm_up_ledger_indexes()
+        print(f"🔥 Warm-up done in {time.perf_counter() - start:.2f}s: {symbols} symbols, {ledgers} ledgers")
+        host.run(transport="streamable-http", port=port)
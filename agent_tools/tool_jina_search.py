@@ -1,24 +1,37 @@
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import httpx
 import requests
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 
 load_dotenv()
+import asyncio
 import json
 import os
-import random
 import re
 import sys
 from datetime import datetime, timedelta
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from tools.general_tools import get_config_value
+from tools.circuit_breaker import CircuitOpenError, get_breaker, is_outage
+from tools.async_http import get_http_pool
+from tools.general_tools import get_config_value, request_session, request_timeout
+from tools.search_cache import get_search_cache, search_cache_mode
+from tools.tool_cache import memoize
+from tools.tool_metrics import enable_metrics, instrument
 
 logger = logging.getLogger(__name__)
 
+# Search hits requested from Jina, pages scraped per call (in search rank order), seconds
+# allowed per page and for the whole concurrent scrape
+SEARCH_RESULTS = int(os.getenv("SEARCH_RESULTS", "10"))
+SEARCH_TOP_K = int(os.getenv("SEARCH_TOP_K", "3"))
+SEARCH_SCRAPE_TIMEOUT = float(os.getenv("SEARCH_SCRAPE_TIMEOUT", "15"))
+SEARCH_SCRAPE_BUDGET = float(os.getenv("SEARCH_SCRAPE_BUDGET", "20"))
+
 
 def parse_date_to_standard(date_str: str) -> str:
     """
@@ -101,41 +114,114 @@ def parse_date_to_standard(date_str: str) -> str:
 class WebScrapingJinaTool:
     def __init__(self):
         self.api_key = os.environ.get("JINA_API_KEY")
-        if not self.api_key:
+        self.replay = search_cache_mode() == "replay"
+        # Replay mode serves recorded results only and needs no key
+        if not self.api_key and not self.replay:
             raise ValueError("Jina API key not provided! Please set JINA_API_KEY environment variable.")
+        self.cache = get_search_cache()
+        self._network_allowed = False
+
+    def _require_network(self, what: str) -> None:
+        """Check, once per call, that Jina may be contacted for a cache miss"""
+        if self.replay:
+            raise LookupError(f"{what} is not in the search cache (SEARCH_CACHE=replay)")
+        if not self._network_allowed:
+            breaker = get_breaker("jina")
+            if not breaker.allow():
+                raise CircuitOpenError(breaker.unavailable_message())
+            self._network_allowed = True
 
     def __call__(self, query: str) -> List[Dict[str, Any]]:
         print(f"Searching for {query}")
-        all_urls = self._jina_search(query)
-        return_content = []
+        today_date = get_config_value("TODAY_DATE")
+        all_urls = self.cache.get_search(query, today_date, self.replay) if self.cache else None
+        if all_urls is None:
+            self._require_network(f"Search query '{query}'")
+            all_urls = self._jina_search(query)
+            if self.cache and all_urls:
+                self.cache.put_search(query, today_date, all_urls)
         print(f"Found {len(all_urls)} URLs")
-        if len(all_urls) > 1:
-            # Randomly select three to form new all_urls
-            all_urls = random.sample(all_urls, 1)
-        for url in all_urls:
-            print(f"Scraping {url}")
-            return_content.append(self._jina_scrape(url))
-            print(f"Scraped {url}")
+
+        return_content = []
+        missing = []
+        for url in all_urls[:SEARCH_TOP_K]:
+            page = self.cache.get_page(url, self.replay) if self.cache else None
+            if page is None:
+                missing.append(url)
+            else:
+                return_content.append(page)
+        if missing and self.replay:
+            # Pages that failed in the recorded run were not stored
+            if not return_content:
+                raise LookupError(f"Pages for '{query}' are not in the search cache (SEARCH_CACHE=replay)")
+            missing = []
+        if missing:
+            self._require_network(f"Pages for '{query}'")
+            budget = request_timeout(SEARCH_SCRAPE_BUDGET)
+            print(f"Scraping {len(missing)} URLs concurrently (budget {budget:.0f}s)")
+            pool = get_http_pool()
+            scraped = pool.run(
+                self._scrape_all(pool.client, missing, min(SEARCH_SCRAPE_TIMEOUT, budget), budget), timeout=budget + 5
+            )
+            for url, page in scraped:
+                if self.cache and "error" not in page:
+                    self.cache.put_page(url, page)
+                return_content.append(page)
 
         return return_content
 
-    def _jina_scrape(self, url: str) -> Dict[str, Any]:
+    async def _scrape_all(
+        self, client: httpx.AsyncClient, urls: List[str], timeout: float, budget: float
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Scrape pages concurrently, collecting them in the order they complete
+
+        Args:
+            client: Shared async HTTP client
+            urls: Page URLs
+            timeout: Seconds allowed per page
+            budget: Seconds allowed for all pages; pages still loading then are dropped
+
+        Returns:
+            [(url, scraped page or {"url", "content", "error"})]
+        """
+        tasks = {asyncio.ensure_future(self._jina_scrape(client, url, timeout)): url for url in urls}
+        scraped = []
+        try:
+            for next_page in asyncio.as_completed(tasks, timeout=budget):
+                scraped.append(await next_page)
+        except asyncio.TimeoutError:
+            print(f"⚠️ Scrape budget of {budget:.0f}s used up, returning {len(scraped)}/{len(urls)} pages")
+        finally:
+            for task in tasks:
+                task.cancel()
+        return scraped
+
+    async def _jina_scrape(self, client: httpx.AsyncClient, url: str, timeout: float) -> Tuple[str, Dict[str, Any]]:
         try:
             jina_url = f"https://r.jina.ai/{url}"
             headers = {
                 "Accept": "application/json",
                 "Authorization": self.api_key,
-                "X-Timeout": "10",
+                "X-Timeout": str(max(1, int(timeout) - 1)),
                 "X-With-Generated-Alt": "true",
             }
-            response = requests.get(jina_url, headers=headers)
+            try:
+                response = await client.get(jina_url, headers=headers, timeout=timeout)
+            except httpx.TransportError:
+                get_breaker("jina").record_failure()
+                raise
+            if response.status_code == 200:
+                get_breaker("jina").record_success()
+            elif is_outage(response.status_code):
+                get_breaker("jina").record_failure()
 
             if response.status_code != 200:
                 raise Exception(f"Jina AI Reader Failed for {url}: {response.status_code}")
 
             response_dict = response.json()
 
-            return {
+            return url, {
                 "url": response_dict["data"]["url"],
                 "title": response_dict["data"]["title"],
                 "description": response_dict["data"]["description"],
@@ -144,11 +230,11 @@ class WebScrapingJinaTool:
             }
 
         except Exception as e:
-            logger.error(str(e))
-            return {"url": url, "content": "", "error": str(e)}
+            logger.error(f"{type(e).__name__}: {e}")
+            return url, {"url": url, "content": "", "error": str(e) or type(e).__name__}
 
     def _jina_search(self, query: str) -> List[str]:
-        url = f"https://s.jina.ai/?q={query}&n=1"
+        url = f"https://s.jina.ai/?q={query}&n={SEARCH_RESULTS}"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
@@ -156,7 +242,11 @@ class WebScrapingJinaTool:
         }
 
         try:
-            response = requests.get(url, headers=headers)
+            response = requests.get(url, headers=headers, timeout=request_timeout(30))
+            if is_outage(response.status_code):
+                get_breaker("jina").record_failure()
+            else:
+                get_breaker("jina").record_success()
             response.raise_for_status()  # 检查HTTP状态码
 
             json_data = response.json()
@@ -172,6 +262,8 @@ class WebScrapingJinaTool:
 
             all_urls = []
             filtered_urls = []
+            # Read once per search, not once per result
+            today_date = get_config_value("TODAY_DATE")
 
             # Process search results, filter out content from TODAY_DATE and later
             for item in json_data.get("data", []):
@@ -188,7 +280,6 @@ class WebScrapingJinaTool:
                     continue
 
                 # Check if before TODAY_DATE
-                today_date = get_config_value("TODAY_DATE")
                 if today_date:
                     if today_date > standardized_date:
                         filtered_urls.append(item["url"])
@@ -200,6 +291,9 @@ class WebScrapingJinaTool:
             return filtered_urls
 
         except requests.exceptions.RequestException as e:
+            if e.response is None:
+                # Timeout or connection error, no answer from the service at all
+                get_breaker("jina").record_failure()
             print(f"❌ Jina API request failed: {e}")
             return []
         except ValueError as e:
@@ -214,6 +308,9 @@ mcp = FastMCP("Search")
 
 
 @mcp.tool()
+@instrument
+@request_session
+@memoize
 def get_information(query: str) -> str:
     """
     Use search tool to scrape and return main content information related to specified query in a structured way.
@@ -229,7 +326,8 @@ def get_information(query: str) -> str:
         - Publish Time: Content publication date (if available)
         - Content: Main text content of the web page (first 1000 characters)
 
-        If scraping fails, returns corresponding error information.
+        If scraping fails, returns corresponding error information. While Jina is failing
+        repeatedly, returns an "unavailable" message at once without calling it.
     """
     try:
         tool = WebScrapingJinaTool()
@@ -270,11 +368,14 @@ Content: {result['content'][:1000]}...
 
         return "\n".join(formatted_results)
 
+    except CircuitOpenError as e:
+        return str(e)
     except Exception as e:
         return f"❌ Search tool execution failed: {str(e)}"
 
 
 if __name__ == "__main__":
     # Run with streamable-http, support configuring host and port through environment variables to avoid conflicts
+    enable_metrics(mcp, "search")
     port = int(os.getenv("SEARCH_HTTP_PORT", "8001"))
     mcp.run(transport="streamable-http", port=port)
@@ -1,17 +1,21 @@
 import os
+from typing import Any, Dict, List, Optional, Union
 
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools.expression_tools import evaluate_expressions
 from tools.general_tools import get_config_value
+from tools.tool_metrics import enable_metrics, instrument
 load_dotenv()
 
 mcp = FastMCP("Math")
 
 
 @mcp.tool()
+@instrument
 def add(a: float, b: float) -> float:
     """Add two numbers (supports int and float)"""
     # log_file = get_config_value("LOG_FILE")
@@ -26,6 +30,7 @@ def add(a: float, b: float) -> float:
 
 
 @mcp.tool()
+@instrument
 def multiply(a: float, b: float) -> float:
     """Multiply two numbers (supports int and float)"""
     # log_file = get_config_value("LOG_FILE")
@@ -39,6 +44,26 @@ def multiply(a: float, b: float) -> float:
     return float(a) * float(b)
 
 
+@mcp.tool()
+@instrument
+def evaluate(expressions: List[str], variables: Optional[Dict[str, Union[float, List[float]]]] = None) -> Dict[str, Any]:
+    """Evaluate many arithmetic expressions in one call, e.g. to size all orders of a rebalance.
+
+    Supports + - * / // % **, parentheses and abs, round, floor, ceil, sqrt, log, exp, min, max, sum, mean.
+    Write "name = expression" to reuse a result in later expressions. Variables may be lists of
+    equal length, which are computed element-wise (min/max/sum/mean of one list reduce it).
+
+    Args:
+        expressions: e.g. ["budget = cash * 0.1", "shares = floor(budget / prices)", "sum(shares * prices)"]
+        variables: e.g. {"cash": 10000, "prices": [182.5, 250.1]}
+
+    Returns:
+        Dictionary with 'results' (one value or {"error": ...} per expression) and assigned 'variables'.
+    """
+    return evaluate_expressions(expressions, variables or {})
+
+
 if __name__ == "__main__":
+    enable_metrics(mcp, "math")
     port = int(os.getenv("MATH_HTTP_PORT", "8000"))
     mcp.run(transport="streamable-http", port=port)
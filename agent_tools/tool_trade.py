@@ -1,22 +1,28 @@
 import os
 import sys
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from fastmcp import FastMCP
 
-from typing import Dict, List, Optional, Any
 import fcntl
 from pathlib import Path
 # Add project root directory to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
-import json
 
-from tools.general_tools import get_config_value, write_config_value
+from tools.general_tools import (get_config_value, request_session,
+                                 write_config_value)
+from tools.tool_metrics import enable_metrics, instrument
+from tools.json_codec import dumps
+from tools.ledger_tools import (get_ledger_index, make_position_record,
+                                to_sparse_positions, warm_up_ledger_indexes)
 from tools.price_tools import (get_latest_position, get_open_prices,
                                get_yesterday_date,
                                get_yesterday_open_and_close_price,
                                get_yesterday_profit)
+from tools.price_store import warm_up_price_stores
 
 mcp = FastMCP("TradeTools")
 
@@ -24,7 +30,8 @@ def _position_lock(signature: str):
     """Context manager for file-based lock to serialize position updates per signature."""
     class _Lock:
         def __init__(self, name: str):
-            base_dir = Path(project_root) / "data" / "agent_data" / name
+            # Next to the ledger, so sessions with their own LOG_PATH lock their own files
+            base_dir = Path(_get_position_file_path(name)).parents[1]
             base_dir.mkdir(parents=True, exist_ok=True)
             self.lock_path = base_dir / ".position.lock"
             # Ensure lock file exists
@@ -42,6 +49,8 @@ def _position_lock(signature: str):
 
 
 @mcp.tool()
+@instrument
+@request_session
 def buy(symbol: str, amount: int) -> Dict[str, Any]:
     """
     Buy stock function
@@ -143,8 +152,8 @@ def buy(symbol: str, amount: int) -> Dict[str, Any]:
         # Decrease cash balance
         new_position["CASH"] = cash_left
 
-        # Increase stock position quantity
-        new_position[symbol] += amount
+        # Increase stock position quantity (sparse positions omit symbols not held)
+        new_position[symbol] = new_position.get(symbol, 0) + amount
 
         # Step 6: Record transaction to position.jsonl file
         # Build file path: {project_root}/data/{log_path}/{signature}/position/position.jsonl
@@ -154,66 +163,73 @@ def buy(symbol: str, amount: int) -> Dict[str, Any]:
         if log_path.startswith("./data/"):
             log_path = log_path[7:]  # Remove "./data/" prefix
         position_file_path = os.path.join(project_root, "data", log_path, signature, "position", "position.jsonl")
+        record = make_position_record(
+            today_date, current_action_id + 1, new_position, {"action": "buy", "symbol": symbol, "amount": amount}
+        )
         with open(position_file_path, "a") as f:
             # Write JSON format transaction record, containing date, operation ID, transaction details and updated position
-            print(
-                f"Writing to position.jsonl: {json.dumps({'date': today_date, 'id': current_action_id + 1, 'this_action':{'action':'buy','symbol':symbol,'amount':amount},'positions': new_position})}"
-            )
-            f.write(
-                json.dumps(
-                    {
-                        "date": today_date,
-                        "id": current_action_id + 1,
-                        "this_action": {"action": "buy", "symbol": symbol, "amount": amount},
-                        "positions": new_position,
-                    }
-                )
-                + "\n"
-            )
+            print(f"Writing to position.jsonl: {dumps(record)}")
+            f.write(dumps(record) + "\n")
         # Step 7: Return updated position
         write_config_value("IF_TRADE", True)
         print("IF_TRADE", get_config_value("IF_TRADE"))
-        return new_position
+        return record["positions"]
 
 
-def _get_today_buy_amount(symbol: str, today_date: str, signature: str) -> int:
+def _get_position_file_path(signature: str) -> str:
+    """Build the position.jsonl path for a signature from the configured LOG_PATH."""
+    log_path = get_config_value("LOG_PATH", "./data/agent_data")
+    if log_path.startswith("./data/"):
+        log_path = log_path[7:]  # Remove "./data/" prefix
+    return os.path.join(project_root, "data", log_path, signature, "position", "position.jsonl")
+
+
+def _get_today_buy_amounts(today_date: str, signature: str) -> Dict[str, int]:
     """
-    Helper function to get the total amount bought today for T+1 restriction check
+    Helper function to get the total amount bought today for every symbol in one ledger pass
 
     Args:
-        symbol: Stock symbol
         today_date: Trading date
         signature: Model signature
 
     Returns:
-        Total shares bought today
+        {symbol: shares bought today}
     """
-    log_path = get_config_value("LOG_PATH", "./data/agent_data")
-    if log_path.startswith("./data/"):
-        log_path = log_path[7:]  # Remove "./data/" prefix
-    position_file_path = os.path.join(project_root, "data", log_path, signature, "position", "position.jsonl")
+    position_file_path = _get_position_file_path(signature)
 
     if not os.path.exists(position_file_path):
-        return 0
+        return {}
 
-    total_bought_today = 0
-    with open(position_file_path, "r") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                record = json.loads(line)
-                if record.get("date") == today_date:
-                    this_action = record.get("this_action", {})
-                    if this_action.get("action") == "buy" and this_action.get("symbol") == symbol:
-                        total_bought_today += this_action.get("amount", 0)
-            except Exception:
-                continue
+    bought_today: Dict[str, int] = {}
+    index = get_ledger_index(position_file_path)
+    for record in index.records(today_date):
+        # Compacted ledgers keep a session's actions in "intraday" (see tools/ledger_tools.py)
+        for this_action in record.get("intraday") or [record.get("this_action", {})]:
+            if this_action.get("action") == "buy":
+                symbol = this_action.get("symbol")
+                bought_today[symbol] = bought_today.get(symbol, 0) + this_action.get("amount", 0)
+
+    return bought_today
+
+
+def _get_today_buy_amount(symbol: str, today_date: str, signature: str) -> int:
+    """
+    Helper function to get the total amount bought today for T+1 restriction check
 
-    return total_bought_today
+    Args:
+        symbol: Stock symbol
+        today_date: Trading date
+        signature: Model signature
+
+    Returns:
+        Total shares bought today
+    """
+    return _get_today_buy_amounts(today_date, signature).get(symbol, 0)
 
 
 @mcp.tool()
+@instrument
+@request_session
 def sell(symbol: str, amount: int) -> Dict[str, Any]:
     """
     Sell stock function
@@ -340,26 +356,398 @@ def sell(symbol: str, amount: int) -> Dict[str, Any]:
     if log_path.startswith("./data/"):
         log_path = log_path[7:]  # Remove "./data/" prefix
     position_file_path = os.path.join(project_root, "data", log_path, signature, "position", "position.jsonl")
+    record = make_position_record(
+        today_date, current_action_id + 1, new_position, {"action": "sell", "symbol": symbol, "amount": amount}
+    )
     with open(position_file_path, "a") as f:
         # Write JSON format transaction record, containing date, operation ID and updated position
-        print(
-            f"Writing to position.jsonl: {json.dumps({'date': today_date, 'id': current_action_id + 1, 'this_action':{'action':'sell','symbol':symbol,'amount':amount},'positions': new_position})}"
+        print(f"Writing to position.jsonl: {dumps(record)}")
+        f.write(dumps(record) + "\n")
+
+    # Step 7: Return updated position
+    write_config_value("IF_TRADE", True)
+    return record["positions"]
+
+
+
+@mcp.tool()
+@instrument
+@request_session
+def execute_orders(orders: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Batch order function
+
+    Executes a list of buy and sell orders against one consistent snapshot of the
+    position ledger and today's opening prices, including the following steps:
+    1. Get current position, operation ID and today's buys once (under the position lock)
+    2. Get opening prices for all ordered symbols in one pass
+    3. Apply all sell orders first, then all buy orders, validating each one
+       (sufficient shares/cash, lot size and T+1 for CN market)
+    4. Record every filled order to position.jsonl in a single append
+
+    Args:
+        orders: List of orders, each a dictionary such as
+                {"action": "buy", "symbol": "AAPL", "amount": 10} or
+                {"action": "sell", "symbol": "600519.SH", "amount": 100}
+                For Chinese A-shares (symbols ending with .SH or .SZ), amounts must be multiples of 100
+                and shares bought today cannot be sold today (T+1 rule)
+
+    Returns:
+        Dict[str, Any]:
+          - "results": per-order status in the original order, each with "status" of
+            "filled" (with "price") or "rejected" (with "error")
+          - "positions": position dictionary after all filled orders
+          - "filled" / "rejected": number of filled and rejected orders
+          - Failure of the whole batch: Returns {"error": error message, ...} dictionary
+
+    Raises:
+        ValueError: Raised when SIGNATURE environment variable is not set
+
+    Example:
+        >>> result = execute_orders([
+        ...     {"action": "sell", "symbol": "MSFT", "amount": 5},
+        ...     {"action": "buy", "symbol": "AAPL", "amount": 10},
+        ... ])
+        >>> print(result["results"])  # [{"index": 0, "status": "filled", ...}, {"index": 1, "status": "filled", ...}]
+    """
+    # Step 1: Get environment variables and basic information
+    signature = get_config_value("SIGNATURE")
+    if signature is None:
+        raise ValueError("SIGNATURE environment variable is not set")
+
+    today_date = get_config_value("TODAY_DATE")
+
+    if not isinstance(orders, list) or not orders:
+        return {"error": "orders must be a non-empty list of {action, symbol, amount} dictionaries", "date": today_date}
+
+    # Normalize orders and reject malformed ones up front, keeping their original index
+    results, pending = _normalize_orders(orders)
+
+    # Hold the lock for the whole read-validate-write cycle so the batch sees one consistent snapshot
+    with _position_lock(signature):
+        # Step 1 (cont.): Snapshot of latest position, operation ID and today's buys
+        try:
+            current_position, current_action_id = get_latest_position(today_date, signature)
+        except Exception as e:
+            return {"error": f"Failed to load latest position: {e}", "date": today_date}
+        bought_today = _get_today_buy_amounts(today_date, signature)
+
+        # Step 2: Get opening prices for all symbols, one pass per market
+        prices = _get_open_prices_by_market(today_date, [o["symbol"] for o in pending])
+
+        # Step 3: Apply sells before buys so that sale proceeds can fund purchases
+        new_position, records = _fill_orders(
+            today_date, pending, results, current_position, current_action_id, bought_today, prices
         )
-        f.write(
-            json.dumps(
-                {
-                    "date": today_date,
-                    "id": current_action_id + 1,
-                    "this_action": {"action": "sell", "symbol": symbol, "amount": amount},
-                    "positions": new_position,
+
+        # Step 4: Record all filled orders to position.jsonl in one append
+        _append_position_records(signature, records)
+
+    if records:
+        write_config_value("IF_TRADE", True)
+
+    return _orders_response(today_date, results, new_position)
+
+
+def _normalize_orders(orders: List[Any]) -> Tuple[List[Optional[Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Validate order dictionaries without touching the ledger
+
+    Args:
+        orders: Raw orders as passed to execute_orders
+
+    Returns:
+        (results, pending): per-order results with rejections filled in (None for valid orders),
+        and the valid orders with "index", "action", "symbol", integer "amount" and "market"
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(orders)
+    pending: List[Dict[str, Any]] = []
+    for index, order in enumerate(orders):
+        if not isinstance(order, dict):
+            results[index] = {"index": index, "status": "rejected", "error": "Order must be a dictionary"}
+            continue
+        action = str(order.get("action", "")).lower()
+        symbol = order.get("symbol")
+        amount = order.get("amount")
+        result = {"index": index, "action": action, "symbol": symbol, "amount": amount}
+        if action not in ("buy", "sell"):
+            results[index] = {**result, "status": "rejected", "error": "action must be 'buy' or 'sell'"}
+            continue
+        if not isinstance(symbol, str) or not symbol:
+            results[index] = {**result, "status": "rejected", "error": "symbol must be a non-empty string"}
+            continue
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)) or amount != int(amount) or amount <= 0:
+            results[index] = {**result, "status": "rejected", "error": "amount must be a positive integer"}
+            continue
+        amount = int(amount)
+        market = "cn" if symbol.endswith((".SH", ".SZ")) else "us"
+        # 🇨🇳 Chinese A-shares trading rule: Must trade in lots of 100 shares (一手 = 100股)
+        if market == "cn" and amount % 100 != 0:
+            results[index] = {
+                **result,
+                "status": "rejected",
+                "error": f"Chinese A-shares must be traded in multiples of 100 shares (1 lot = 100 shares). You tried to {action} {amount} shares.",
+                "suggestion": f"Please use {(amount // 100) * 100} or {((amount // 100) + 1) * 100} shares instead.",
+            }
+            continue
+        pending.append({**result, "amount": amount, "market": market})
+    return results, pending
+
+
+def _get_open_prices_by_market(today_date: str, symbols: List[str]) -> Dict[str, Optional[float]]:
+    """Get opening prices ({symbol_price: price}) for US and A-share symbols, one pass per market"""
+    prices: Dict[str, Optional[float]] = {}
+    for market in ("us", "cn"):
+        market_symbols = sorted({s for s in symbols if ("cn" if s.endswith((".SH", ".SZ")) else "us") == market})
+        if market_symbols:
+            prices.update(get_open_prices(today_date, market_symbols, market=market))
+    return prices
+
+
+def _fill_orders(
+    today_date: str,
+    pending: List[Dict[str, Any]],
+    results: List[Optional[Dict[str, Any]]],
+    current_position: Dict[str, float],
+    current_action_id: int,
+    bought_today: Dict[str, int],
+    prices: Dict[str, Optional[float]],
+) -> Tuple[Dict[str, float], List[Dict[str, Any]]]:
+    """
+    Apply validated orders to a position snapshot, sells before buys
+
+    Must be called under _position_lock with a snapshot read under the same lock.
+
+    Args:
+        today_date: Trading date
+        pending: Orders from _normalize_orders
+        results: Per-order results, filled in place
+        current_position: Latest position
+        current_action_id: Latest operation ID
+        bought_today: {symbol: shares bought today}, updated in place
+        prices: Opening prices from _get_open_prices_by_market
+
+    Returns:
+        (new_position, records): position after the filled orders and one ledger record per fill
+    """
+    new_position = current_position.copy()
+    records = []
+    ordered = [o for o in pending if o["action"] == "sell"] + [o for o in pending if o["action"] == "buy"]
+    for order in ordered:
+        index, action, symbol, amount = order["index"], order["action"], order["symbol"], order["amount"]
+        result = {"index": index, "action": action, "symbol": symbol, "amount": amount}
+        price = prices.get(f"{symbol}_price")
+        if price is None:
+            results[index] = {**result, "status": "rejected", "error": f"Symbol {symbol} not found! This action will not be allowed."}
+            continue
+
+        if action == "sell":
+            have = new_position.get(symbol, 0)
+            if have < amount:
+                results[index] = {**result, "status": "rejected", "error": "Insufficient shares! This action will not be allowed.", "have": have}
+                continue
+            # 🇨🇳 Chinese A-shares T+1 trading rule: Cannot sell shares bought on the same day
+            if order["market"] == "cn" and bought_today.get(symbol, 0) > 0:
+                sellable_amount = have - bought_today[symbol]
+                if amount > sellable_amount:
+                    results[index] = {
+                        **result,
+                        "status": "rejected",
+                        "error": f"T+1 restriction violated! You bought {bought_today[symbol]} shares of {symbol} today and cannot sell them until tomorrow.",
+                        "sellable_today": max(0, sellable_amount),
+                    }
+                    continue
+            new_position[symbol] = have - amount
+            new_position["CASH"] = new_position.get("CASH", 0) + price * amount
+        else:
+            required_cash = price * amount
+            if new_position.get("CASH", 0) - required_cash < 0:
+                results[index] = {
+                    **result,
+                    "status": "rejected",
+                    "error": "Insufficient cash! This action will not be allowed.",
+                    "required_cash": required_cash,
+                    "cash_available": new_position.get("CASH", 0),
                 }
+                continue
+            new_position["CASH"] = new_position.get("CASH", 0) - required_cash
+            new_position[symbol] = new_position.get(symbol, 0) + amount
+            bought_today[symbol] = bought_today.get(symbol, 0) + amount
+
+        current_action_id += 1
+        records.append(
+            make_position_record(
+                today_date, current_action_id, new_position, {"action": action, "symbol": symbol, "amount": amount}
             )
-            + "\n"
         )
+        results[index] = {**result, "status": "filled", "price": price, "id": current_action_id}
+    return new_position, records
 
-    # Step 7: Return updated position
-    write_config_value("IF_TRADE", True)
-    return new_position
+
+def _append_position_records(signature: str, records: List[Dict[str, Any]]) -> None:
+    """Append ledger records to position.jsonl in a single write (call under _position_lock)"""
+    if not records:
+        return
+    position_file_path = _get_position_file_path(signature)
+    with open(position_file_path, "a") as f:
+        f.write("".join(dumps(record) + "\n" for record in records))
+    print(f"Writing {len(records)} records to position.jsonl")
+
+
+def _orders_response(
+    today_date: str, results: List[Dict[str, Any]], new_position: Dict[str, float]
+) -> Dict[str, Any]:
+    """Build the execute_orders result dictionary"""
+    filled = sum(1 for r in results if r["status"] == "filled")
+    return {
+        "date": today_date,
+        "results": results,
+        "positions": to_sparse_positions(new_position),
+        "filled": filled,
+        "rejected": len(results) - filled,
+    }
+
+@mcp.tool()
+@instrument
+@request_session
+def plan_rebalance(
+    target_weights: Dict[str, float], date: Optional[str] = None, execute: bool = False
+) -> Dict[str, Any]:
+    """
+    Rebalance planner
+
+    Computes the integer share orders that move the current position to target portfolio
+    weights at the day's opening prices, including the following steps:
+    1. Read the latest position and today's buys (under the position lock)
+    2. Value the portfolio at opening prices (cash + holdings)
+    3. Round each target to whole shares (lots of 100 for CN market), sell holdings not in
+       the targets, cap sells at the T+1 sellable quantity and scale buys down to the cash available
+    4. Optionally execute all orders atomically, as execute_orders would
+
+    Args:
+        target_weights: {symbol: weight}, weights of total portfolio value, each >= 0 and summing to
+                        at most 1 (the rest stays in cash), e.g. {"NVDA": 0.3, "AAPL": 0.2}
+        date: Trading date, defaults to today. Only today's plan can be executed
+        execute: Execute the planned orders instead of only returning them
+
+    Returns:
+        Dict[str, Any]:
+          - "orders": planned orders [{"action", "symbol", "amount", "price"}], sells first
+          - "total_value", "cash" and "cash_after": portfolio value and cash before/after the orders
+          - "targets": {"columns": [...], "rows": [...]} with price, current, target shares and resulting weight
+          - "notes": adjustments made (lot rounding, T+1, cash limits, symbols without price)
+          - "execution": execute_orders-style results, only when execute is True
+          - Failure: Returns {"error": error message, ...} dictionary
+
+    Raises:
+        ValueError: Raised when SIGNATURE environment variable is not set
+
+    Example:
+        >>> plan = plan_rebalance({"NVDA": 0.5, "AAPL": 0.3})
+        >>> print(plan["orders"])  # [{"action": "sell", "symbol": "MSFT", ...}, {"action": "buy", "symbol": "NVDA", ...}]
+    """
+    signature = get_config_value("SIGNATURE")
+    if signature is None:
+        raise ValueError("SIGNATURE environment variable is not set")
+
+    today_date = get_config_value("TODAY_DATE")
+    date = date or today_date
+    if today_date and date > today_date:
+        return {"error": f"Cannot plan for {date}, after today {today_date}", "date": date}
+    if execute and date != today_date:
+        return {"error": f"Only today's plan can be executed, got date {date}", "date": date}
+
+    if not isinstance(target_weights, dict):
+        return {"error": "target_weights must be a {symbol: weight} dictionary", "date": date}
+    for symbol, weight in target_weights.items():
+        if symbol == "CASH" or isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+            return {"error": f"Invalid target weight {symbol}: {weight}", "date": date}
+    if sum(target_weights.values()) > 1 + 1e-9:
+        return {"error": f"Target weights sum to {sum(target_weights.values()):.4f}, more than 1", "date": date}
+
+    with _position_lock(signature):
+        # Step 1: Snapshot of latest position and today's buys
+        try:
+            current_position, current_action_id = get_latest_position(date, signature)
+        except Exception as e:
+            return {"error": f"Failed to load latest position: {e}", "date": date}
+        bought_today = _get_today_buy_amounts(date, signature)
+
+        # Step 2: Value the portfolio at opening prices
+        held = [symbol for symbol, amount in current_position.items() if symbol != "CASH" and amount]
+        prices = _get_open_prices_by_market(date, list(target_weights) + held)
+        unpriced = [symbol for symbol in target_weights if prices.get(f"{symbol}_price") is None]
+        if unpriced:
+            return {"error": f"No opening price on {date} for {unpriced}", "date": date}
+        notes = []
+        stale = [symbol for symbol in held if prices.get(f"{symbol}_price") is None]
+        if stale:
+            notes.append(f"Kept {stale} unchanged and out of the total value: no opening price on {date}")
+        symbols = list(dict.fromkeys(list(target_weights) + [symbol for symbol in held if symbol not in stale]))
+
+        price = np.array([prices[f"{symbol}_price"] for symbol in symbols], dtype=float)
+        current = np.array([current_position.get(symbol, 0) for symbol in symbols], dtype=float)
+        weight = np.array([target_weights.get(symbol, 0.0) for symbol in symbols], dtype=float)
+        lot = np.array([100.0 if symbol.endswith((".SH", ".SZ")) else 1.0 for symbol in symbols])
+        cash = float(current_position.get("CASH", 0))
+        total_value = cash + float(current @ price)
+
+        # Step 3: Whole-lot targets, sells capped by T+1, buys scaled to the cash available
+        target = np.floor(weight * total_value / price / lot + 1e-9) * lot
+        sells = np.clip(current - target, 0, None)
+        sellable = current - np.array(
+            [bought_today.get(symbol, 0) if symbol.endswith((".SH", ".SZ")) else 0 for symbol in symbols], dtype=float
+        )
+        capped = sells > np.clip(sellable, 0, None)
+        if capped.any():
+            notes.append(f"T+1: can only sell shares held before today for {[symbols[i] for i in np.flatnonzero(capped)]}")
+            sells = np.minimum(sells, np.clip(sellable, 0, None))
+        sells = np.floor(sells / lot) * lot
+        buys = np.clip(target - current, 0, None)
+        cash_available = cash + float(sells @ price)
+        cost = float(buys @ price)
+        if cost > cash_available + 1e-9:
+            notes.append(f"Buys scaled down by {cash_available / cost:.4f} to fit the cash available")
+            buys = np.floor(buys * (cash_available / cost) / lot) * lot
+        final = current - sells + buys
+
+        orders = [
+            {"action": "sell", "symbol": symbols[i], "amount": int(sells[i]), "price": float(price[i])}
+            for i in np.flatnonzero(sells)
+        ] + [
+            {"action": "buy", "symbol": symbols[i], "amount": int(buys[i]), "price": float(price[i])}
+            for i in np.flatnonzero(buys)
+        ]
+        plan = {
+            "date": date,
+            "orders": orders,
+            "total_value": round(total_value, 2),
+            "cash": round(cash, 2),
+            "cash_after": round(cash_available - float(buys @ price), 2),
+            "targets": {
+                "columns": ["symbol", "price", "current", "target", "weight_after"],
+                "rows": [
+                    [symbols[i], float(price[i]), int(current[i]), int(final[i]),
+                     round(float(final[i] * price[i] / total_value), 4) if total_value else 0.0]
+                    for i in range(len(symbols))
+                ],
+            },
+            "notes": notes,
+        }
+
+        # Step 4: Execute atomically against the same snapshot
+        if not execute:
+            return plan
+        results, pending = _normalize_orders(orders)
+        new_position, records = _fill_orders(
+            date, pending, results, current_position, current_action_id, bought_today, prices
+        )
+        _append_position_records(signature, records)
+
+    if records:
+        write_config_value("IF_TRADE", True)
+    plan["execution"] = _orders_response(date, results, new_position)
+    return plan
 
 
 if __name__ == "__main__":
@@ -367,5 +755,12 @@ if __name__ == "__main__":
     # print(new_result)
     # new_result = sell("AAPL", 1)
     # print(new_result)
+    # Load prices and ledger indexes before binding the port, so the service is only reported ready once warm
+    start = time.perf_counter()
+    symbols = warm_up_price_stores()
+    ledgers = warm_up_ledger_indexes()
+    print(f"🔥 Warm-up done in {time.perf_counter() - start:.2f}s: {symbols} symbols, {ledgers} ledgers")
+
+    enable_metrics(mcp, "trade")
     port = int(os.getenv("TRADE_HTTP_PORT", "8002"))
     mcp.run(transport="streamable-http", port=port)
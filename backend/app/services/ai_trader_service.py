@@ -33,6 +33,11 @@ except ImportError as e:
     print(f"Warning: Could not import AI-Trader modules: {e}")
     # Provide fallback functionality
 
+try:
+    from tools.ledger_tools import load_ledger_records
+except ImportError:
+    load_ledger_records = None
+
 
 class AITraderService:
     """Service for integrating with the existing AI-Trader system"""
@@ -321,15 +326,21 @@ class AITraderService:
         return Path("./logs") / f"agent_{agent_id}.log"
     
     def _parse_position_file(self, position_file: Path) -> List[Dict[str, Any]]:
-        """Parse AI-Trader position.jsonl file"""
+        """Parse AI-Trader position.jsonl file, including the records a forked ledger inherits"""
         
         positions = []
         
         try:
+            if load_ledger_records is not None:
+                # Resolves forks: parent records up to the fork point, then the ledger's own
+                return load_ledger_records(position_file)
             with open(position_file, 'r') as f:
                 for line in f:
                     if line.strip():
-                        positions.append(json.loads(line.strip()))
+                        record = json.loads(line.strip())
+                        # A fork header holds no positions
+                        if "fork" not in record:
+                            positions.append(record)
         except Exception as e:
             print(f"Error parsing position file: {e}")
         
@@ -67,7 +67,7 @@ def get_daily_price(SYMBOL: str):
     url = (
         f"https://www.alphavantage.co/query?function={FUNCTION}&symbol={SYMBOL}&outputsize={OUTPUTSIZE}&apikey={APIKEY}"
     )
-    r = requests.get(url)
+    r = requests.get(url, timeout=30)
     data = r.json()
     print(data)
     if data.get("Note") is not None or data.get("Information") is not None:
@@ -172,7 +172,7 @@ def get_daily_price(SYMBOL: str):
     OUTPUTSIZE = 'full'
     APIKEY = os.getenv("ALPHAADVANTAGE_API_KEY")
     url = f'https://www.alphavantage.co/query?function={FUNCTION}&symbol={SYMBOL}&interval={INTERVAL}&outputsize={OUTPUTSIZE}&entitlement=delayed&extended_hours=false&apikey={APIKEY}'
-    r = requests.get(url)
+    r = requests.get(url, timeout=30)
     data = r.json()
     print(data)
     if data.get("Note") is not None or data.get("Information") is not None:
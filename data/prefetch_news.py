@@ -0,0 +1,101 @@
+"""
+Prefetch Alpha Vantage news for a backtest into the local archive (tools/news_archive.py)
+
+Downloads NEWS_SENTIMENT articles for every ticker (and any topics given) over the backtest
+range, starting 30 days before the first date since get_market_news looks back that far.
+Each article is stored once however many tickers mention it. Downloaded windows are
+recorded, so an interrupted run (e.g. on the API's rate limit) resumes where it stopped.
+
+Usage:
+    python data/prefetch_news.py --start 2025-10-01 --end 2025-11-07
+    python data/prefetch_news.py --start 2025-10-01 --end 2025-11-07 --tickers AAPL,NVDA --topics technology
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add project root directory to Python path to allow running this file from subdirectories
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from agent_tools.tool_alphavantage_news import AlphaVantageNewsTool
+from tools.news_archive import NewsArchive, prefetch_key, ticker_key, topic_key
+from tools.price_tools import all_nasdaq_100_symbols
+
+LOOKBACK_DAYS = 30
+
+
+def prefetch_news(
+    archive: NewsArchive,
+    keys: list,
+    start: datetime,
+    end: datetime,
+    window_days: int = 30,
+    sleep: float = 1.0,
+) -> int:
+    """
+    Download news for each ticker/topic key in back-to-back windows
+
+    Args:
+        archive: Target archive
+        keys: [("tickers" or "topics", value)]
+        start: First publish time to cover
+        end: Last publish time to cover
+        window_days: Length of one request window
+        sleep: Seconds to wait between API requests
+
+    Returns:
+        Number of new articles archived
+    """
+    tool = AlphaVantageNewsTool()
+    total = 0
+    for index, (kind, value) in enumerate(keys, 1):
+        key = ticker_key(value) if kind == "tickers" else topic_key(value)
+
+        def fetch(time_from: str, time_to: str, limit: int) -> list:
+            time.sleep(sleep)
+            return tool.fetch_window(time_from, time_to, limit=limit, **{kind: value})
+
+        added = 0
+        window_start = start
+        while window_start < end:
+            window_end = min(window_start + timedelta(days=window_days), end)
+            added += prefetch_key(archive, fetch, key, window_start, window_end)
+            window_start = window_end
+        total += added
+        print(f"✅ [{index}/{len(keys)}] {key}: {added} new articles")
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prefetch Alpha Vantage news into the local archive")
+    parser.add_argument("--start", required=True, help="First backtest date, YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="Last backtest date, YYYY-MM-DD")
+    parser.add_argument("--tickers", default=None, help="Comma-separated tickers (default: NASDAQ 100)")
+    parser.add_argument("--topics", default="", help="Comma-separated topics, e.g. technology,earnings")
+    parser.add_argument("--window-days", type=int, default=30, help="Days per API request window")
+    parser.add_argument("--sleep", type=float, default=1.0, help="Seconds between API requests")
+    args = parser.parse_args()
+
+    start = datetime.strptime(args.start, "%Y-%m-%d") - timedelta(days=LOOKBACK_DAYS)
+    end = datetime.strptime(args.end, "%Y-%m-%d") + timedelta(days=1)
+    tickers = args.tickers.split(",") if args.tickers else all_nasdaq_100_symbols
+    keys = [("tickers", ticker) for ticker in tickers] + [("topics", topic) for topic in args.topics.split(",") if topic]
+
+    archive = NewsArchive(os.getenv("NEWS_ARCHIVE_PATH", os.path.join(project_root, "data", "news_archive.sqlite")))
+    print(f"📰 Prefetching news for {len(keys)} tickers/topics, {start:%Y-%m-%d} to {end:%Y-%m-%d}, into {archive.path}")
+    try:
+        total = prefetch_news(archive, keys, start, end, args.window_days, args.sleep)
+    except Exception as e:
+        print(f"❌ Prefetch stopped: {e}")
+        print("   Downloaded windows are kept; run the same command again to resume.")
+        sys.exit(1)
+    print(f"✅ Archived {total} new articles")
+
+
+if __name__ == "__main__":
+    main()
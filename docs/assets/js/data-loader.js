@@ -71,22 +71,7 @@ class DataLoader {
     // Load position data for a specific agent
     async loadAgentPositions(agentName) {
         try {
-            const marketConfig = this.getMarketConfig();
-            const agentDataDir = marketConfig ? marketConfig.data_dir : 'agent_data';
-            const response = await fetch(`${this.baseDataPath}/${agentDataDir}/${agentName}/position/position.jsonl`);
-            if (!response.ok) throw new Error(`Failed to load positions for ${agentName}`);
-
-            const text = await response.text();
-            const lines = text.trim().split('\n').filter(line => line.trim() !== '');
-            const positions = lines.map(line => {
-                try {
-                    return JSON.parse(line);
-                } catch (parseError) {
-                    console.error(`Error parsing line for ${agentName}:`, line, parseError);
-                    return null;
-                }
-            }).filter(pos => pos !== null);
-
+            const positions = await this.loadLedgerRecords(agentName, new Set());
             console.log(`Loaded ${positions.length} positions for ${agentName}`);
             return positions;
         } catch (error) {
@@ -95,6 +80,47 @@ class DataLoader {
         }
     }
 
+    // Load the position records of a ledger in file order, resolving forks.
+    // A forked ledger starts with a {"fork": {signature, date, id}} header and inherits
+    // the parent's records up to and including that date and id (see tools/ledger_tools.py).
+    async loadLedgerRecords(agentName, seen) {
+        if (seen.has(agentName)) {
+            throw new Error(`Ledger fork cycle detected at ${agentName}`);
+        }
+        seen.add(agentName);
+
+        const marketConfig = this.getMarketConfig();
+        const agentDataDir = marketConfig ? marketConfig.data_dir : 'agent_data';
+        const response = await fetch(`${this.baseDataPath}/${agentDataDir}/${agentName}/position/position.jsonl`);
+        if (!response.ok) throw new Error(`Failed to load positions for ${agentName}`);
+
+        const text = await response.text();
+        const lines = text.trim().split('\n').filter(line => line.trim() !== '');
+        const records = lines.map(line => {
+            try {
+                return JSON.parse(line);
+            } catch (parseError) {
+                console.error(`Error parsing line for ${agentName}:`, line, parseError);
+                return null;
+            }
+        }).filter(record => record !== null);
+
+        const header = records.find(record => record.fork);
+        let inherited = [];
+        if (header) {
+            const fork = header.fork;
+            const parentRecords = await this.loadLedgerRecords(fork.signature, seen);
+            inherited = parentRecords.filter(record =>
+                record.date < fork.date || (record.date === fork.date && (record.id ?? -1) <= fork.id)
+            );
+            console.log(`${agentName} is forked from ${fork.signature} at ${fork.date}, inheriting ${inherited.length} records`);
+        }
+
+        // Only dated position records, fork headers have neither date nor positions
+        const own = records.filter(record => !record.fork && record.date && record.positions);
+        return inherited.concat(own);
+    }
+
     // Load all A-share stock prices from merged.jsonl
     async loadAStockPrices() {
         if (Object.keys(this.priceCache).length > 0) {
@@ -13,6 +13,41 @@ interface Position {
   positions: Record<string, number>
 }
 
+// A forked ledger starts with this header and inherits the parent's records up to (date, id)
+interface ForkHeader {
+  fork: {
+    signature: string
+    date: string
+    id: number
+  }
+}
+
+// Read a ledger's position records in file order, resolving forks (see tools/ledger_tools.py)
+function readLedger(dataDir: string, agentDir: string, seen: Set<string> = new Set()): Position[] {
+  if (seen.has(agentDir)) {
+    throw new Error(`Ledger fork cycle detected at ${agentDir}`)
+  }
+  seen.add(agentDir)
+
+  const positionFile = path.join(dataDir, agentDir, 'position', 'position.jsonl')
+  const records: Array<Position | ForkHeader> = fs.readFileSync(positionFile, 'utf-8')
+    .trim()
+    .split('\n')
+    .filter(line => line.trim())
+    .map(line => JSON.parse(line))
+
+  const header = records.find((record): record is ForkHeader => 'fork' in record)
+  let inherited: Position[] = []
+  if (header) {
+    const { signature, date, id } = header.fork
+    inherited = readLedger(dataDir, signature, seen).filter(
+      record => record.date < date || (record.date === date && record.id <= id)
+    )
+  }
+  const own = records.filter((record): record is Position => !('fork' in record) && !!record.date)
+  return inherited.concat(own)
+}
+
 export async function GET(request: NextRequest) {
   try {
     // Read portfolio data from the existing data structure
@@ -37,10 +72,7 @@ export async function GET(request: NextRequest) {
       
       if (fs.existsSync(positionFile)) {
         try {
-          const lines = fs.readFileSync(positionFile, 'utf-8').trim().split('\n')
-          const positions: Position[] = lines
-            .filter(line => line.trim())
-            .map(line => JSON.parse(line))
+          const positions = readLedger(dataDir, agentDir)
 
           // Get latest position
           const latestPosition = positions[positions.length - 1]
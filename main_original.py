@@ -11,6 +11,7 @@ load_dotenv()
 from prompts.agent_prompt import all_nasdaq_100_symbols
 # Import tools and prompts
 from tools.general_tools import get_config_value, write_config_value
+from tools.ledger_tools import fork_from_config
 
 # Agent class mapping table - for dynamic import and instantiation
 AGENT_REGISTRY = {
@@ -160,6 +161,9 @@ async def main(config_path=None):
     max_retries = agent_config.get("max_retries", 3)
     base_delay = agent_config.get("base_delay", 0.5)
     initial_cash = agent_config.get("initial_cash", 10000.0)
+    mcp_transport = agent_config.get("mcp_transport", "http")
+    session_timeout = agent_config.get("session_timeout")
+    step_timeout = agent_config.get("step_timeout")
 
     # Display enabled model information
     model_names = [m.get("name", m.get("signature")) for m in enabled_models]
@@ -203,6 +207,16 @@ async def main(config_path=None):
         
         # Check position file to determine if this is a fresh start
         position_file = project_root / log_path / signature / "position" / "position.jsonl"
+
+        # Branch from another model's ledger instead of starting from scratch
+        fork_from = model_config.get("fork_from")
+        if fork_from:
+            fork_result = fork_from_config(project_root / log_path, signature, fork_from)
+            if fork_result and "error" in fork_result:
+                print(f"❌ Unable to fork {signature}: {fork_result['error']}")
+                continue
+            if fork_result:
+                print(f"🌱 Forked {signature} from {fork_result['parent']} at {fork_result['date']} (id {fork_result['id']})")
         
         # If position file doesn't exist, reset config to start from INIT_DATE
         if not position_file.exists():
@@ -244,6 +258,9 @@ async def main(config_path=None):
                 base_delay=base_delay,
                 initial_cash=initial_cash,
                 init_date=INIT_DATE,
+                mcp_transport=mcp_transport,
+                session_timeout=session_timeout,
+                step_timeout=step_timeout,
                 openai_base_url=openai_base_url,
                 openai_api_key=openai_api_key
             )
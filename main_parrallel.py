@@ -10,6 +10,7 @@ load_dotenv()
 
 # Import tools and prompts
 from tools.general_tools import write_config_value
+from tools.ledger_tools import fork_from_config
 from prompts.agent_prompt import all_nasdaq_100_symbols
 
 
@@ -129,9 +130,22 @@ async def _run_model_in_current_process(AgentClass, model_config, INIT_DATE, END
     max_retries = agent_config.get("max_retries", 3)
     base_delay = agent_config.get("base_delay", 0.5)
     initial_cash = agent_config.get("initial_cash", 10000.0)
+    mcp_transport = agent_config.get("mcp_transport", "http")
+    session_timeout = agent_config.get("session_timeout")
+    step_timeout = agent_config.get("step_timeout")
 
     log_path = log_config.get("log_path", "./data/agent_data")
 
+    # Branch from another model's ledger instead of starting from scratch
+    fork_from = model_config.get("fork_from")
+    if fork_from:
+        fork_result = fork_from_config(project_root / log_path, signature, fork_from)
+        if fork_result and "error" in fork_result:
+            print(f"❌ Unable to fork {signature}: {fork_result['error']}")
+            return
+        if fork_result:
+            print(f"🌱 Forked {signature} from {fork_result['parent']} at {fork_result['date']} (id {fork_result['id']})")
+
     try:
         agent = AgentClass(
             signature=signature,
@@ -144,7 +158,10 @@ async def _run_model_in_current_process(AgentClass, model_config, INIT_DATE, END
             max_retries=max_retries,
             base_delay=base_delay,
             initial_cash=initial_cash,
-            init_date=INIT_DATE
+            init_date=INIT_DATE,
+            mcp_transport=mcp_transport,
+            session_timeout=session_timeout,
+            step_timeout=step_timeout,
         )
 
         print(f"✅ {AgentClass.__name__} instance created successfully: {agent}")
@@ -14,6 +14,7 @@ from typing import Dict, List, Optional
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 from tools.general_tools import get_config_value
+from tools.ledger_tools import to_sparse_positions
 from tools.price_tools import (all_nasdaq_100_symbols, all_sse_50_symbols,
                                format_price_dict_with_names, get_open_prices,
                                get_today_init_position, get_yesterday_date,
@@ -45,7 +46,7 @@ Here is the information you need:
 Current time:
 {date}
 
-Your current positions (numbers after stock codes represent how many shares you hold, numbers after CASH represent your available cash):
+Your current positions (numbers after stock codes represent how many shares you hold, numbers after CASH represent your available cash; stocks not listed are not held):
 {positions}
 
 The current value represented by the stocks you hold:
@@ -80,7 +81,7 @@ def get_agent_system_prompt(
     
     return agent_system_prompt.format(
         date=today_date,
-        positions=today_init_position,
+        positions=to_sparse_positions(today_init_position),
         STOP_SIGNAL=STOP_SIGNAL,
         yesterday_close_price=yesterday_sell_prices,
         today_buy_price=today_buy_price,
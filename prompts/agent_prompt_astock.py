@@ -19,6 +19,7 @@ from typing import Dict, List, Optional
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 from tools.general_tools import get_config_value
+from tools.ledger_tools import to_sparse_positions
 from tools.price_tools import (all_sse_50_symbols,
                                format_price_dict_with_names, get_open_prices,
                                get_today_init_position, get_yesterday_date,
@@ -65,7 +66,7 @@ agent_system_prompt_astock = """
 今日日期：
 {date}
 
-昨日收盘持仓（股票代码后的数字代表你持有的股数，CASH后的数字代表你的可用现金）：
+昨日收盘持仓（股票代码后的数字代表你持有的股数，CASH后的数字代表你的可用现金，未列出的股票表示未持有）：
 {positions}
 
 昨日收盘价格：
@@ -118,7 +119,7 @@ def get_agent_system_prompt_astock(today_date: str, signature: str, stock_symbol
 
     return agent_system_prompt_astock.format(
         date=today_date,
-        positions=today_init_position,
+        positions=to_sparse_positions(today_init_position),
         STOP_SIGNAL=STOP_SIGNAL,
         yesterday_close_price=yesterday_sell_prices_display,
         today_buy_price=today_buy_price_display,
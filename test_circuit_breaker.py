@@ -0,0 +1,82 @@
+"""
+Tests for the circuit breaker state machine (tools/circuit_breaker.py)
+"""
+
+import pytest
+
+from tools import circuit_breaker
+from tools.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, is_outage
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock, advanced with clock.advance(seconds)"""
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+
+    class Clock:
+        def advance(self, seconds):
+            now[0] += seconds
+
+    return Clock()
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=3, reset_timeout=60)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.snapshot() == {"state": OPEN, "consecutive_failures": 3, "trips": 1, "rejections": 1}
+    clock.advance(15)
+    assert breaker.retry_after() == 45
+    assert "retry after 45s" in breaker.unavailable_message()
+
+
+def test_half_open_probe_closes_or_reopens(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    # One probe after the reset timeout, concurrent calls are still rejected
+    clock.advance(60)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    # A failed probe opens the breaker for another reset timeout
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 2
+    clock.advance(59)
+    assert not breaker.allow()
+
+    clock.advance(1)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.consecutive_failures == 0
+    assert breaker.allow() and breaker.allow()
+
+
+def test_unanswered_probe_expires(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    clock.advance(60)
+    assert breaker.allow()
+
+    # The probe never reported back; after another reset timeout a new one is let through
+    clock.advance(30)
+    assert not breaker.allow()
+    clock.advance(30)
+    assert breaker.allow()
+
+
+def test_outage_statuses():
+    assert is_outage(429) and is_outage(500) and is_outage(503)
+    assert not is_outage(200) and not is_outage(400) and not is_outage(404)
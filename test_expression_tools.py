@@ -0,0 +1,48 @@
+"""
+Tests for the sandboxed expression evaluator behind the Math server's evaluate tool
+"""
+
+import pytest
+
+from agent_tools.tool_math import evaluate
+from tools.expression_tools import MAX_EXPRESSIONS, evaluate_expressions
+
+
+def test_assignments_and_element_wise_lists():
+    result = evaluate(
+        ["budget = cash * 0.1", "shares = floor(budget / prices)", "sum(shares * prices)", "max(shares, 3)"],
+        {"cash": 10000, "prices": [182.5, 250.1, 999.0]},
+    )
+
+    assert result["results"] == [1000.0, [5.0, 3.0, 1.0], pytest.approx(2661.8), [5.0, 3.0, 3.0]]
+    assert result["variables"] == {"budget": 1000.0, "shares": [5.0, 3.0, 1.0]}
+
+
+def test_failures_are_reported_per_expression():
+    result = evaluate_expressions(["1 / 0", "x + 1", "round(2.345, 2)", "exp(1000)", "[1, 2]", "y = 2 ** 3", "y"], {})
+
+    errors = result["results"][:2] + result["results"][3:5]
+    assert all("error" in error for error in errors)
+    assert result["results"][2] == pytest.approx(2.35)
+    assert result["results"][5:] == [8.0, 8.0]
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "__import__('os').system('true')",
+        "().__class__",
+        "open('position.jsonl')",
+        "(lambda: 1)()",
+        "abs(x=1)",
+        "round = 2",
+    ],
+)
+def test_anything_but_arithmetic_is_rejected(expression):
+    assert "error" in evaluate_expressions([expression], {})["results"][0]
+
+
+def test_invalid_input_rejects_the_whole_call():
+    assert "error" in evaluate_expressions(["1"] * (MAX_EXPRESSIONS + 1), {})
+    assert "error" in evaluate_expressions(["x"], {"x": [[1, 2], [3, 4]]})
+    assert "error" in evaluate_expressions(["x"], {"not a name": 1})
@@ -0,0 +1,188 @@
+"""
+Tests for runtime config and session state (tools/general_tools.py)
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fastmcp.server.dependencies as fastmcp_dependencies
+import pytest
+
+from tools import general_tools
+from tools.general_tools import (DeadlineExceeded, check_deadline, deadline_remaining, get_config_value,
+                                 get_session_config, request_session, request_timeout, session_headers, session_scope,
+                                 validate_session_values, write_config_value)
+
+
+@pytest.fixture
+def runtime_env(tmp_path, monkeypatch):
+    """Point RUNTIME_ENV_PATH at a scratch file"""
+    path = tmp_path / ".runtime_env.json"
+    monkeypatch.setenv("RUNTIME_ENV_PATH", str(path))
+    general_tools.invalidate_config_cache()
+    return path
+
+
+def test_config_reads_are_cached_until_the_file_changes(runtime_env):
+    write_config_value("SIGNATURE", "gpt-5")
+    write_config_value("TODAY_DATE", "2025-10-02")
+    assert json.loads(runtime_env.read_text()) == {"SIGNATURE": "gpt-5", "TODAY_DATE": "2025-10-02"}
+
+    loads = general_tools._config_stats["loads"]
+    for _ in range(100):
+        assert get_config_value("SIGNATURE") == "gpt-5"
+    assert general_tools._config_stats["loads"] == loads
+
+    # Another process rewrites the file
+    runtime_env.write_text(json.dumps({"SIGNATURE": "claude-3.7-sonnet", "TODAY_DATE": "2025-10-03"}))
+    assert get_config_value("TODAY_DATE") == "2025-10-03"
+    assert get_config_value("SIGNATURE") == "claude-3.7-sonnet"
+    assert general_tools._config_stats["loads"] == loads + 1
+
+
+def test_config_falls_back_to_the_environment(runtime_env, monkeypatch):
+    monkeypatch.setenv("AI_TRADER_TEST_ONLY_KEY", "from-env")
+    assert get_config_value("AI_TRADER_TEST_ONLY_KEY") == "from-env"
+    assert get_config_value("AI_TRADER_TEST_MISSING_KEY", "default") == "default"
+
+    write_config_value("AI_TRADER_TEST_ONLY_KEY", "from-file")
+    assert get_config_value("AI_TRADER_TEST_ONLY_KEY") == "from-file"
+    assert not [name for name in os.listdir(runtime_env.parent) if name.endswith(".tmp")]
+
+
+def test_session_scopes_are_isolated_between_threads_and_tasks(runtime_env):
+    write_config_value("SIGNATURE", "file-signature")
+    barrier = threading.Barrier(2)
+
+    def run_session(signature):
+        with session_scope(SIGNATURE=signature, TODAY_DATE="2025-10-02"):
+            barrier.wait(timeout=5)
+            write_config_value("TODAY_DATE", f"{signature}-date")
+            barrier.wait(timeout=5)
+            return get_config_value("SIGNATURE"), get_config_value("TODAY_DATE")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(run_session, ["gpt-5", "claude-3.7-sonnet"]))
+    assert results == [("gpt-5", "gpt-5-date"), ("claude-3.7-sonnet", "claude-3.7-sonnet-date")]
+
+    async def run_task(signature):
+        with session_scope(SIGNATURE=signature):
+            await asyncio.sleep(0)
+            return get_config_value("SIGNATURE")
+
+    async def run_tasks():
+        return await asyncio.gather(run_task("a"), run_task("b"))
+
+    assert asyncio.run(run_tasks()) == ["a", "b"]
+
+    # Session writes never reached the shared file
+    assert json.loads(runtime_env.read_text()) == {"SIGNATURE": "file-signature"}
+    assert get_config_value("SIGNATURE") == "file-signature"
+    assert get_session_config() is None
+
+
+def test_session_scopes_nest(runtime_env):
+    with session_scope(SIGNATURE="gpt-5", TODAY_DATE="2025-10-02") as outer:
+        with session_scope(TODAY_DATE="2025-10-03", MARKET=None):
+            assert get_config_value("SIGNATURE") == "gpt-5"
+            assert get_config_value("TODAY_DATE") == "2025-10-03"
+            assert "MARKET" not in get_session_config()
+        assert get_config_value("TODAY_DATE") == "2025-10-02"
+        assert get_session_config() is outer
+
+
+@pytest.fixture
+def http_headers(monkeypatch):
+    """Serve MCP request headers (lower-cased, as fastmcp returns them) from a dict"""
+    headers = {}
+    monkeypatch.setattr(fastmcp_dependencies, "get_http_headers", lambda: dict(headers))
+    return headers
+
+
+def test_request_session_runs_the_tool_in_the_header_session(runtime_env, http_headers):
+    write_config_value("SIGNATURE", "file-signature")
+
+    @request_session
+    def tool():
+        return get_config_value("SIGNATURE"), get_config_value("TODAY_DATE"), get_config_value("LOG_PATH")
+
+    assert tool() == ("file-signature", None, None)
+
+    sent = session_headers({"SIGNATURE": "gpt-5", "TODAY_DATE": "2025-10-02", "LOG_PATH": "./data/agent_data"})
+    assert sent == {
+        "X-AITrader-Signature": "gpt-5",
+        "X-AITrader-Today-Date": "2025-10-02",
+        "X-AITrader-Log-Path": "./data/agent_data",
+    }
+    http_headers.update({header.lower(): value for header, value in sent.items()})
+    assert tool() == ("gpt-5", "2025-10-02", "./data/agent_data")
+    assert get_session_config() is None
+
+
+@pytest.mark.parametrize(
+    "header, value",
+    [
+        ("x-aitrader-signature", "../other-model"),
+        ("x-aitrader-signature", "a/b"),
+        ("x-aitrader-signature", ".."),
+        ("x-aitrader-log-path", "../../etc"),
+        ("x-aitrader-log-path", "./data/../secrets"),
+        ("x-aitrader-log-path", "/tmp/elsewhere"),
+    ],
+)
+def test_request_session_rejects_paths_outside_the_data_directory(http_headers, header, value):
+    calls = []
+
+    @request_session
+    def tool():
+        calls.append(get_config_value("SIGNATURE"))
+        return {"success": True}
+
+    http_headers.update({"x-aitrader-signature": "gpt-5", header: value})
+
+    assert "error" in tool()
+    assert calls == []
+
+
+def test_validate_session_values_accepts_data_paths():
+    assert validate_session_values({"SIGNATURE": "claude-3.7-sonnet", "LOG_PATH": "./data/agent_data"}) is None
+    assert validate_session_values({"LOG_PATH": "agent_data_astock"}) is None
+    assert validate_session_values({}) is None
+
+
+def test_deadline_caps_request_timeouts(http_headers):
+    assert deadline_remaining() is None and request_timeout(30) == 30
+
+    with session_scope(DEADLINE=str(time.time() + 5)):
+        assert 0 < request_timeout(30) <= 5
+        assert request_timeout(1) == 1
+
+    with session_scope(DEADLINE=str(time.time() - 1)):
+        with pytest.raises(DeadlineExceeded):
+            check_deadline()
+        with pytest.raises(DeadlineExceeded):
+            request_timeout(30)
+
+    with session_scope(DEADLINE="not a number"):
+        assert deadline_remaining() is None
+
+
+def test_request_session_refuses_calls_after_the_deadline(http_headers):
+    calls = []
+
+    @request_session
+    def tool():
+        calls.append(True)
+        return {"success": True}
+
+    http_headers.update({"x-aitrader-signature": "gpt-5", "x-aitrader-deadline": str(time.time() - 1)})
+    with pytest.raises(DeadlineExceeded):
+        tool()
+
+    http_headers["x-aitrader-deadline"] = str(time.time() + 60)
+    assert tool() == {"success": True}
+    assert calls == [True]
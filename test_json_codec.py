@@ -0,0 +1,62 @@
+"""
+Tests for the shared JSON codec (tools/json_codec.py), whichever backend is installed
+"""
+
+import json
+import math
+
+import numpy as np
+import pytest
+
+from tools import json_codec
+from tools.json_codec import decode_log_entry, decode_metrics_record, decode_position_record, dumps, loads
+
+RECORDS = [
+    {"date": "2025-10-02", "id": 1, "schema": 2, "positions": {"AAPL": 10, "CASH": 9000.5}},
+    {"date": "2025-10-02 10:00:00", "id": 2.0, "note": "extra key", "positions": {"NVDA": None, "CASH": 0}},
+    {"signature": "gpt-5", "new_messages": [{"role": "assistant", "content": "买入 600519.SH ✅"}]},
+    {"nested": [[1, 2.5, -3e-7], {"flag": True, "none": None}], "empty": {}},
+]
+
+
+@pytest.mark.parametrize("record", RECORDS)
+def test_round_trip_matches_stdlib(record):
+    text = dumps(record)
+
+    assert json.loads(text) == record
+    for decode in (loads, decode_position_record, decode_log_entry, decode_metrics_record):
+        assert decode(text) == record
+        assert decode(text.encode("utf-8")) == record
+
+
+def test_decoders_keep_what_typed_decoding_rejected():
+    # Undeclared keys, float ids, null positions and int/float mixes all come back as written
+    line = '{"date": "2025-10-03", "id": 2.0, "note": "x", "positions": {"AAPL": null, "MSFT": 1, "CASH": 1.5}}'
+    assert decode_position_record(line) == json.loads(line)
+
+
+def test_non_finite_floats_are_written_like_json_dumps():
+    record = {"sharpe": float("nan"), "max_drawdown": float("-inf"), "values": [1.0, float("inf")], "none": None}
+
+    text = dumps(record)
+
+    assert text == json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+    decoded = loads(text)
+    assert math.isnan(decoded["sharpe"]) and decoded["max_drawdown"] == float("-inf")
+    assert decoded["values"] == [1.0, float("inf")] and decoded["none"] is None
+
+
+def test_numpy_values_are_serialized():
+    assert loads(dumps({"a": np.float64(1.5), "b": np.int64(3), "c": np.array([1.0, 2.0])})) == {
+        "a": 1.5,
+        "b": 3,
+        "c": [1.0, 2.0],
+    }
+    assert "NaN" in dumps({"a": np.array([1.0, np.nan])})
+
+
+def test_invalid_json_raises_a_decode_error():
+    with pytest.raises(json_codec.DecodeError):
+        loads('{"date": ')
+    with pytest.raises(ValueError):
+        loads("not json")
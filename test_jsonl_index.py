@@ -0,0 +1,72 @@
+"""
+Tests for the JSONL tail reader and byte-offset index (tools/jsonl_index.py)
+"""
+
+import json
+
+from tools.jsonl_index import JsonlIndex, iter_lines_reverse, read_last_record
+
+
+def write_ledger(path, lines):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join((line if isinstance(line, str) else json.dumps(line)) + "\n" for line in lines))
+    return path
+
+
+def test_reverse_reader_crosses_chunk_boundaries(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    lines = [json.dumps({"n": n, "pad": "x" * (n % 7)}) for n in range(50)]
+    path.write_text("\n".join(lines[:25]) + "\n\n" + "\n".join(lines[25:]))
+
+    assert [line.decode() for line in iter_lines_reverse(path, chunk_size=16)] == lines[::-1]
+
+
+def test_last_record_skips_a_partial_line(tmp_path):
+    path = write_ledger(tmp_path / "metrics.jsonl", [{"n": 1, "ok": True}, {"n": 2, "ok": False}, '{"n": 3, "ok'])
+
+    assert read_last_record(path) == {"n": 2, "ok": False}
+    assert read_last_record(path, predicate=lambda record: record["ok"]) == {"n": 1, "ok": True}
+    assert read_last_record(tmp_path / "missing.jsonl") is None
+
+
+def test_index_ignores_the_line_being_written(tmp_path):
+    path = tmp_path / "position.jsonl"
+    path.write_text(json.dumps({"date": "2025-10-01", "id": 0}) + "\n" + '{"date": "2025-10-02"')
+
+    index = JsonlIndex(path, "date", persist=False).refresh()
+    assert index.keys() == ["2025-10-01"]
+
+    with path.open("a") as f:
+        f.write(', "id": 1}\n')
+    assert index.refresh().records("2025-10-02") == [{"date": "2025-10-02", "id": 1}]
+    assert index.max_key() == "2025-10-02" and index.max_key(below="2025-10-02") == "2025-10-01"
+
+
+def test_index_sidecar_is_rebuilt_after_a_rewrite(tmp_path):
+    path = write_ledger(
+        tmp_path / "position.jsonl",
+        [{"date": "2025-10-01", "id": 0}, {"date": "2025-10-02", "id": 1}],
+    )
+    index = JsonlIndex(path, "date").refresh()
+    assert index.keys() == ["2025-10-01", "2025-10-02"]
+    assert (tmp_path / "position.jsonl.date.idx").exists()
+
+    # Appends extend the persisted index
+    with path.open("a") as f:
+        f.write(json.dumps({"date": "2025-10-03", "id": 2}) + "\n")
+    assert JsonlIndex(path, "date").refresh().records("2025-10-03") == [{"date": "2025-10-03", "id": 2}]
+
+    # A rewrite that grows the file looks like an append by size alone; the stale offsets must go
+    write_ledger(
+        path,
+        [
+            {"date": "2025-09-30", "id": 0, "positions": {"CASH": 1.0}},
+            {"date": "2025-10-01", "id": 1, "positions": {"CASH": 1.0}},
+            {"date": "2025-10-02", "id": 2, "positions": {"CASH": 1.0}},
+            {"date": "2025-10-03", "id": 3, "positions": {"CASH": 1.0}},
+        ],
+    )
+    index = JsonlIndex(path, "date").refresh()
+    assert index.keys() == ["2025-09-30", "2025-10-01", "2025-10-02", "2025-10-03"]
+    assert [record["id"] for record in index.records("2025-10-02")] == [2]
+    assert len(index) == 4
@@ -0,0 +1,85 @@
+"""
+Tests for copy-on-write ledger forks (tools/ledger_tools.py)
+"""
+
+import json
+
+import pytest
+
+from tools.general_tools import session_scope
+from tools.ledger_tools import (compact_ledger, fork_from_config, fork_ledger, get_ledger_index,
+                                load_ledger_records)
+
+
+@pytest.fixture(autouse=True)
+def finished_sessions():
+    """Run with a TODAY_DATE after every test record, so compaction sees no live session"""
+    with session_scope(TODAY_DATE="2025-12-31"):
+        yield
+
+
+def write_ledger(path, lines):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    return path
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def test_fork_inherits_parent_records_up_to_the_fork_point(tmp_path):
+    parent_file = write_ledger(
+        tmp_path / "parent" / "position" / "position.jsonl",
+        [
+            {"date": "2025-10-01", "id": 0, "positions": {"CASH": 100.0}},
+            {"date": "2025-10-02", "id": 1, "positions": {"AAPL": 1, "CASH": 90.0}},
+            {"date": "2025-10-02", "id": 2, "positions": {"AAPL": 2, "CASH": 80.0}},
+            {"date": "2025-10-03", "id": 3, "positions": {"AAPL": 3, "CASH": 70.0}},
+        ],
+    )
+    child_file = tmp_path / "child" / "position" / "position.jsonl"
+
+    fork = fork_ledger(parent_file, child_file, "2025-10-02")
+    assert (fork["parent"], fork["date"], fork["id"]) == ("parent", "2025-10-02", 2)
+
+    # Parent and child both trade on after the fork
+    with parent_file.open("a") as f:
+        f.write(json.dumps({"date": "2025-10-02", "id": 9, "positions": {"CASH": 0.0}}) + "\n")
+    with child_file.open("a") as f:
+        f.write(json.dumps({"date": "2025-10-03", "id": 3, "positions": {"MSFT": 1, "CASH": 50.0}}) + "\n")
+
+    index = get_ledger_index(child_file)
+    assert index.keys() == ["2025-10-01", "2025-10-02", "2025-10-03"]
+    assert [record["id"] for record in index.records("2025-10-02")] == [1, 2]
+    assert index.records("2025-10-03") == [{"date": "2025-10-03", "id": 3, "positions": {"MSFT": 1, "CASH": 50.0}}]
+    assert len(index) == 4
+    assert [record["id"] for record in load_ledger_records(child_file)] == [0, 1, 2, 3]
+
+    # Compacting the fork keeps its header and parent reference
+    assert "error" not in compact_ledger(child_file, backup=False)
+    assert read_lines(child_file)[0]["fork"] == {"signature": "parent", "date": "2025-10-02", "id": 2}
+    assert [record["id"] for record in load_ledger_records(child_file)] == [0, 1, 2, 3]
+
+
+def test_fork_is_created_once_and_rejects_bad_targets(tmp_path):
+    write_ledger(
+        tmp_path / "parent" / "position" / "position.jsonl",
+        [{"date": "2025-10-01 10:00:00", "id": 0, "positions": {"CASH": 100.0}}],
+    )
+
+    # A date matches the hourly sessions on that day
+    fork = fork_from_config(tmp_path, "child", {"signature": "parent", "date": "2025-10-01"})
+    assert (fork["date"], fork["id"]) == ("2025-10-01 10:00:00", 0)
+    # A resumed run keeps the ledger it already has
+    assert fork_from_config(tmp_path, "child", {"signature": "parent", "date": "2025-10-01"}) is None
+    assert load_ledger_records(tmp_path / "child" / "position" / "position.jsonl") == [
+        {"date": "2025-10-01 10:00:00", "id": 0, "positions": {"CASH": 100.0}}
+    ]
+
+    parent_file = tmp_path / "parent" / "position" / "position.jsonl"
+    other_file = tmp_path / "other" / "position" / "position.jsonl"
+    assert "No parent records" in fork_ledger(parent_file, other_file, "2025-09-30")["error"]
+    assert "same log directory" in fork_ledger(
+        parent_file, tmp_path / "elsewhere" / "logs" / "x" / "position" / "position.jsonl", "2025-10-01"
+    )["error"]
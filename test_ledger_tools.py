@@ -0,0 +1,156 @@
+"""
+Tests for position ledger records: sparse encoding and compaction
+"""
+
+import json
+
+import pytest
+
+import agent_tools.tool_trade as tool_trade
+from tools.general_tools import session_scope
+from tools.ledger_tools import (POSITION_SCHEMA_VERSION, compact_ledger, make_position_record,
+                                to_dense_positions, to_sparse_positions)
+
+
+@pytest.fixture(autouse=True)
+def finished_sessions():
+    """Run with a TODAY_DATE after every test record, so no session is live unless a test says so"""
+    with session_scope(TODAY_DATE="2025-12-31"):
+        yield
+
+
+def write_ledger(path, lines):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join((line if isinstance(line, str) else json.dumps(line)) + "\n" for line in lines))
+    return path
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def test_compaction_keeps_float_ids_and_extra_keys(tmp_path):
+    position_file = write_ledger(
+        tmp_path / "model" / "position" / "position.jsonl",
+        [
+            {"date": "2025-10-02", "id": 0, "positions": {"CASH": 10000.0}},
+            {
+                "date": "2025-10-02",
+                "id": 1,
+                "this_action": {"action": "buy", "symbol": "AAPL", "amount": 10},
+                "positions": {"AAPL": 10, "CASH": 8000.0},
+            },
+            "",
+            {"date": "2025-10-03", "id": 2.0, "note": "manual fix", "positions": {"AAPL": 10, "CASH": 8000.0}},
+        ],
+    )
+
+    result = compact_ledger(position_file, keep_intraday=True)
+
+    assert "error" not in result
+    assert (result["records_before"], result["records_after"]) == (3, 2)
+    records = read_lines(position_file)
+    assert [(record["date"], record["id"]) for record in records] == [("2025-10-02", 1), ("2025-10-03", 2.0)]
+    assert records[1]["note"] == "manual fix"
+    assert records[0]["this_action"] == {"action": "buy", "symbol": "AAPL", "amount": 10}
+    assert (tmp_path / "model" / "position" / "position.jsonl.bak").exists()
+    assert not (tmp_path / "model" / "position" / "position.jsonl.tmp").exists()
+
+
+def test_compaction_aborts_on_data_it_would_lose(tmp_path):
+    position_file = tmp_path / "model" / "position" / "position.jsonl"
+
+    # A key on a record that compaction drops
+    write_ledger(
+        position_file,
+        [
+            {"date": "2025-10-02", "id": 0, "note": "opening", "positions": {"CASH": 1.0}},
+            {"date": "2025-10-02", "id": 1, "positions": {"CASH": 1.0}},
+        ],
+    )
+    before = position_file.read_text()
+    result = compact_ledger(position_file)
+    assert "'note'" in result["error"]
+    assert position_file.read_text() == before
+
+    # A line that is not JSON
+    write_ledger(position_file, [{"date": "2025-10-02", "id": 0, "positions": {"CASH": 1.0}}, "{broken"])
+    before = position_file.read_text()
+    result = compact_ledger(position_file)
+    assert "Line 2" in result["error"]
+    assert position_file.read_text() == before
+    assert sorted(p.name for p in position_file.parent.iterdir()) == ["position.jsonl"]
+
+
+def test_compaction_keeps_the_live_session_for_t_plus_1(tmp_path):
+    position_file = write_ledger(
+        tmp_path / "model" / "position" / "position.jsonl",
+        [
+            {"date": "2025-10-02", "id": 0, "positions": {"CASH": 5000.0}},
+            {
+                "date": "2025-10-02",
+                "id": 1,
+                "this_action": {"action": "buy", "symbol": "600519.SH", "amount": 100},
+                "positions": {"600519.SH": 100, "CASH": 4000.0},
+            },
+            {
+                "date": "2025-10-03",
+                "id": 2,
+                "this_action": {"action": "buy", "symbol": "600519.SH", "amount": 100},
+                "positions": {"600519.SH": 200, "CASH": 3000.0},
+            },
+            {
+                "date": "2025-10-03",
+                "id": 3,
+                "this_action": {"action": "buy", "symbol": "600519.SH", "amount": 100},
+                "positions": {"600519.SH": 300, "CASH": 2000.0},
+            },
+        ],
+    )
+
+    with session_scope(SIGNATURE="model", TODAY_DATE="2025-10-03", LOG_PATH=str(tmp_path)):
+        result = compact_ledger(position_file, backup=False)
+        # Both of today's buys stay locked, only the finished session was compacted
+        assert tool_trade._get_today_buy_amounts("2025-10-03", "model") == {"600519.SH": 200}
+
+    assert (result["records_before"], result["records_after"]) == (4, 3)
+    assert [(record["date"], record["id"]) for record in read_lines(position_file)] == [
+        ("2025-10-02", 1),
+        ("2025-10-03", 2),
+        ("2025-10-03", 3),
+    ]
+
+
+def test_sparse_and_dense_positions_convert_both_ways():
+    dense = {"AAPL": 0, "MSFT": 5, "NVDA": 0.0, "CASH": 120.5}
+
+    assert to_sparse_positions(dense) == {"MSFT": 5, "CASH": 120.5}
+    assert to_sparse_positions({"AAPL": 1}) == {"AAPL": 1, "CASH": 0.0}
+    assert to_dense_positions({"MSFT": 5, "CASH": 120.5}, ["AAPL", "MSFT", "NVDA"]) == dense
+    # Symbols outside the universe are kept
+    assert to_dense_positions({"TSLA": 2, "CASH": 1.0}, ["AAPL"]) == {"AAPL": 0, "TSLA": 2, "CASH": 1.0}
+
+    record = make_position_record("2025-10-02", 3, dense, {"action": "sell", "symbol": "AAPL", "amount": 1})
+    assert record == {
+        "date": "2025-10-02",
+        "id": 3,
+        "schema": POSITION_SCHEMA_VERSION,
+        "this_action": {"action": "sell", "symbol": "AAPL", "amount": 1},
+        "positions": {"MSFT": 5, "CASH": 120.5},
+    }
+
+
+def test_sparse_compaction_converts_dense_records(tmp_path):
+    position_file = write_ledger(
+        tmp_path / "model" / "position" / "position.jsonl",
+        [
+            {"date": "2025-10-02", "id": 0, "positions": {"AAPL": 0, "MSFT": 0, "CASH": 100.0}},
+            {"date": "2025-10-03", "id": 1, "positions": {"AAPL": 0, "MSFT": 2, "CASH": 50.0}},
+        ],
+    )
+
+    assert "error" not in compact_ledger(position_file, sparse=True, backup=False)
+
+    records = read_lines(position_file)
+    assert [record["schema"] for record in records] == [POSITION_SCHEMA_VERSION] * 2
+    assert [record["positions"] for record in records] == [{"CASH": 100.0}, {"MSFT": 2, "CASH": 50.0}]
@@ -0,0 +1,87 @@
+"""
+Tests for the offline news archive and prefetcher (tools/news_archive.py)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import agent_tools.tool_alphavantage_news as tool_news
+from tools.general_tools import session_scope
+from tools.news_archive import NewsArchive, get_news_archive, prefetch_key, ticker_key
+
+START = datetime(2025, 10, 1)
+
+
+def article(hour, tickers=("AAPL",), topics=("Technology",)):
+    """Article published `hour` hours after START"""
+    published = START + timedelta(hours=hour)
+    return {
+        "title": f"article {hour}",
+        "url": f"https://example.com/{hour}",
+        "time_published": published.strftime("%Y%m%dT%H%M%S"),
+        "ticker_sentiment": [{"ticker": ticker} for ticker in tickers],
+        "topics": [{"topic": topic} for topic in topics],
+    }
+
+
+def test_adjacent_coverage_windows_are_merged(tmp_path):
+    archive = NewsArchive(tmp_path / "news.sqlite")
+    archive.add_coverage("ticker:AAPL", "2025-10-01 00:00:00", "2025-10-01 11:59:00")
+    archive.add_coverage("ticker:AAPL", "2025-10-01 12:00:00", "2025-10-02 00:00:00")
+    archive.add_coverage("ticker:AAPL", "2025-10-02 00:05:00", "2025-10-03 00:00:00")
+
+    assert archive.is_covered("ticker:AAPL", "2025-10-01 06:00:00", "2025-10-02 00:00:00")
+    # Five minutes are missing before the last window
+    assert not archive.is_covered("ticker:AAPL", "2025-10-01 06:00:00", "2025-10-02 12:00:00")
+    assert not archive.is_covered("ticker:MSFT", "2025-10-01 06:00:00", "2025-10-01 07:00:00")
+
+
+def test_prefetch_splits_full_windows_and_skips_covered_ones(tmp_path):
+    archive = NewsArchive(tmp_path / "news.sqlite")
+    feed = [article(hour) for hour in range(48)]
+    calls = []
+
+    def fetch(time_from, time_to, limit):
+        calls.append((time_from, time_to))
+        window = [a for a in feed if time_from <= a["time_published"][:13] <= time_to]
+        return window[:limit]
+
+    added = prefetch_key(archive, fetch, ticker_key("AAPL"), START, START + timedelta(days=2), limit=20)
+
+    assert added == 48
+    assert len(calls) > 1
+    assert archive.is_covered(ticker_key("AAPL"), "2025-10-01 00:00:00", "2025-10-03 00:00:00")
+    calls.clear()
+    assert prefetch_key(archive, fetch, ticker_key("AAPL"), START, START + timedelta(days=1), limit=20) == 0
+    assert calls == []
+
+
+def test_query_applies_the_cutoff_and_every_filter(tmp_path):
+    archive = NewsArchive(tmp_path / "news.sqlite")
+    archive.add_articles([article(0), article(1, tickers=("AAPL", "MSFT")), article(2, topics=("Earnings",))])
+    archive.add_articles([article(3, tickers=("NVDA",))], extra_key=ticker_key("AAPL"))
+
+    def titles(tickers, topics=None, end="2025-10-02 00:00:00"):
+        return [a["title"] for a in archive.query(ticker_key("AAPL"), tickers, topics, "2025-10-01 00:00:00", end)]
+
+    assert titles("AAPL") == ["article 3", "article 2", "article 1", "article 0"]
+    assert titles("AAPL,MSFT") == ["article 1"]
+    assert titles("AAPL", "earnings") == ["article 2"]
+    # Articles published at the cutoff are not visible yet
+    assert titles("AAPL", end="2025-10-01 02:00:00") == ["article 1", "article 0"]
+
+
+def test_offline_news_tool_answers_from_the_archive(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEWS_ARCHIVE", "offline")
+    monkeypatch.setenv("NEWS_ARCHIVE_PATH", str(tmp_path / "news.sqlite"))
+    monkeypatch.delenv("ALPHAADVANTAGE_API_KEY", raising=False)
+    archive = get_news_archive()
+    archive.add_articles([article(hour) for hour in range(0, 48, 6)])
+    archive.add_coverage(ticker_key("AAPL"), "2025-09-01 00:00:00", "2025-10-03 00:00:00")
+
+    tool = tool_news.AlphaVantageNewsTool()
+    with session_scope(TODAY_DATE="2025-10-02 00:00:00"):
+        assert [a["title"] for a in tool("apple", tickers="AAPL")] == [f"article {hour}" for hour in (18, 12, 6, 0)]
+        with pytest.raises(LookupError, match="NEWS_ARCHIVE=offline"):
+            tool("microsoft", tickers="MSFT")
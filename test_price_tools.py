@@ -0,0 +1,217 @@
+"""
+Tests for the batched price tools (agent_tools/tool_get_price_local.py) on scratch price files
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import agent_tools.tool_get_price_local as tool_price
+from tools import indicator_tools
+from tools.general_tools import session_scope
+from tools.indicator_tools import get_covariance_as_of
+from tools.price_store import get_price_store
+from tools.tool_cache import clear_memory_cache
+
+DATES = [day.strftime("%Y-%m-%d") for day in pd.bdate_range("2025-09-01", periods=40)]
+US_SYMBOLS = ["AAPL", "MSFT", "NVDA"]
+CN_SYMBOLS = ["600028.SH", "601318.SH"]
+
+
+def make_doc(symbol, seed):
+    """Daily price document with a random walk close and an open near the previous close"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(DATES))))
+    open_ = np.concatenate([[100.0], close[:-1]]) * (1 + rng.normal(0, 0.005, len(DATES)))
+    volume = rng.integers(1_000_000, 5_000_000, len(DATES))
+    series = {
+        date: {
+            "1. buy price": f"{o:.4f}",
+            "2. high": f"{max(o, c) * 1.01:.4f}",
+            "3. low": f"{min(o, c) * 0.99:.4f}",
+            "4. sell price": f"{c:.4f}",
+            "5. volume": str(v),
+        }
+        for date, o, c, v in zip(DATES, open_, close, volume)
+    }
+    return {"Meta Data": {"2. Symbol": symbol}, "Time Series (Daily)": series}
+
+
+@pytest.fixture
+def prices(tmp_path, monkeypatch):
+    """US and A-share merged.jsonl files under tmp_path, in place of the ones under data/"""
+    docs = {symbol: make_doc(symbol, seed) for seed, symbol in enumerate(US_SYMBOLS + CN_SYMBOLS)}
+    for directory, symbols in ((tmp_path / "data", US_SYMBOLS), (tmp_path / "data" / "A_stock", CN_SYMBOLS)):
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "merged.jsonl").write_text("".join(json.dumps(docs[symbol]) + "\n" for symbol in symbols))
+
+    def data_path(filename, symbol=None):
+        if symbol and symbol.endswith((".SH", ".SZ")):
+            return tmp_path / "data" / "A_stock" / filename
+        return tmp_path / "data" / filename
+
+    monkeypatch.setattr(tool_price, "_workspace_data_path", data_path)
+    clear_memory_cache()
+    yield docs
+    clear_memory_cache()
+
+
+def test_price_history_clips_to_the_session_time(prices):
+    bars = prices["AAPL"]["Time Series (Daily)"]
+
+    history = tool_price.get_price_history("AAPL", DATES[0], DATES[4], ["open", "close"])
+    assert history["dates"] == DATES[:5]
+    assert history["close"] == [float(bars[date]["4. sell price"]) for date in DATES[:5]]
+
+    with session_scope(TODAY_DATE=DATES[3]):
+        history = tool_price.get_price_history("AAPL", DATES[0], DATES[-1])
+    assert history["dates"] == DATES[:4]
+    assert history["open"][-1] == float(bars[DATES[3]]["1. buy price"])
+    assert history["close"][-1] is None and history["volume"][-1] is None
+    assert "note" in history
+
+
+def test_price_history_errors(prices):
+    assert "error" in tool_price.get_price_history("AAPL", DATES[4], DATES[0])
+    assert "error" in tool_price.get_price_history("AAPL", DATES[0], DATES[4], ["close", "vwap"])
+    assert "error" in tool_price.get_price_history("TSLA", DATES[0], DATES[4])
+
+
+def test_price_snapshot_spans_both_markets(prices):
+    date = DATES[10]
+
+    snapshot = tool_price.get_price_snapshot(["NVDA", "600028.SH", "TSLA", "NVDA"], date, ["close", "volume"])
+
+    assert snapshot["columns"] == ["symbol", "close", "volume"]
+    bars = {symbol: prices[symbol]["Time Series (Daily)"][date] for symbol in ("NVDA", "600028.SH")}
+    assert snapshot["rows"] == [
+        [symbol, float(bar["4. sell price"]), int(bar["5. volume"])] for symbol, bar in bars.items()
+    ]
+    assert snapshot["missing"] == ["TSLA"]
+
+
+def test_price_snapshot_hides_the_future_and_the_current_close(prices):
+    with session_scope(TODAY_DATE=DATES[10]):
+        assert "error" in tool_price.get_price_snapshot(["AAPL"], DATES[11])
+        snapshot = tool_price.get_price_snapshot(["AAPL"], DATES[10], ["open", "close"])
+
+    assert snapshot["rows"] == [["AAPL", float(prices["AAPL"]["Time Series (Daily)"][DATES[10]]["1. buy price"]), None]]
+    assert "note" in snapshot
+
+
+def closes(doc):
+    """Close prices of a document, oldest first"""
+    series = doc["Time Series (Daily)"]
+    return np.array([float(series[date]["4. sell price"]) for date in DATES])
+
+
+def wilder_rsi(close, window):
+    """RSI with Wilder smoothing seeded from the first change, as a plain loop"""
+    gain = loss = None
+    for change in np.diff(close):
+        up, down = max(change, 0.0), max(-change, 0.0)
+        if gain is None:
+            gain, loss = up, down
+        else:
+            gain, loss = gain + (up - gain) / window, loss + (down - loss) / window
+    return 100 - 100 / (1 + gain / loss)
+
+
+def test_indicators_match_direct_computation(prices):
+    row = 25
+    result = tool_price.get_indicators(["AAPL", "600028.SH", "TSLA"], DATES[row], ["sma_5", "momentum_5", "rsi_14"])
+
+    assert result["as_of"] == {"us": DATES[row], "cn": DATES[row]}
+    assert result["columns"] == ["symbol", "sma_5", "momentum_5", "rsi_14"]
+    assert result["missing"] == ["TSLA"]
+    for symbol, sma, momentum, rsi in result["rows"]:
+        close = closes(prices[symbol])[: row + 1]
+        assert sma == pytest.approx(round(close[-5:].mean(), 4))
+        assert momentum == pytest.approx(round(close[-1] / close[-6] - 1, 4))
+        assert rsi == pytest.approx(round(wilder_rsi(close, 14), 4))
+
+
+def test_indicators_use_the_last_completed_bar(prices):
+    with session_scope(TODAY_DATE=DATES[20]):
+        result = tool_price.get_indicators(["NVDA"], DATES[20], ["sma_20", "sma_30"])
+
+    assert result["as_of"] == {"us": DATES[19]}
+    assert result["rows"] == [["NVDA", pytest.approx(round(closes(prices["NVDA"])[:20].mean(), 4)), None]]
+    assert "error" in tool_price.get_indicators(["NVDA"], DATES[20], ["macd"])
+
+
+def test_screen_ranks_the_universe_on_completed_bars(prices):
+    row = 30
+    returns = {symbol: closes(prices[symbol])[row - 1] / closes(prices[symbol])[row - 6] - 1 for symbol in US_SYMBOLS}
+    ranked = sorted(returns, key=returns.get, reverse=True)
+
+    result = tool_price.screen(DATES[row], sort_by="return_5", top_k=2, market="us")
+
+    assert (result["date"], result["as_of"]) == (DATES[row], DATES[row - 1])
+    assert (result["universe"], result["matched"]) == (3, 3)
+    assert result["columns"] == ["symbol", "return_5"]
+    assert result["rows"] == [[symbol, pytest.approx(round(returns[symbol], 4))] for symbol in ranked[:2]]
+
+    # Only the weakest stock passes the filter; the open gap needs no completed bar of the day
+    weakest = prices[ranked[-1]]
+    gap = float(weakest["Time Series (Daily)"][DATES[row]]["1. buy price"]) / closes(weakest)[row - 1] - 1
+    result = tool_price.screen(
+        DATES[row], criteria={"return_5": {"max": returns[ranked[-1]]}}, sort_by="gap", market="us"
+    )
+    assert result["matched"] == 1
+    assert result["rows"] == [[ranked[-1], pytest.approx(round(gap, 4)), pytest.approx(round(returns[ranked[-1]], 4))]]
+
+
+def test_screen_errors(prices):
+    assert "error" in tool_price.screen(DATES[0], market="us")
+    assert "error" in tool_price.screen(DATES[10], sort_by="alpha", market="us")
+    assert "error" in tool_price.screen(DATES[10], criteria={"return_5": {"above": 0}}, market="us")
+    with session_scope(TODAY_DATE=DATES[10]):
+        assert "error" in tool_price.screen(DATES[11], market="us")
+
+
+def annualized_covariance(prices, symbols, row, window):
+    """Sample covariance of the window of daily log returns ending at row, computed with numpy"""
+    returns = np.diff(np.log([closes(prices[symbol])[: row + 1] for symbol in symbols]), axis=1)
+    return np.cov(returns[:, -window:]) * 252
+
+
+def test_rolling_covariance_matches_numpy(prices, tmp_path, monkeypatch):
+    monkeypatch.setattr(indicator_tools, "INDICATOR_CACHE_SIZE", 2)
+    store = get_price_store(tmp_path / "data" / "merged.jsonl")
+
+    # Consecutive rows take the incremental path, the jump back recomputes from scratch
+    for row in (15, 16, 17, 30, 12):
+        bar_time, covariance, last_close = get_covariance_as_of(store, US_SYMBOLS, DATES[row], 10)
+        assert bar_time == DATES[row]
+        np.testing.assert_allclose(covariance, annualized_covariance(prices, US_SYMBOLS, row, 10), rtol=1e-9)
+        assert last_close.tolist() == [closes(prices[symbol])[row] for symbol in US_SYMBOLS]
+
+    assert len(indicator_tools.get_indicator_cache(store)._covariances) == 2
+
+
+def test_portfolio_risk_of_weights(prices):
+    weights = {"AAPL": 0.5, "NVDA": 0.3}
+    covariance = annualized_covariance(prices, list(weights), 29, 20)
+    weight = np.array(list(weights.values()))
+
+    with session_scope(TODAY_DATE=DATES[30]):
+        result = tool_price.portfolio_risk(weights=weights, window=20)
+        assert "error" in tool_price.portfolio_risk(weights={"AAPL": 0.5, "600028.SH": 0.5})
+
+    assert result["as_of"] == DATES[29]
+    assert result["volatility"] == pytest.approx(round(float(np.sqrt(weight @ covariance @ weight)), 4))
+    assert sum(result["risk_contribution"].values()) == pytest.approx(1, abs=1e-3)
+
+
+def test_screen_cache_is_keyed_by_the_session_market(prices):
+    with session_scope(TODAY_DATE=DATES[-1], MARKET="us"):
+        us = tool_price.screen(DATES[20])
+    with session_scope(TODAY_DATE=DATES[-1], MARKET="cn"):
+        cn = tool_price.screen(DATES[20])
+        assert tool_price.screen(DATES[20], market="us") == us
+
+    assert sorted(row[0] for row in us["rows"]) == US_SYMBOLS
+    assert sorted(row[0] for row in cn["rows"]) == CN_SYMBOLS
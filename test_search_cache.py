@@ -0,0 +1,105 @@
+"""
+Tests for the persistent search cache, the Jina tool's replay mode and its concurrent scraping
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import agent_tools.tool_jina_search as tool_jina_search
+from tools.general_tools import session_scope
+from tools.search_cache import SearchCache, get_search_cache
+
+TODAY = "2025-10-02 10:00:00"
+URLS = ["https://example.com/a", "https://example.com/b", "https://example.com/c"]
+
+
+def page(url):
+    return {
+        "url": url,
+        "title": url[-1],
+        "description": "",
+        "content": f"content {url[-1]}",
+        "publish_time": "2025-10-01",
+    }
+
+
+def expire(cache):
+    """Age every entry past any TTL"""
+    with cache._conn:
+        cache._conn.execute("UPDATE searches SET created = 0")
+        cache._conn.execute("UPDATE pages SET created = 0")
+
+
+def test_entries_expire_unless_replaying(tmp_path):
+    cache = SearchCache(tmp_path / "search.sqlite", ttl_days=1)
+    cache.put_search("NVDA  Earnings", TODAY, URLS)
+    cache.put_page(URLS[0], page(URLS[0]))
+
+    assert cache.get_search("nvda earnings", TODAY) == URLS
+    assert cache.get_search("nvda earnings", "2025-10-03 10:00:00") is None
+
+    expire(cache)
+    assert cache.get_search("nvda earnings", TODAY) is None
+    assert cache.get_page(URLS[0]) is None
+    assert cache.get_search("nvda earnings", TODAY, replay=True) == URLS
+    assert cache.get_page(URLS[0], replay=True) == page(URLS[0])
+    assert cache.purge_expired() == 2
+
+
+def test_replay_serves_the_recorded_run_without_network(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEARCH_CACHE", "replay")
+    monkeypatch.setenv("SEARCH_CACHE_PATH", str(tmp_path / "search.sqlite"))
+    monkeypatch.delenv("JINA_API_KEY", raising=False)
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("replay mode must not touch the network")
+
+    monkeypatch.setattr(tool_jina_search.requests, "get", no_network)
+    monkeypatch.setattr(tool_jina_search.requests, "post", no_network)
+    monkeypatch.setattr(tool_jina_search, "get_http_pool", no_network)
+
+    # Recorded run: one of the top pages failed and was not stored
+    cache = get_search_cache()
+    cache.put_search("NVDA earnings", TODAY, URLS)
+    cache.put_page(URLS[0], page(URLS[0]))
+    cache.put_page(URLS[2], page(URLS[2]))
+    expire(cache)
+
+    tool = tool_jina_search.WebScrapingJinaTool()
+    with session_scope(TODAY_DATE=TODAY):
+        assert tool("  nvda EARNINGS ") == [page(URLS[0]), page(URLS[2])]
+        with pytest.raises(LookupError, match="SEARCH_CACHE=replay"):
+            tool("AAPL earnings")
+
+
+def test_pages_are_scraped_concurrently_within_the_budget(tmp_path, monkeypatch):
+    monkeypatch.setenv("JINA_API_KEY", "test-key")
+    monkeypatch.setenv("SEARCH_CACHE_PATH", str(tmp_path / "search.sqlite"))
+    delays = {URLS[0]: 0.6, URLS[1]: 0.6, URLS[2]: 5.0, "https://example.com/gone": 0.0}
+
+    async def reader(request):
+        url = str(request.url)[len("https://r.jina.ai/"):]
+        await asyncio.sleep(delays[url])
+        if url.endswith("gone"):
+            return httpx.Response(404)
+        data = page(url)
+        return httpx.Response(200, json={"data": {**data, "publishedTime": data.pop("publish_time")}})
+
+    async def scrape():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(reader)) as client:
+            start = time.perf_counter()
+            scraped = await tool._scrape_all(client, list(delays), timeout=10, budget=1)
+            return scraped, time.perf_counter() - start
+
+    tool = tool_jina_search.WebScrapingJinaTool()
+    scraped, elapsed = asyncio.run(scrape())
+
+    # Both 0.6s pages fit the 1s budget only side by side; the slow page is dropped, failures come back as errors
+    assert elapsed < 1.5
+    pages = dict(scraped)
+    assert set(pages) == {URLS[0], URLS[1], "https://example.com/gone"}
+    assert pages[URLS[0]] == page(URLS[0])
+    assert "404" in pages["https://example.com/gone"]["error"]
@@ -0,0 +1,95 @@
+"""
+Tests for memoization of read-only tool results (tools/tool_cache.py)
+"""
+
+import pytest
+
+from tools import tool_cache
+from tools.general_tools import get_config_value, session_scope
+from tools.tool_cache import LRUCache, clear_memory_cache, memoize
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch):
+    """Fresh memory tier and disk tier under tmp_path; collects the calls that reached the tool"""
+    monkeypatch.setenv("TOOL_CACHE_DIR", str(tmp_path / "tool_cache"))
+    monkeypatch.delenv("TOOL_CACHE", raising=False)
+    clear_memory_cache()
+    yield []
+    clear_memory_cache()
+
+
+def test_results_are_keyed_by_arguments_and_cutoff(calls):
+    @memoize
+    def lookup(symbol, fields=None):
+        calls.append(symbol)
+        return {"symbol": symbol, "values": [1, 2]}
+
+    with session_scope(TODAY_DATE="2025-10-02"):
+        lookup("AAPL")
+        lookup(symbol="AAPL", fields=None)
+        lookup("MSFT")
+    with session_scope(TODAY_DATE="2025-10-03"):
+        lookup("AAPL")
+    # Without a cutoff the answer may change over time
+    lookup("AAPL")
+    lookup("AAPL")
+
+    assert calls == ["AAPL", "MSFT", "AAPL", "AAPL", "AAPL"]
+
+
+def test_callers_cannot_change_cached_results(calls):
+    @memoize
+    def lookup(symbol):
+        calls.append(symbol)
+        return {"symbol": symbol, "values": [1, 2]}
+
+    with session_scope(TODAY_DATE="2025-10-02"):
+        lookup("AAPL")["values"].append(3)
+        lookup("AAPL")["symbol"] = "changed"
+        assert lookup("AAPL") == {"symbol": "AAPL", "values": [1, 2]}
+    assert calls == ["AAPL"]
+
+
+def test_session_keys_and_errors(calls):
+    @memoize(session_keys=("MARKET",))
+    def lookup(symbol):
+        calls.append(symbol)
+        return {"error": "no data"} if symbol == "TSLA" else {"market": get_config_value("MARKET")}
+
+    with session_scope(TODAY_DATE="2025-10-02", MARKET="us"):
+        assert lookup("X") == {"market": "us"}
+        lookup("TSLA")
+        lookup("TSLA")
+    with session_scope(TODAY_DATE="2025-10-02", MARKET="cn"):
+        assert lookup("X") == {"market": "cn"}
+
+    assert calls == ["X", "TSLA", "TSLA", "X"]
+
+
+def test_disk_tier_is_shared_and_cache_can_be_disabled(calls, monkeypatch):
+    @memoize(disk=True)
+    def search(query):
+        calls.append(query)
+        return [f"result for {query}"]
+
+    with session_scope(TODAY_DATE="2025-10-02"):
+        search("nvda")
+        clear_memory_cache()
+        assert search("nvda") == ["result for nvda"]
+        monkeypatch.setenv("TOOL_CACHE", "off")
+        search("nvda")
+
+    assert calls == ["nvda", "nvda"]
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.get("b") is tool_cache._MISSING
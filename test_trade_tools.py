@@ -0,0 +1,146 @@
+"""
+Tests for the batch trade tools (execute_orders, plan_rebalance) on a scratch ledger
+"""
+
+import json
+
+import pytest
+
+import agent_tools.tool_trade as tool_trade
+from tools.general_tools import session_scope
+
+TODAY = "2025-10-02"
+SIGNATURE = "test-model"
+PRICES = {"AAPL": 100.0, "MSFT": 50.0, "600519.SH": 10.0}
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    """Scratch ledger for SIGNATURE under tmp_path, opening prices from PRICES, no runtime env writes"""
+    monkeypatch.setattr(
+        tool_trade,
+        "_get_open_prices_by_market",
+        lambda today_date, symbols: {f"{symbol}_price": PRICES.get(symbol) for symbol in symbols},
+    )
+    monkeypatch.setattr(tool_trade, "write_config_value", lambda key, value: None)
+    # Number of records of every ledger write
+    appends = []
+    append = tool_trade._append_position_records
+
+    def counting_append(signature, records):
+        if records:
+            appends.append(len(records))
+        append(signature, records)
+
+    monkeypatch.setattr(tool_trade, "_append_position_records", counting_append)
+
+    position_file = tmp_path / SIGNATURE / "position" / "position.jsonl"
+    position_file.parent.mkdir(parents=True)
+
+    def write(*records):
+        position_file.write_text("".join(json.dumps(record) + "\n" for record in records))
+        return position_file
+
+    with session_scope(SIGNATURE=SIGNATURE, TODAY_DATE=TODAY, MARKET="us", LOG_PATH=str(tmp_path)):
+        yield write, appends
+
+
+def read_records(position_file):
+    return [json.loads(line) for line in position_file.read_text().splitlines() if line.strip()]
+
+
+def test_execute_orders_sells_fund_buys_in_one_append(ledger):
+    write, appends = ledger
+    position_file = write({"date": TODAY, "id": 0, "positions": {"MSFT": 5, "CASH": 1000.0}})
+
+    # The buy (1200) only fits once the MSFT proceeds (250) are in, although it is listed first
+    result = tool_trade.execute_orders(
+        [{"action": "buy", "symbol": "AAPL", "amount": 12}, {"action": "sell", "symbol": "MSFT", "amount": 5}]
+    )
+
+    assert result["filled"] == 2 and result["rejected"] == 0
+    assert [r["status"] for r in result["results"]] == ["filled", "filled"]
+    assert result["positions"] == {"AAPL": 12, "CASH": 50.0}
+    assert appends == [2]
+    records = read_records(position_file)
+    assert [(r["id"], r["this_action"]["action"]) for r in records[1:]] == [(1, "sell"), (2, "buy")]
+
+
+def test_execute_orders_rejects_without_touching_the_ledger(ledger):
+    write, appends = ledger
+    position_file = write({"date": TODAY, "id": 0, "positions": {"CASH": 100.0}})
+
+    result = tool_trade.execute_orders(
+        [
+            {"action": "buy", "symbol": "AAPL", "amount": 5},
+            {"action": "sell", "symbol": "MSFT", "amount": 1},
+            {"action": "buy", "symbol": "600519.SH", "amount": 150},
+            {"action": "hold", "symbol": "AAPL", "amount": 1},
+        ]
+    )
+
+    assert result["filled"] == 0
+    errors = [r["error"] for r in result["results"]]
+    assert "Insufficient cash" in errors[0]
+    assert "Insufficient shares" in errors[1]
+    assert "multiples of 100" in errors[2]
+    assert "action must be" in errors[3]
+    assert appends == []
+    assert len(read_records(position_file)) == 1
+
+
+def test_fill_orders_enforces_t_plus_1():
+    pending = [
+        {"index": 0, "action": "sell", "symbol": "600519.SH", "amount": 200, "market": "cn"},
+        {"index": 1, "action": "sell", "symbol": "600519.SH", "amount": 100, "market": "cn"},
+    ]
+    results = [None, None]
+    bought_today = {"600519.SH": 100}
+
+    position, records = tool_trade._fill_orders(
+        TODAY, pending, results, {"600519.SH": 200, "CASH": 0.0}, 3, bought_today, {"600519.SH_price": 10.0}
+    )
+
+    assert results[0]["status"] == "rejected" and results[0]["sellable_today"] == 100
+    assert results[1]["status"] == "filled" and results[1]["id"] == 4
+    assert position == {"600519.SH": 100, "CASH": 1000.0}
+    assert len(records) == 1
+
+
+def test_plan_rebalance_floors_to_whole_lots(ledger):
+    write, appends = ledger
+    write({"date": TODAY, "id": 0, "positions": {"MSFT": 10, "CASH": 1000.0}})
+
+    # Total value 1500: AAPL 750 -> 7 shares, 600519.SH 750 -> 75 shares -> 0 lots of 100
+    plan = tool_trade.plan_rebalance({"AAPL": 0.5, "600519.SH": 0.5})
+
+    assert plan["total_value"] == 1500.0
+    assert plan["orders"] == [
+        {"action": "sell", "symbol": "MSFT", "amount": 10, "price": 50.0},
+        {"action": "buy", "symbol": "AAPL", "amount": 7, "price": 100.0},
+    ]
+    assert plan["cash_after"] == 800.0
+    assert appends == []
+
+
+def test_plan_rebalance_scales_buys_to_cash_when_t_plus_1_blocks_sells(ledger):
+    write, appends = ledger
+    position_file = write(
+        {
+            "date": TODAY,
+            "id": 0,
+            "this_action": {"action": "buy", "symbol": "600519.SH", "amount": 300},
+            "positions": {"600519.SH": 300, "CASH": 1000.0},
+        }
+    )
+
+    # Target 40 AAPL (4000), but the A-shares bought today cannot fund it: 1000 cash buys 10
+    plan = tool_trade.plan_rebalance({"AAPL": 1.0}, execute=True)
+
+    assert plan["orders"] == [{"action": "buy", "symbol": "AAPL", "amount": 10, "price": 100.0}]
+    assert any(note.startswith("T+1") for note in plan["notes"])
+    assert any("scaled down by 0.2500" in note for note in plan["notes"])
+    assert plan["execution"]["filled"] == 1
+    assert plan["execution"]["positions"] == {"600519.SH": 300, "AAPL": 10, "CASH": 0.0}
+    assert appends == [1]
+    assert read_records(position_file)[-1]["id"] == 1
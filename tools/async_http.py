@@ -0,0 +1,70 @@
+"""
+Shared async HTTP connection pool for the tool servers
+
+MCP tools are plain functions that FastMCP runs in worker threads. To fan out many requests
+from one tool call, the pool keeps an event loop in a background thread with a single
+httpx.AsyncClient, so every call in the process reuses the same connections (and TLS
+sessions). Tools hand it a coroutine and block on the result:
+
+    pool = get_http_pool()
+    pages = pool.run(scrape_all(pool.client, urls), timeout=20)
+
+HTTP_POOL_MAX_CONNECTIONS (default 20) bounds the open connections.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Coroutine, Optional
+
+import httpx
+
+
+class AsyncHTTPPool:
+    """Background event loop owning one httpx.AsyncClient"""
+
+    def __init__(self, max_connections: int = 20):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-http-pool", daemon=True)
+        self._thread.start()
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.client: httpx.AsyncClient = self.run(self._create_client(limits))
+
+    @staticmethod
+    async def _create_client(limits: httpx.Limits) -> httpx.AsyncClient:
+        return httpx.AsyncClient(limits=limits, follow_redirects=True)
+
+    def run(self, coroutine: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the pool's loop and wait for its result
+
+        Args:
+            coroutine: Coroutine to run, typically using self.client
+            timeout: Seconds to wait before cancelling it
+
+        Returns:
+            The coroutine's result
+
+        Raises:
+            TimeoutError: The coroutine did not finish within timeout (it is cancelled)
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+
+_pool: Optional[AsyncHTTPPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_http_pool() -> AsyncHTTPPool:
+    """Get the process-wide pool, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AsyncHTTPPool(int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "20")))
+        return _pool
@@ -0,0 +1,161 @@
+"""
+Circuit breakers for the external services behind the tool servers (Jina, Alpha Vantage)
+
+A breaker opens after CIRCUIT_BREAKER_FAILURES consecutive failures (default 5). While open,
+calls are rejected at once so the tool can answer "unavailable" instead of waiting for
+another timeout. After CIRCUIT_BREAKER_RESET_SECONDS (default 60) one probe call is let
+through (half-open): success closes the breaker, failure opens it again.
+
+State, trip and rejection counts are exported by tools.tool_metrics at GET /metrics.
+
+Usage:
+    breaker = get_breaker("jina")
+    if not breaker.allow():
+        return breaker.unavailable_message()
+    response = requests.get(...)
+    if is_outage(response.status_code):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """A call was rejected because the dependency's circuit is open; the message is the tool response"""
+
+
+def is_outage(status_code: int) -> bool:
+    """Whether an HTTP status means the service is unhealthy (rate limited or server error), not a bad request"""
+    return status_code == 429 or status_code >= 500
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one external dependency"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.rejections = 0
+        self.opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Ask to make a call
+
+        Returns:
+            True if the call may go ahead (closed, or the half-open probe), False if rejected
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probe_started = None
+                print(f"🔌 Circuit {self.name} half-open, probing")
+            if self.state == HALF_OPEN:
+                # One probe at a time; a probe that never reported back expires after reset_timeout
+                if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+                    self._probe_started = now
+                    return True
+            elif self.state == CLOSED:
+                return True
+            self.rejections += 1
+            return False
+
+    def record_success(self) -> None:
+        """Report a call the service answered properly"""
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"✅ Circuit {self.name} closed")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        """Report a call that failed because of the service (timeout, connection error, 429, 5xx)"""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._probe_started = None
+                self.trips += 1
+                print(
+                    f"🔌 Circuit {self.name} opened after {self.consecutive_failures} consecutive failures, "
+                    f"retrying in {self.reset_timeout:.0f}s"
+                )
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 when not open)"""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def unavailable_message(self) -> str:
+        """Tool response for a rejected call"""
+        return (
+            f"❌ {self.name} unavailable: circuit open after {self.consecutive_failures} consecutive failures, "
+            f"retry after {self.retry_after():.0f}s. Continue without this source."
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and counters"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "trips": self.trips,
+                "rejections": self.rejections,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """
+    Get the process-wide breaker of a dependency, created on first use
+
+    Args:
+        name: Dependency name, e.g. "jina" or "alphavantage"
+
+    Returns:
+        CircuitBreaker configured from CIRCUIT_BREAKER_FAILURES and CIRCUIT_BREAKER_RESET_SECONDS
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=int(os.getenv("CIRCUIT_BREAKER_FAILURES", "5")),
+                reset_timeout=float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "60")),
+            )
+        return breaker
+
+
+def get_breaker_snapshot() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the state of every breaker
+
+    Returns:
+        {dependency: {"state", "consecutive_failures", "trips", "rejections"}}
+    """
+    with _breakers_lock:
+        breakers = sorted(_breakers.items())
+    return {name: breaker.snapshot() for name, breaker in breakers}
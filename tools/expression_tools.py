@@ -0,0 +1,146 @@
+"""
+Safe arithmetic expression evaluation for the Math tool server
+
+Expressions are parsed with ast and evaluated by walking the tree; only numbers, variable
+names, arithmetic operators and a fixed set of functions are allowed, nothing is passed to
+eval. Variables may be numbers or equal-length lists of numbers, lists are computed
+element-wise with numpy (e.g. one share count per symbol in a single expression).
+"""
+
+import ast
+import operator
+from typing import Any, Callable, Dict, List, Union
+
+import numpy as np
+
+MAX_EXPRESSIONS = 200
+MAX_EXPRESSION_LENGTH = 500
+
+Value = Union[float, np.ndarray]
+
+_BINARY_OPERATORS: Dict[type, Callable[[Value, Value], Value]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS: Dict[type, Callable[[Value], Value]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+def _min(*args: Value) -> Value:
+    return np.min(args[0]) if len(args) == 1 else np.minimum.reduce(np.broadcast_arrays(*args))
+
+
+def _max(*args: Value) -> Value:
+    return np.max(args[0]) if len(args) == 1 else np.maximum.reduce(np.broadcast_arrays(*args))
+
+
+# Name -> (function, allowed argument counts); min/max with one argument reduce a list
+FUNCTIONS: Dict[str, Any] = {
+    "abs": (np.abs, (1,)),
+    "round": (lambda x, digits=0: np.round(x, int(digits)), (1, 2)),
+    "floor": (np.floor, (1,)),
+    "ceil": (np.ceil, (1,)),
+    "sqrt": (np.sqrt, (1,)),
+    "log": (np.log, (1,)),
+    "exp": (np.exp, (1,)),
+    "min": (_min, None),
+    "max": (_max, None),
+    "sum": (np.sum, (1,)),
+    "mean": (np.mean, (1,)),
+}
+
+
+def _evaluate_node(node: ast.AST, names: Dict[str, Value]) -> Value:
+    """Evaluate one node of a parsed expression"""
+    if isinstance(node, ast.Expression):
+        return _evaluate_node(node.body, names)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return float(node.value)
+    if isinstance(node, ast.Name):
+        if node.id not in names:
+            raise ValueError(f"Unknown variable {node.id}")
+        return names[node.id]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        return _BINARY_OPERATORS[type(node.op)](_evaluate_node(node.left, names), _evaluate_node(node.right, names))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_evaluate_node(node.operand, names))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        if node.func.id not in FUNCTIONS:
+            raise ValueError(f"Unknown function {node.func.id}, choose from {sorted(FUNCTIONS)}")
+        func, arities = FUNCTIONS[node.func.id]
+        if (arities and len(node.args) not in arities) or not node.args:
+            raise ValueError(f"Wrong number of arguments for {node.func.id}")
+        return func(*(_evaluate_node(arg, names) for arg in node.args))
+    raise ValueError(f"Unsupported syntax: {ast.dump(node)[:60]}")
+
+
+def _to_json(value: Value) -> Union[float, List[float]]:
+    """Convert a result to a JSON-friendly number or list of numbers"""
+    array = np.asarray(value, dtype=float)
+    if not np.all(np.isfinite(array)):
+        raise ValueError("Result is not a finite number")
+    return array.tolist() if array.ndim else float(array)
+
+
+def evaluate_expressions(expressions: List[str], variables: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Evaluate arithmetic expressions in order
+
+    An expression of the form "name = expression" also defines name for the expressions
+    after it. A failing expression yields {"error": ...} in its place and does not stop
+    the others.
+
+    Args:
+        expressions: Expressions such as "shares = floor(cash * 0.1 / price)"
+        variables: Numbers or equal-length lists of numbers
+
+    Returns:
+        {"results": [value or {"error": message} per expression], "variables": {assigned name: value}}
+    """
+    if len(expressions) > MAX_EXPRESSIONS:
+        return {"error": f"At most {MAX_EXPRESSIONS} expressions per call"}
+    names: Dict[str, Value] = {}
+    for name, value in variables.items():
+        if not name.isidentifier():
+            return {"error": f"Invalid variable name {name}"}
+        try:
+            array = np.asarray(value, dtype=float)
+        except (TypeError, ValueError):
+            return {"error": f"Variable {name} must be a number or a list of numbers"}
+        if array.ndim > 1:
+            return {"error": f"Variable {name} must be a number or a list of numbers"}
+        names[name] = array if array.ndim else float(array)
+
+    results: List[Any] = []
+    assigned: Dict[str, Any] = {}
+    for expression in expressions:
+        try:
+            if len(expression) > MAX_EXPRESSION_LENGTH:
+                raise ValueError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+            target = None
+            source = expression
+            if "=" in expression:
+                target, source = (part.strip() for part in expression.split("=", 1))
+                if not target.isidentifier() or target in FUNCTIONS:
+                    raise ValueError(f"Invalid assignment target {target}")
+            with np.errstate(all="raise"):
+                value = _evaluate_node(ast.parse(source, mode="eval"), names)
+            result = _to_json(value)
+        except (FloatingPointError, OverflowError) as e:
+            results.append({"error": f"{expression}: arithmetic error ({e})"})
+            continue
+        except (SyntaxError, ValueError, TypeError, ZeroDivisionError) as e:
+            results.append({"error": f"{expression}: {e}"})
+            continue
+        if target:
+            names[target] = value
+            assigned[target] = result
+        results.append(result)
+    return {"results": results, "variables": assigned}
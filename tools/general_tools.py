@@ -1,12 +1,45 @@
+import functools
 import json
 import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Dict, Iterator, Optional
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Session-scoped config (signature, date, market, log path, trade flag). Values set with
+# session_scope() take precedence over the runtime env file for the current thread or
+# asyncio task and the tasks it starts, so several sessions can share one process.
+_session_config: ContextVar[Optional[Dict[str, Any]]] = ContextVar("session_config", default=None)
+
+# HTTP headers carrying session config to the MCP tool servers
+SESSION_HEADERS = {
+    "SIGNATURE": "X-AITrader-Signature",
+    "TODAY_DATE": "X-AITrader-Today-Date",
+    "MARKET": "X-AITrader-Market",
+    "LOG_PATH": "X-AITrader-Log-Path",
+    # Wall-clock deadline of the trading session, seconds since the epoch
+    "DEADLINE": "X-AITrader-Deadline",
+}
+
+# RUNTIME_ENV_PATH value -> resolved absolute path (directory already created)
+_resolved_paths = {}
+
+# Parsed runtime env, revalidated against the file's (mtime, size, inode) on every read.
+# write_config_value replaces the file atomically, so each write yields a new inode.
+_runtime_env_cache = {"path": None, "stat": None, "generation": -1, "data": {}}
+
+# Bumped by write_config_value and invalidate_config_cache to force a reload
+_config_generation = 0
+
+# Read counters, reported by the benchmark below
+_config_stats = {"reads": 0, "loads": 0}
+
+
 def _resolve_runtime_env_path() -> str:
     """Resolve runtime env path from RUNTIME_ENV_PATH in .env file.
     
@@ -20,34 +53,220 @@ def _resolve_runtime_env_path() -> str:
     if not path:
         # Fallback to default if not set
         path = "data/.runtime_env.json"
+
+    # Resolved once per distinct RUNTIME_ENV_PATH (main_parrallel.py switches it per model)
+    resolved = _resolved_paths.get(path)
+    if resolved is not None:
+        return resolved
     
     # If relative path, resolve from project root
-    if not os.path.isabs(path):
+    resolved = path
+    if not os.path.isabs(resolved):
         base_dir = Path(__file__).resolve().parents[1]
-        path = str(base_dir / path)
+        resolved = str(base_dir / resolved)
     
     # Ensure directory exists
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(resolved).parent.mkdir(parents=True, exist_ok=True)
     
-    return path
+    _resolved_paths[path] = resolved
+    return resolved
+
+
+def _stat_key(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
 
 
 def _load_runtime_env() -> dict:
     path = _resolve_runtime_env_path()
     if path is None:
         return {}
+
+    stat_key = _stat_key(path)
+    cache = _runtime_env_cache
+    if cache["path"] == path and cache["stat"] == stat_key and cache["generation"] == _config_generation:
+        return cache["data"]
+
+    _config_stats["loads"] += 1
+    data = {}
     try:
-        if os.path.exists(path):
+        if stat_key is not None:
             with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    return data
+                loaded = json.load(f)
+                if isinstance(loaded, dict):
+                    data = loaded
     except Exception:
         pass
-    return {}
+
+    cache.update(path=path, stat=stat_key, generation=_config_generation, data=data)
+    return data
+
+
+def invalidate_config_cache() -> None:
+    """Force the next get_config_value call to re-read the runtime env file."""
+    global _config_generation
+    _config_generation += 1
+
+
+@contextmanager
+def session_scope(**values: Any) -> Iterator[Dict[str, Any]]:
+    """Run a block with session-scoped config values, e.g. session_scope(SIGNATURE="gpt-5", TODAY_DATE=date).
+
+    Inside the block get_config_value returns these values before consulting the runtime
+    env file, and write_config_value updates the session instead of writing the file.
+    Scopes nest: an inner scope inherits and may override the outer scope's values.
+
+    Yields:
+        The session's config dictionary
+    """
+    session = dict(_session_config.get() or {})
+    session.update({key: value for key, value in values.items() if value is not None})
+    token = _session_config.set(session)
+    try:
+        yield session
+    finally:
+        _session_config.reset(token)
+
+
+def get_session_config() -> Optional[Dict[str, Any]]:
+    """Return the active session's config dictionary, or None outside session_scope()."""
+    return _session_config.get()
+
+
+def session_headers(session: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """Build the MCP request headers for a session (the active one by default)."""
+    session = session if session is not None else (_session_config.get() or {})
+    return {header: str(session[key]) for key, header in SESSION_HEADERS.items() if session.get(key) is not None}
+
+
+def validate_session_values(values: Dict[str, str]) -> Optional[str]:
+    """Check header-supplied session config that ends up in filesystem paths.
+
+    SIGNATURE names a directory, so it must be a single path component. LOG_PATH must
+    stay inside the project's data directory, like the ./data/agent_data default.
+
+    Args:
+        values: {config key: value} as returned by get_request_session
+
+    Returns:
+        None if the values are safe to use, otherwise a description of the problem
+    """
+    signature = values.get("SIGNATURE")
+    if signature is not None and (
+        "/" in signature or "\\" in signature or ".." in signature or "\0" in signature or not signature.strip(". ")
+    ):
+        return f"Invalid signature {signature!r}: must be a single directory name"
+
+    log_path = values.get("LOG_PATH")
+    if log_path is not None:
+        data_dir = Path(__file__).resolve().parents[1] / "data"
+        relative = log_path[7:] if log_path.startswith("./data/") else log_path
+        if "\0" in log_path or ".." in Path(relative).parts:
+            return f"Invalid log path {log_path!r}"
+        # Readers join LOG_PATH under data/, an absolute path would replace that prefix
+        target = (data_dir / relative).resolve()
+        if target != data_dir and data_dir not in target.parents:
+            return f"Invalid log path {log_path!r}: must be inside {data_dir}"
+    return None
+
+
+def get_request_session() -> Dict[str, str]:
+    """Read session config from the headers of the MCP request being served.
+
+    Returns:
+        {config key: value} for the X-AITrader-* headers present, empty outside an
+        HTTP request or for clients that do not send them
+    """
+    try:
+        from fastmcp.server.dependencies import get_http_headers
+    except ImportError:
+        return {}
+    headers = get_http_headers()
+    if not headers:
+        return {}
+    return {key: headers[header.lower()] for key, header in SESSION_HEADERS.items() if headers.get(header.lower())}
+
+
+class DeadlineExceeded(TimeoutError):
+    """The session's DEADLINE has passed"""
+
+
+def deadline_remaining() -> Optional[float]:
+    """Seconds left until the active session's DEADLINE, or None when the session has no deadline."""
+    deadline = get_config_value("DEADLINE")
+    if deadline in (None, ""):
+        return None
+    try:
+        return float(deadline) - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+def check_deadline() -> None:
+    """Raise DeadlineExceeded if the active session's DEADLINE has passed."""
+    remaining = deadline_remaining()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Session deadline exceeded by {-remaining:.1f}s")
+
+
+def request_timeout(default: float) -> float:
+    """Timeout for an outbound request: the default, capped by the time left in the session.
+
+    Args:
+        default: Timeout in seconds when the session has more time than that (or no deadline)
+
+    Returns:
+        Timeout in seconds
+
+    Raises:
+        DeadlineExceeded: The session has no time left
+    """
+    check_deadline()
+    remaining = deadline_remaining()
+    return default if remaining is None else min(default, remaining)
+
+
+def request_session(func: Callable) -> Callable:
+    """Decorator for MCP tools: run the tool in a session_scope() built from the request headers.
+
+    One tool server process can then serve many agent sessions at once. Requests without
+    X-AITrader-* headers keep reading the runtime env file. Calls arriving after the
+    session's DEADLINE raise DeadlineExceeded instead of doing work nobody will read.
+    A SIGNATURE or LOG_PATH header that would lead outside the data directory is
+    answered with {"error": ...} without running the tool.
+
+    Usage:
+        @mcp.tool()
+        @request_session
+        def buy(symbol: str, amount: int) -> Dict[str, Any]: ...
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        values = get_request_session()
+        if not values:
+            check_deadline()
+            return func(*args, **kwargs)
+        error = validate_session_values(values)
+        if error:
+            print(f"⚠️ Rejected {func.__name__} request: {error}")
+            return {"error": error}
+        with session_scope(**values):
+            check_deadline()
+            return func(*args, **kwargs)
+
+    return wrapper
 
 
 def get_config_value(key: str, default=None):
+    _config_stats["reads"] += 1
+    session = _session_config.get()
+    if session is not None and key in session:
+        return session[key]
+
     _RUNTIME_ENV = _load_runtime_env()
 
     if key in _RUNTIME_ENV:
@@ -56,17 +275,31 @@ def get_config_value(key: str, default=None):
 
 
 def write_config_value(key: str, value: Any):
+    session = _session_config.get()
+    if session is not None:
+        # In-process session state, no file write
+        session[key] = value
+        return
+
     path = _resolve_runtime_env_path()
     if path is None:
         print(f"⚠️  WARNING: RUNTIME_ENV_PATH not set, config value '{key}' not persisted")
         return
-    _RUNTIME_ENV = _load_runtime_env()
+    _RUNTIME_ENV = dict(_load_runtime_env())
+    if key in _RUNTIME_ENV and _RUNTIME_ENV[key] == value:
+        return
     _RUNTIME_ENV[key] = value
     try:
-        with open(path, "w", encoding="utf-8") as f:
+        # Write to a temp file and rename, so readers in other processes never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(_RUNTIME_ENV, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, path)
     except Exception as e:
         print(f"❌ Error writing config to {path}: {e}")
+        return
+    invalidate_config_cache()
+    _runtime_env_cache.update(path=path, stat=_stat_key(path), generation=_config_generation, data=_RUNTIME_ENV)
 
 
 def extract_conversation(conversation: dict, output_type: str):
@@ -176,3 +409,67 @@ def extract_first_tool_message_content(conversation: dict):
     if isinstance(first, dict):
         return first.get("content")
     return getattr(first, "content", None)
+
+
+if __name__ == "__main__":
+    # Microbenchmark: runtime config reads made by one buy() and what they cost with and
+    # without the cache. Trades on a scratch copy of a model's ledger under data/.
+    import shutil
+    import sys
+    import tempfile
+
+    project_root = Path(__file__).resolve().parents[1]
+    sys.path.insert(0, str(project_root))
+    # Use the imported module so the counters are the ones the trade tools update
+    from tools import general_tools as config
+    import agent_tools.tool_trade as tool_trade
+
+    source_signature = sys.argv[1] if len(sys.argv) > 1 else "gpt-5"
+    today_date = sys.argv[2] if len(sys.argv) > 2 else "2025-10-15 11:00:00"
+    bench_signature = f"_config_bench_{os.getpid()}"
+
+    scratch_dir = Path(tempfile.mkdtemp(prefix="_config_bench_", dir=project_root / "data"))
+    lock_dir = project_root / "data" / "agent_data" / bench_signature
+    try:
+        ledger = scratch_dir / bench_signature / "position" / "position.jsonl"
+        ledger.parent.mkdir(parents=True)
+        shutil.copy(project_root / "data" / "agent_data" / source_signature / "position" / "position.jsonl", ledger)
+
+        os.environ["RUNTIME_ENV_PATH"] = str(scratch_dir / ".runtime_env.json")
+        config.write_config_value("SIGNATURE", bench_signature)
+        config.write_config_value("TODAY_DATE", today_date)
+        config.write_config_value("LOG_PATH", f"./data/{scratch_dir.name}")
+
+        config._config_stats.update(reads=0, loads=0)
+        result = tool_trade.buy("NVDA", 1)
+        reads_per_trade = config._config_stats["reads"]
+        loads_per_trade = config._config_stats["loads"]
+        if isinstance(result, dict) and "error" in result:
+            print(f"⚠️  buy() returned an error: {result['error']}")
+        print(f"📊 Config reads per buy() ({source_signature} @ {today_date}): "
+              f"{reads_per_trade} reads, {loads_per_trade} file loads")
+
+        def read_uncached(key):
+            # Previous behaviour: resolve path, mkdir and parse the file on every read
+            path = os.environ["RUNTIME_ENV_PATH"]
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get(key)
+
+        iterations = 20000
+        start = time.perf_counter()
+        for _ in range(iterations):
+            read_uncached("TODAY_DATE")
+        uncached = (time.perf_counter() - start) / iterations
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            config.get_config_value("TODAY_DATE")
+        cached = (time.perf_counter() - start) / iterations
+
+        print(f"   Uncached read: {uncached * 1e6:8.2f} µs  ({reads_per_trade * uncached * 1e3:.3f} ms per trade)")
+        print(f"   Cached read:   {cached * 1e6:8.2f} µs  ({reads_per_trade * cached * 1e3:.3f} ms per trade)")
+        print(f"   Speedup:       {uncached / cached:8.1f}x")
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+        shutil.rmtree(lock_dir, ignore_errors=True)
@@ -0,0 +1,411 @@
+"""
+Technical indicators over the price store
+
+Indicators are computed with pandas over the whole (bar time x symbol) price matrix of a
+merged.jsonl file at once, and cached until the file changes. Lookups then only pick a row.
+
+Supported names (window defaults in parentheses):
+    sma_N (20), ema_N (20), rsi_N (14, Wilder), atr_N (14, Wilder),
+    realized_vol_N (20, annualized std of log returns), momentum_N (20, N-bar return),
+    ma_distance_N (20, close / sma_N - 1), volume_surge_N (20, volume / mean of the previous N volumes)
+
+The screener (screen_universe) ranks a whole price file on these, plus the opening gap,
+caching the metric vectors per (file version, date). Rolling return covariances for the
+portfolio_risk tool are kept per (file version, bar, window) as well. Both caches keep the
+INDICATOR_CACHE_SIZE (default 256) most recently used entries per file version.
+"""
+
+import os
+import re
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from statistics import median
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add project root directory to Python path to allow running this file from subdirectories
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tools.price_store import PriceStore
+
+INDICATOR_DEFAULT_WINDOWS = {
+    "sma": 20,
+    "ema": 20,
+    "rsi": 14,
+    "atr": 14,
+    "realized_vol": 20,
+    "momentum": 20,
+    "ma_distance": 20,
+    "volume_surge": 20,
+}
+# Screener metric name -> indicator kind ("gap" is computed from the current bar's open)
+SCREEN_METRICS = {
+    "return": "momentum",
+    "volatility": "realized_vol",
+    "ma_distance": "ma_distance",
+    "volume_surge": "volume_surge",
+    "gap": None,
+}
+MAX_WINDOW = 250
+
+# Screener vectors and covariance matrices kept per file version, least recently used evicted
+INDICATOR_CACHE_SIZE = int(os.getenv("INDICATOR_CACHE_SIZE", "256"))
+
+_INDICATOR_PATTERN = re.compile(r"^(%s)(?:_(\d+))?$" % "|".join(INDICATOR_DEFAULT_WINDOWS))
+
+
+def parse_indicator(name: str) -> Tuple[str, int]:
+    """
+    Parse an indicator name such as "sma_20" or "rsi"
+
+    Args:
+        name: Indicator name
+
+    Returns:
+        (kind, window)
+
+    Raises:
+        ValueError: Unknown indicator or window out of range
+    """
+    match = _INDICATOR_PATTERN.match(name)
+    if not match:
+        raise ValueError(f"Unknown indicator {name}, choose from {[f'{kind}_N' for kind in INDICATOR_DEFAULT_WINDOWS]}")
+    kind, window = match.group(1), match.group(2)
+    window = int(window) if window else INDICATOR_DEFAULT_WINDOWS[kind]
+    if not 1 < window <= MAX_WINDOW:
+        raise ValueError(f"Window of {name} must be between 2 and {MAX_WINDOW}")
+    return kind, window
+
+
+class IndicatorCache:
+    """Price matrices and computed indicators of one PriceStore version"""
+
+    def __init__(self, store: PriceStore):
+        self.version = store.version
+        self.timestamps = store.timestamps()
+        symbols = store.symbols()
+        columns = {
+            "open": "1. buy price",
+            "high": "2. high",
+            "low": "3. low",
+            "close": "4. sell price",
+            "volume": "5. volume",
+        }
+        values = {field: np.full((len(self.timestamps), len(symbols)), np.nan) for field in columns}
+        row_of = {timestamp: row for row, timestamp in enumerate(self.timestamps)}
+        for col, symbol in enumerate(symbols):
+            for timestamp, bar in (store.get_series(symbol) or {}).items():
+                row = row_of.get(timestamp)
+                if row is None or not isinstance(bar, dict):
+                    continue
+                for field, key in columns.items():
+                    try:
+                        values[field][row, col] = float(bar[key])
+                    except (KeyError, TypeError, ValueError):
+                        pass
+        self.prices = {field: pd.DataFrame(matrix, columns=symbols) for field, matrix in values.items()}
+        self.bars_per_year = 252 * self._bars_per_day()
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._screens: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._covariances: "OrderedDict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._lru_lock = threading.Lock()
+        # window -> (last row, sum x_i x_j, sum x_i over rows where j is valid, pair counts)
+        self._cov_state: Dict[int, Tuple[int, np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._returns: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def _bars_per_day(self) -> int:
+        """Typical number of bars per trading day (1 for daily data)"""
+        per_day: Dict[str, int] = {}
+        for timestamp in self.timestamps:
+            day = timestamp[:10]
+            per_day[day] = per_day.get(day, 0) + 1
+        return max(1, int(median(per_day.values()))) if per_day else 1
+
+    def _lru_get(self, cache: OrderedDict, key: Tuple) -> Any:
+        """Get an entry of a bounded cache and mark it recently used, or None"""
+        with self._lru_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def _lru_put(self, cache: OrderedDict, key: Tuple, value: Any) -> Any:
+        """Store an entry in a bounded cache, evicting the least recently used beyond INDICATOR_CACHE_SIZE"""
+        with self._lru_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > INDICATOR_CACHE_SIZE:
+                cache.popitem(last=False)
+        return value
+
+    def _compute(self, kind: str, window: int) -> pd.DataFrame:
+        close = self.prices["close"]
+        if kind == "sma":
+            return close.rolling(window, min_periods=window).mean()
+        if kind == "ema":
+            return close.ewm(span=window, adjust=False, min_periods=window).mean()
+        if kind == "rsi":
+            delta = close.diff()
+            gain = delta.clip(lower=0).ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+            loss = (-delta.clip(upper=0)).ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+            return 100 - 100 / (1 + gain / loss)
+        if kind == "atr":
+            previous_close = close.shift(1)
+            high, low = self.prices["high"], self.prices["low"]
+            true_range = np.maximum(high - low, np.maximum((high - previous_close).abs(), (low - previous_close).abs()))
+            return true_range.ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+        if kind == "realized_vol":
+            log_returns = np.log(close / close.shift(1))
+            return log_returns.rolling(window, min_periods=window).std() * np.sqrt(self.bars_per_year)
+        if kind == "momentum":
+            return close / close.shift(window) - 1
+        if kind == "ma_distance":
+            return close / close.rolling(window, min_periods=window).mean() - 1
+        if kind == "volume_surge":
+            volume = self.prices["volume"]
+            return volume / volume.shift(1).rolling(window, min_periods=window).mean()
+        raise ValueError(f"Unknown indicator kind {kind}")
+
+    def get_frame(self, name: str) -> pd.DataFrame:
+        """
+        Get an indicator for all symbols and bar times, computing it on first use
+
+        Args:
+            name: Indicator name, see parse_indicator
+
+        Returns:
+            DataFrame indexed by bar position (as in self.timestamps) with one column per symbol
+        """
+        kind, window = parse_indicator(name)
+        key = f"{kind}_{window}"
+        frame = self._frames.get(key)
+        if frame is None:
+            with self._lock:
+                frame = self._frames.get(key)
+                if frame is None:
+                    frame = self._frames[key] = self._compute(kind, window)
+        return frame
+
+    def get_screen_vector(self, name: str, current: int) -> np.ndarray:
+        """
+        Get a screener metric for all symbols at the open of one bar, computing it on first use
+
+        Args:
+            name: Normalized metric name, see parse_screen_metric
+            current: Position of the bar in self.timestamps (must be > 0)
+
+        Returns:
+            Values aligned with the symbol columns, NaN where not computable
+        """
+        key = (self.timestamps[current], name)
+        vector = self._lru_get(self._screens, key)
+        if vector is None:
+            if name == "gap":
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    vector = self.prices["open"].to_numpy()[current] / self.prices["close"].to_numpy()[current - 1] - 1
+            else:
+                kind, _, window = name.rpartition("_")
+                vector = self.get_frame(f"{SCREEN_METRICS[kind]}_{window}").to_numpy()[current - 1]
+            self._lru_put(self._screens, key, vector)
+        return vector
+
+    def _window_sums(self, first: int, last: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pairwise sums over return rows first..last (inclusive), NaN returns excluded pairwise"""
+        returns = self._returns[first:last + 1]
+        valid = np.isfinite(returns).astype(float)
+        values = np.nan_to_num(returns)
+        return values.T @ values, values.T @ valid, valid.T @ valid
+
+    def get_covariance(self, row: int, window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Covariance of log returns over the window of bars ending at row, for all symbol pairs
+
+        The window sums are updated incrementally from the previous row requested for the same
+        window (adding the new bar, dropping the oldest), and each (row, window) result is cached.
+
+        Args:
+            row: Position of the last bar in self.timestamps
+            window: Number of returns in the window
+
+        Returns:
+            (covariance per bar, number of returns each pair was computed from), NaN where a
+            pair has fewer than 2 common returns
+        """
+        key = (row, window)
+        result = self._lru_get(self._covariances, key)
+        if result is not None:
+            return result
+        with self._lock:
+            if self._returns is None:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    close = self.prices["close"].to_numpy()
+                    self._returns = np.vstack([np.full((1, close.shape[1]), np.nan), np.log(close[1:] / close[:-1])])
+            first = max(0, row - window + 1)
+            state = self._cov_state.get(window)
+            if state is not None and 0 < row - state[0] < window:
+                # Slide the window forward: add the new rows, drop the ones that fell out
+                previous_row, sum_xy, sum_x, count = state
+                added = self._window_sums(previous_row + 1, row)
+                sum_xy, sum_x, count = sum_xy + added[0], sum_x + added[1], count + added[2]
+                previous_first = max(0, previous_row - window + 1)
+                if first > previous_first:
+                    removed = self._window_sums(previous_first, first - 1)
+                    sum_xy, sum_x, count = sum_xy - removed[0], sum_x - removed[1], count - removed[2]
+            else:
+                sum_xy, sum_x, count = self._window_sums(first, row)
+            self._cov_state[window] = (row, sum_xy, sum_x, count)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                covariance = (sum_xy - sum_x * sum_x.T / count) / (count - 1)
+            covariance[count < 2] = np.nan
+            result = self._lru_put(self._covariances, key, (covariance, count))
+        return result
+
+    def row_as_of(self, as_of: str, inclusive: bool = True) -> Optional[int]:
+        """Position of the latest bar time <= as_of (< as_of if not inclusive), or None"""
+        position = (bisect_right if inclusive else bisect_left)(self.timestamps, as_of)
+        return position - 1 if position > 0 else None
+
+
+_caches: Dict[str, IndicatorCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_indicator_cache(store: PriceStore) -> IndicatorCache:
+    """
+    Get the indicator cache of a price store, rebuilt when the price file changes
+
+    Args:
+        store: Refreshed PriceStore (see get_price_store)
+
+    Returns:
+        IndicatorCache matching the store's current data
+    """
+    cache_key = str(store.path)
+    cache = _caches.get(cache_key)
+    if cache is None or cache.version != store.version:
+        with _caches_lock:
+            cache = _caches.get(cache_key)
+            if cache is None or cache.version != store.version:
+                cache = _caches[cache_key] = IndicatorCache(store)
+    return cache
+
+
+def get_indicators_as_of(
+    store: PriceStore, symbols: List[str], indicators: List[str], as_of: str, inclusive: bool = True
+) -> Tuple[Optional[str], Dict[str, List[Optional[float]]]]:
+    """
+    Look up indicator values of many symbols at the latest bar time up to as_of
+
+    Args:
+        store: Refreshed PriceStore
+        symbols: Stock symbols, all present in the store
+        indicators: Indicator names
+        as_of: Upper bound on the bar time
+        inclusive: Whether a bar at exactly as_of may be used
+
+    Returns:
+        (bar time used or None, {symbol: [value per indicator, None where not computable]})
+    """
+    cache = get_indicator_cache(store)
+    row = cache.row_as_of(as_of, inclusive)
+    if row is None:
+        return None, {symbol: [None] * len(indicators) for symbol in symbols}
+    values = {symbol: [] for symbol in symbols}
+    for name in indicators:
+        frame_row = cache.get_frame(name).iloc[row]
+        for symbol in symbols:
+            value = frame_row.get(symbol)
+            values[symbol].append(None if value is None or not np.isfinite(value) else round(float(value), 4))
+    return cache.timestamps[row], values
+
+
+def parse_screen_metric(name: str) -> str:
+    """
+    Validate a screener metric name such as "return_5", "volatility_20" or "gap"
+
+    Args:
+        name: Metric name
+
+    Returns:
+        Normalized name, with the default window filled in
+
+    Raises:
+        ValueError: Unknown metric or window out of range
+    """
+    if name == "gap":
+        return name
+    kind, _, window = name.rpartition("_") if name[-1:].isdigit() else (name, "", "")
+    if kind not in SCREEN_METRICS or kind == "gap":
+        raise ValueError(f"Unknown metric {name}, choose from {[f'{m}_N' if SCREEN_METRICS[m] else m for m in SCREEN_METRICS]}")
+    _, window = parse_indicator(f"{SCREEN_METRICS[kind]}_{window}" if window else SCREEN_METRICS[kind])
+    return f"{kind}_{window}"
+
+
+def screen_universe(
+    store: PriceStore, date: str, metrics: List[str]
+) -> Tuple[str, str, List[str], Dict[str, np.ndarray]]:
+    """
+    Compute screener metrics for every symbol of a price file at the open of the bar at date
+
+    Metrics use bars completed before that bar; "gap" compares that bar's open with the
+    previous close. Results are cached per (file version, date, metric).
+
+    Args:
+        store: Refreshed PriceStore
+        date: Bar time, or a date for the first bar of that day
+        metrics: Names from parse_screen_metric
+
+    Returns:
+        (current bar time, last completed bar time, symbols, {metric: values aligned with symbols})
+
+    Raises:
+        ValueError: No bar at date, or no completed bar before it
+    """
+    cache = get_indicator_cache(store)
+    current = bisect_left(cache.timestamps, date)
+    if current == len(cache.timestamps) or not cache.timestamps[current].startswith(date):
+        raise ValueError(f"No price bar at {date}")
+    if current == 0:
+        raise ValueError(f"No price history before {date}")
+    completed = current - 1
+    bar_time = cache.timestamps[current]
+
+    values = {name: cache.get_screen_vector(name, current) for name in metrics}
+    return bar_time, cache.timestamps[completed], list(cache.prices["close"].columns), values
+
+
+def get_covariance_as_of(
+    store: PriceStore, symbols: List[str], as_of: str, window: int, inclusive: bool = True
+) -> Tuple[Optional[str], np.ndarray, np.ndarray]:
+    """
+    Annualized covariance of log returns of some symbols over the window ending at as_of
+
+    Args:
+        store: Refreshed PriceStore
+        symbols: Stock symbols, all present in the store
+        as_of: Upper bound on the last bar time
+        window: Number of returns in the window
+        inclusive: Whether a bar at exactly as_of may be used
+
+    Returns:
+        (last bar time or None, covariance matrix aligned with symbols (NaN where a pair has too few
+        common returns), last close of each symbol at or before that bar)
+    """
+    cache = get_indicator_cache(store)
+    row = cache.row_as_of(as_of, inclusive)
+    if row is None:
+        return None, np.full((len(symbols), len(symbols)), np.nan), np.full(len(symbols), np.nan)
+    columns = [cache.prices["close"].columns.get_loc(symbol) for symbol in symbols]
+    covariance, count = cache.get_covariance(row, window)
+    selected = covariance[np.ix_(columns, columns)] * cache.bars_per_year
+    # Require at least half the window of common returns for each pair
+    selected[count[np.ix_(columns, columns)] < max(2, window // 2)] = np.nan
+    last_close = cache.prices["close"].iloc[: row + 1, columns].ffill().to_numpy()[-1]
+    return cache.timestamps[row], selected, last_close
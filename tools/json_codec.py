@@ -0,0 +1,281 @@
+"""
+JSON codec shared by every JSONL reader and writer (price data, ledgers, logs, metrics)
+
+Backends are picked at import time: msgspec, then orjson, then the stdlib json module.
+All backends decode into plain, untyped dicts and lists and accept every line json.loads
+accepts (input a fast backend rejects, e.g. NaN literals, is retried with json.loads), so
+callers do not depend on which one is installed (`pip install msgspec` or `pip install orjson`
+to enable the fast paths). Output matches json.dumps for non-finite floats (NaN, Infinity).
+
+Run this file directly to benchmark decode throughput on the local data/ files:
+
+    python tools/json_codec.py [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, TypedDict, Union
+
+# Add project root directory to Python path to allow running this file from subdirectories
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+BACKEND = "msgspec" if msgspec is not None else "orjson" if orjson is not None else "json"
+
+# Exceptions raised by loads()/decode_*() on malformed input, for use in except clauses
+if msgspec is not None:
+    DecodeError = (ValueError, msgspec.DecodeError)
+else:
+    DecodeError = (ValueError,)
+
+# Known record shapes, used by the benchmark below to compare typed msgspec decoding. The
+# read path does not use them: typed decoding drops undeclared keys and rejects values the
+# files may legitimately hold (e.g. "id": 1.0).
+Number = Union[int, float]
+
+# Price documents come from external APIs with varying "Time Series (...)" keys, so only
+# the outer structure is fixed: every top-level value ("Meta Data", series) is an object.
+PriceDoc = Dict[str, Dict[str, Any]]
+
+PositionRecord = TypedDict(
+    "PositionRecord",
+    {
+        "date": str,
+        "id": int,
+        "schema": int,
+        "fork": Dict[str, Any],
+        "this_action": Dict[str, Any],
+        "intraday": List[Dict[str, Any]],
+        "positions": Dict[str, Number],
+    },
+    total=False,
+)
+
+LogEntry = TypedDict(
+    "LogEntry",
+    {
+        "timestamp": str,
+        "signature": str,
+        "new_messages": Any,
+    },
+    total=False,
+)
+
+MetricsRecord = TypedDict(
+    "MetricsRecord",
+    {
+        "id": int,
+        "timestamp": str,
+        "model_name": str,
+        "analysis_period": Dict[str, Any],
+        "performance_metrics": Dict[str, Any],
+        "portfolio_summary": Dict[str, Any],
+    },
+    total=False,
+)
+
+
+if msgspec is not None:
+    _fast_loads = msgspec.json.Decoder().decode
+elif orjson is not None:
+    _fast_loads = orjson.loads
+else:
+    _fast_loads = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Decode a JSON document into plain dicts and lists
+
+    Args:
+        data: JSON text
+
+    Returns:
+        Decoded value, as json.loads would return it
+
+    Raises:
+        ValueError: data is not valid JSON (also json.loads rejects it)
+    """
+    if _fast_loads is not None:
+        try:
+            return _fast_loads(data)
+        except DecodeError:
+            pass
+    return json.loads(data)
+
+
+# Per-file-type names kept for readers; every file type decodes the same, untyped way
+decode_price_doc = loads
+decode_position_record = loads
+decode_log_entry = loads
+decode_metrics_record = loads
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """Whether obj holds a NaN or infinite float, which the fast encoders would write as null"""
+    if isinstance(obj, float):
+        return obj != obj or obj in (float("inf"), float("-inf"))
+    if isinstance(obj, dict):
+        return any(_has_non_finite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(value) for value in obj)
+    if hasattr(obj, "dtype") and hasattr(obj, "tolist"):
+        # numpy arrays
+        return _has_non_finite(obj.tolist())
+    return False
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_to_builtin)
+
+
+def _to_builtin(obj: Any) -> Any:
+    """json.dumps fallback for numpy scalars and arrays"""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+if orjson is not None:
+
+    def dumps(obj: Any) -> str:
+        """
+        Serialize an object to a compact JSON string (non-ASCII kept as-is)
+
+        Args:
+            obj: JSON-serializable object, numpy scalars and arrays included
+
+        Returns:
+            JSON string without trailing newline
+        """
+        try:
+            text = orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+        except TypeError:
+            # Types orjson does not know (e.g. float subclasses) go through stdlib json
+            return _stdlib_dumps(obj)
+        # orjson writes NaN/Infinity as null; keep json.dumps output for those (only a null can hide one)
+        if "null" in text and _has_non_finite(obj):
+            return _stdlib_dumps(obj)
+        return text
+
+elif msgspec is not None:
+    _encoder = msgspec.json.Encoder()
+
+    def dumps(obj: Any) -> str:
+        """
+        Serialize an object to a compact JSON string (non-ASCII kept as-is)
+
+        Args:
+            obj: JSON-serializable object
+
+        Returns:
+            JSON string without trailing newline
+        """
+        try:
+            text = _encoder.encode(obj).decode("utf-8")
+        except TypeError:
+            # numpy scalars and other types msgspec does not know go through stdlib json
+            return _stdlib_dumps(obj)
+        # msgspec writes NaN/Infinity as null; keep json.dumps output for those (only a null can hide one)
+        if "null" in text and _has_non_finite(obj):
+            return _stdlib_dumps(obj)
+        return text
+
+else:
+
+    def dumps(obj: Any) -> str:
+        """
+        Serialize an object to a compact JSON string (non-ASCII kept as-is)
+
+        Args:
+            obj: JSON-serializable object
+
+        Returns:
+            JSON string without trailing newline
+        """
+        return _stdlib_dumps(obj)
+
+
+def _benchmark_decoders() -> Dict[str, Dict[str, Callable[[Union[str, bytes]], Any]]]:
+    """Build {shape: {backend: decode function}} for every available backend"""
+    decoders: Dict[str, Dict[str, Callable[[Union[str, bytes]], Any]]] = {}
+    shapes = {"price": PriceDoc, "position": PositionRecord, "log": LogEntry, "metrics": MetricsRecord}
+    for name, shape in shapes.items():
+        decoders[name] = {"json": json.loads}
+        if orjson is not None:
+            decoders[name]["orjson"] = orjson.loads
+        if msgspec is not None:
+            decoders[name]["msgspec"] = msgspec.json.Decoder().decode
+            decoders[name]["msgspec-typed"] = msgspec.json.Decoder(shape).decode
+    return decoders
+
+
+def _collect_lines(data_dir: Path) -> Dict[str, List[bytes]]:
+    """Read the non-empty lines of all local JSONL files, grouped by record shape"""
+    patterns = {
+        "price": ["merged.jsonl", "A_stock/merged*.jsonl"],
+        "position": ["agent_data*/*/position/position.jsonl"],
+        "log": ["agent_data*/*/log/*/log.jsonl"],
+        "metrics": ["agent_data*/*/metrics/*.jsonl"],
+    }
+    lines: Dict[str, List[bytes]] = {}
+    for shape, globs in patterns.items():
+        lines[shape] = []
+        for pattern in globs:
+            for path in sorted(data_dir.glob(pattern)):
+                with path.open("rb") as f:
+                    lines[shape].extend(line for line in f if line.strip())
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON decode throughput on local data/ files")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes per backend (best is reported)")
+    args = parser.parse_args()
+
+    data_dir = Path(__file__).resolve().parents[1] / "data"
+    all_lines = _collect_lines(data_dir)
+    all_decoders = _benchmark_decoders()
+
+    print(f"📦 Active backend: {BACKEND}")
+    for shape, lines in all_lines.items():
+        if not lines:
+            print(f"⚠️  No {shape} files found under {data_dir}")
+            continue
+        total_bytes = sum(len(line) for line in lines)
+        print(f"\n📄 {shape}: {len(lines):,} records, {total_bytes / 1e6:.2f} MB")
+
+        baseline = None
+        for backend, decode in all_decoders[shape].items():
+            try:
+                for line in lines:
+                    decode(line)
+            except Exception as e:
+                print(f"   {backend:<14} ❌ {e}")
+                continue
+
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for line in lines:
+                    decode(line)
+                best = min(best, time.perf_counter() - start)
+            baseline = baseline or best
+            print(
+                f"   {backend:<14} {total_bytes / 1e6 / best:8.1f} MB/s  "
+                f"{len(lines) / best:12,.0f} rec/s  {baseline / best:5.2f}x"
+            )
@@ -0,0 +1,302 @@
+"""
+Fast access to append-only JSONL files (ledgers, metrics) without full-file passes
+
+- iter_lines_reverse / read_last_record: read backward from EOF for tail queries
+- JsonlIndex: byte-offset index of the records keyed by one field (e.g. "date"),
+  persisted in a sidecar file next to the JSONL file and extended incrementally as
+  records are appended. A rewritten file (e.g. after ledger compaction) is detected
+  and re-indexed from scratch.
+"""
+
+import hashlib
+import os
+import sys
+from bisect import bisect_left, insort
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+# Add project root directory to Python path to allow running this file from subdirectories
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tools.json_codec import DecodeError, dumps, loads
+
+SIDECAR_VERSION = 1
+
+# Bytes before the indexed end used to detect that a file was rewritten, not appended to
+_FINGERPRINT_BYTES = 256
+
+
+def iter_lines_reverse(path: Union[str, Path], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Yield the non-empty lines of a file from last to first
+
+    Args:
+        path: File path
+        chunk_size: Bytes read per backward step
+
+    Returns:
+        Iterator of raw lines without the trailing newline
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            read_size = min(chunk_size, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + remainder).split(b"\n")
+            # The first piece may be the tail of a line that starts in an earlier chunk
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line
+        if remainder.strip():
+            yield remainder
+
+
+def read_last_record(
+    path: Union[str, Path],
+    decode: Callable[[bytes], Any] = loads,
+    predicate: Optional[Callable[[Any], bool]] = None,
+) -> Optional[Any]:
+    """
+    Get the last decodable record of a JSONL file
+
+    Args:
+        path: JSONL file path
+        decode: Decoder for one line (see tools.json_codec)
+        predicate: Optional filter, the last record for which it returns True is returned
+
+    Returns:
+        The record, or None if the file is missing or has no matching record
+    """
+    if not os.path.exists(path):
+        return None
+    for line in iter_lines_reverse(path):
+        try:
+            record = decode(line)
+        except DecodeError:
+            # Malformed line or a record still being written
+            continue
+        if predicate is None or predicate(record):
+            return record
+    return None
+
+
+class JsonlIndex:
+    """
+    Byte-offset index of an append-only JSONL file, keyed by one field of its records
+
+    Keys are compared as strings, so ISO dates and timestamps sort chronologically.
+    Only complete lines (terminated by a newline) are indexed; a record that is
+    being appended is picked up by the next refresh.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        field: str,
+        decode: Callable[[bytes], Any] = loads,
+        persist: bool = True,
+    ):
+        """
+        Initialize index
+
+        Args:
+            path: JSONL file path
+            field: Record field to index by
+            decode: Decoder for one line (see tools.json_codec)
+            persist: Keep the index in a sidecar file ({path}.{field}.idx)
+        """
+        self.path = Path(path)
+        self.field = field
+        self.decode = decode
+        self.sidecar = self.path.with_name(f"{self.path.name}.{field}.idx") if persist else None
+
+        self._offsets: Dict[str, List[int]] = {}
+        self._sorted_keys: List[str] = []
+        self._count = 0
+        self._size = 0
+        self._stat: Tuple[int, int] = (0, 0)
+        self._fingerprint = ""
+        self._loaded_sidecar = False
+
+    def _compute_fingerprint(self, f, size: int) -> str:
+        start = max(0, size - _FINGERPRINT_BYTES)
+        f.seek(start)
+        return hashlib.sha1(f.read(size - start)).hexdigest()
+
+    def _reset(self) -> None:
+        self._offsets = {}
+        self._sorted_keys = []
+        self._count = 0
+        self._size = 0
+        self._fingerprint = ""
+
+    def _load_sidecar(self) -> None:
+        self._loaded_sidecar = True
+        if self.sidecar is None or not self.sidecar.exists():
+            return
+        try:
+            data = loads(self.sidecar.read_bytes())
+            if data.get("version") != SIDECAR_VERSION or data.get("field") != self.field:
+                return
+            self._offsets = {key: list(offsets) for key, offsets in data["offsets"].items()}
+            self._sorted_keys = sorted(self._offsets)
+            self._count = sum(len(offsets) for offsets in self._offsets.values())
+            self._size = int(data["size"])
+            self._fingerprint = data["fingerprint"]
+        except Exception:
+            # Corrupt or foreign sidecar, rebuilt on refresh
+            self._reset()
+
+    def _save_sidecar(self) -> None:
+        if self.sidecar is None:
+            return
+        payload = dumps(
+            {
+                "version": SIDECAR_VERSION,
+                "field": self.field,
+                "size": self._size,
+                "fingerprint": self._fingerprint,
+                "offsets": self._offsets,
+            }
+        )
+        tmp_file = self.sidecar.with_name(f"{self.sidecar.name}.{os.getpid()}.tmp")
+        try:
+            tmp_file.write_text(payload, encoding="utf-8")
+            os.replace(tmp_file, self.sidecar)
+        except OSError:
+            # Read-only data directory: the in-memory index still works
+            try:
+                tmp_file.unlink()
+            except OSError:
+                pass
+
+    def refresh(self) -> "JsonlIndex":
+        """
+        Bring the index up to date with the file
+
+        Returns:
+            self, for chaining
+        """
+        if not self._loaded_sidecar:
+            self._load_sidecar()
+
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._reset()
+            self._stat = (0, 0)
+            return self
+        if (stat.st_size, stat.st_mtime_ns) == self._stat:
+            return self
+
+        with self.path.open("rb") as f:
+            # Appended file: the indexed prefix is unchanged. Otherwise start over.
+            rebuilt = stat.st_size < self._size or self._compute_fingerprint(f, self._size) != self._fingerprint
+            if rebuilt:
+                self._reset()
+
+            start_size = self._size
+            f.seek(self._size)
+            offset = self._size
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    try:
+                        key = self.decode(line).get(self.field)
+                    except (AttributeError, *DecodeError):
+                        key = None
+                    if key is not None:
+                        key = str(key)
+                        if key not in self._offsets:
+                            self._offsets[key] = []
+                            insort(self._sorted_keys, key)
+                        self._offsets[key].append(offset)
+                        self._count += 1
+                offset += len(line)
+
+            self._size = offset
+            self._fingerprint = self._compute_fingerprint(f, self._size)
+
+        self._stat = (stat.st_size, stat.st_mtime_ns)
+        if rebuilt or self._size != start_size:
+            self._save_sidecar()
+        return self
+
+    def __len__(self) -> int:
+        """Number of indexed records"""
+        return self._count
+
+    def count(self, key: str) -> int:
+        """Number of indexed records whose field equals key"""
+        return len(self._offsets.get(str(key), []))
+
+    def keys(self) -> List[str]:
+        """Indexed keys in ascending order"""
+        return list(self._sorted_keys)
+
+    def max_key(self, below: Optional[str] = None) -> Optional[str]:
+        """
+        Get the largest key, optionally the largest key strictly below a bound
+
+        Args:
+            below: Exclusive upper bound
+
+        Returns:
+            Key, or None if there is none
+        """
+        if below is None:
+            return self._sorted_keys[-1] if self._sorted_keys else None
+        position = bisect_left(self._sorted_keys, below)
+        return self._sorted_keys[position - 1] if position > 0 else None
+
+    def records(self, key: str) -> List[Any]:
+        """
+        Get the records whose field equals key, in file order
+
+        Args:
+            key: Field value
+
+        Returns:
+            List of decoded records
+        """
+        offsets = self._offsets.get(str(key), [])
+        if not offsets:
+            return []
+        records = []
+        with self.path.open("rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                try:
+                    records.append(self.decode(f.readline()))
+                except DecodeError:
+                    continue
+        return records
+
+
+_indexes: Dict[Tuple[str, str], JsonlIndex] = {}
+
+
+def get_jsonl_index(path: Union[str, Path], field: str, decode: Callable[[bytes], Any] = loads) -> JsonlIndex:
+    """
+    Get the up-to-date index of a JSONL file, shared within the process
+
+    Args:
+        path: JSONL file path
+        field: Record field to index by
+        decode: Decoder for one line (see tools.json_codec)
+
+    Returns:
+        Refreshed JsonlIndex
+    """
+    cache_key = (str(Path(path).resolve()), field)
+    index = _indexes.get(cache_key)
+    if index is None:
+        index = _indexes[cache_key] = JsonlIndex(path, field, decode=decode)
+    return index.refresh()
@@ -0,0 +1,715 @@
+import argparse
+import fcntl
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+# Add project root directory to Python path to allow running this file from subdirectories
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tools.general_tools import get_config_value
+from tools.json_codec import DecodeError, decode_position_record, dumps
+from tools.jsonl_index import JsonlIndex, get_jsonl_index
+
+# Ledger records written with this version store sparse positions: only non-zero
+# holdings plus CASH. Older (dense) records carry every symbol with 0 shares and no
+# "schema" field; readers treat a missing symbol as 0 shares, so both forms mix freely.
+POSITION_SCHEMA_VERSION = 2
+
+# Record fields compaction rewrites; any other key is carried over from the session's last record
+LEDGER_KEYS = {"date", "id", "schema", "fork", "this_action", "intraday", "positions"}
+
+
+def to_sparse_positions(positions: Dict[str, float]) -> Dict[str, float]:
+    """
+    Drop zero holdings from a positions dictionary, always keeping CASH
+
+    Args:
+        positions: Dense or sparse positions dictionary {symbol: shares, "CASH": cash}
+
+    Returns:
+        Sparse positions dictionary
+    """
+    sparse = {symbol: shares for symbol, shares in positions.items() if symbol == "CASH" or shares}
+    sparse.setdefault("CASH", 0.0)
+    return sparse
+
+
+def to_dense_positions(positions: Dict[str, float], stock_symbols: List[str]) -> Dict[str, float]:
+    """
+    Expand a sparse positions dictionary to include every symbol of a universe
+
+    Args:
+        positions: Sparse or dense positions dictionary
+        stock_symbols: Symbols to include with 0 shares when not held
+
+    Returns:
+        Dense positions dictionary (symbols in universe order, then CASH)
+    """
+    dense = {symbol: positions.get(symbol, 0) for symbol in stock_symbols}
+    for symbol, shares in positions.items():
+        dense.setdefault(symbol, shares)
+    dense["CASH"] = positions.get("CASH", 0.0)
+    return dense
+
+
+def make_position_record(
+    date: str, record_id: int, positions: Dict[str, float], this_action: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build a ledger record in the current (sparse) schema
+
+    Args:
+        date: Trading date
+        record_id: Operation ID
+        positions: Positions after the action, dense or sparse
+        this_action: Action that produced the positions, None for the registration record
+
+    Returns:
+        Ledger record ready to be appended to position.jsonl
+    """
+    record: Dict[str, Any] = {"date": date, "id": record_id, "schema": POSITION_SCHEMA_VERSION}
+    if this_action is not None:
+        record["this_action"] = this_action
+    record["positions"] = to_sparse_positions(positions)
+    return record
+
+
+def get_position_file_path(signature: str) -> Path:
+    """
+    Get position.jsonl path for a model signature
+
+    Args:
+        signature: Model name
+
+    Returns:
+        Path to data/{log_path}/{signature}/position/position.jsonl
+    """
+    base_dir = Path(__file__).resolve().parents[1]
+
+    # Get log_path from config, default to "agent_data" for backward compatibility
+    log_path = get_config_value("LOG_PATH", "./data/agent_data")
+    if log_path.startswith("./data/"):
+        log_path = log_path[7:]  # Remove "./data/" prefix
+
+    return base_dir / "data" / log_path / signature / "position" / "position.jsonl"
+
+
+def read_fork_point(position_file: Path) -> Optional[Dict[str, Any]]:
+    """
+    Get the fork point of a forked ledger
+
+    A forked ledger starts with a header record {"fork": {"signature", "date", "id"}}
+    and inherits the parent's records up to and including (date, id) without copying them.
+
+    Args:
+        position_file: Path to position.jsonl
+
+    Returns:
+        {"signature", "date", "id"} of the parent ledger, or None if not a fork
+    """
+    position_file = Path(position_file)
+    if not position_file.exists():
+        return None
+    with position_file.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                return decode_position_record(line).get("fork")
+            except DecodeError:
+                return None
+    return None
+
+
+def get_parent_position_file(position_file: Path, fork: Dict[str, Any]) -> Path:
+    """
+    Get the parent ledger of a fork, which lives in the same log directory
+
+    Args:
+        position_file: Path to the forked position.jsonl
+        fork: Fork point returned by read_fork_point
+
+    Returns:
+        Path to the parent's position.jsonl
+    """
+    return Path(position_file).parents[2] / fork["signature"] / "position" / "position.jsonl"
+
+
+def _inherited(record: Dict[str, Any], fork: Dict[str, Any]) -> bool:
+    """Whether a parent record is at or before the fork point"""
+    date = record.get("date")
+    if not date:
+        return False
+    return date < fork["date"] or (date == fork["date"] and record.get("id", -1) <= fork["id"])
+
+
+class LedgerIndex:
+    """
+    Date index of a ledger, including the records a fork inherits from its parent
+
+    Same query interface as JsonlIndex (len, keys, max_key, records), so callers
+    do not need to know whether a ledger is a fork.
+    """
+
+    def __init__(self, position_file: Path, _seen: Optional[Set[str]] = None):
+        """
+        Initialize index
+
+        Args:
+            position_file: Path to position.jsonl
+        """
+        self.position_file = Path(position_file)
+        self.own: JsonlIndex = get_jsonl_index(self.position_file, "date", decode_position_record)
+        self.fork = read_fork_point(self.position_file)
+        self.parent: Optional[LedgerIndex] = None
+
+        if self.fork:
+            seen = (_seen or set()) | {str(self.position_file.resolve())}
+            parent_file = get_parent_position_file(self.position_file, self.fork)
+            if str(parent_file.resolve()) in seen:
+                raise ValueError(f"Ledger fork cycle detected at {parent_file}")
+            self.parent = LedgerIndex(parent_file, seen)
+            # Smallest key above the fork date, used as exclusive bound on the parent
+            self._parent_bound = self.fork["date"] + "\x00"
+
+    def __len__(self) -> int:
+        """Number of records, inherited ones included"""
+        count = len(self.own)
+        if self.parent:
+            for key in self.parent.keys():
+                if key < self.fork["date"]:
+                    count += self.parent.count(key)
+            count += len(self._inherited_records(self.fork["date"]))
+        return count
+
+    def _inherited_records(self, key: str) -> List[Dict[str, Any]]:
+        if not self.parent or key > self.fork["date"]:
+            return []
+        return [record for record in self.parent.records(key) if _inherited(record, self.fork)]
+
+    def count(self, key: str) -> int:
+        """Number of records on a date, inherited ones included"""
+        if self.parent and key == self.fork["date"]:
+            return len(self._inherited_records(key)) + self.own.count(key)
+        inherited = self.parent.count(key) if self.parent and key < self.fork["date"] else 0
+        return inherited + self.own.count(key)
+
+    def keys(self) -> List[str]:
+        """Dates in ascending order"""
+        if not self.parent:
+            return self.own.keys()
+        inherited = [key for key in self.parent.keys() if key <= self.fork["date"]]
+        return sorted(set(inherited) | set(self.own.keys()))
+
+    def max_key(self, below: Optional[str] = None) -> Optional[str]:
+        """
+        Get the latest date, optionally the latest date strictly below a bound
+
+        Args:
+            below: Exclusive upper bound
+
+        Returns:
+            Date, or None if there is none
+        """
+        candidates = [self.own.max_key(below)]
+        if self.parent:
+            bound = self._parent_bound if below is None else min(below, self._parent_bound)
+            candidates.append(self.parent.max_key(bound))
+        candidates = [key for key in candidates if key is not None]
+        return max(candidates) if candidates else None
+
+    def records(self, key: str) -> List[Dict[str, Any]]:
+        """
+        Get the records of a date, inherited ones first
+
+        Args:
+            key: Date
+
+        Returns:
+            List of ledger records
+        """
+        return self._inherited_records(key) + self.own.records(key)
+
+
+def get_ledger_index(position_file: Path) -> LedgerIndex:
+    """
+    Get the up-to-date date index of a ledger, resolving forks
+
+    Args:
+        position_file: Path to position.jsonl
+
+    Returns:
+        LedgerIndex
+    """
+    return LedgerIndex(Path(position_file))
+
+
+def warm_up_ledger_indexes(data_dir: Optional[Path] = None) -> int:
+    """
+    Load or build the date indexes of all ledgers, so the first session does not pay for it
+
+    Args:
+        data_dir: Data directory, defaults to the project's data/
+
+    Returns:
+        Number of ledgers indexed
+    """
+    data_dir = Path(data_dir) if data_dir else Path(project_root) / "data"
+    count = 0
+    for position_file in sorted(data_dir.glob("agent_data*/*/position/position.jsonl")):
+        try:
+            get_ledger_index(position_file)
+            count += 1
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not index {position_file}: {e}")
+    return count
+
+
+def iter_ledger_records(position_file: Path, _seen: Optional[Set[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the records of a ledger in file order, resolving forks
+
+    A fork yields the parent's records up to the fork point, then its own records.
+    Fork headers and unparseable lines are skipped.
+
+    Args:
+        position_file: Path to position.jsonl
+
+    Returns:
+        Iterator of ledger records
+    """
+    position_file = Path(position_file)
+    fork = read_fork_point(position_file)
+    if fork:
+        seen = (_seen or set()) | {str(position_file.resolve())}
+        parent_file = get_parent_position_file(position_file, fork)
+        if str(parent_file.resolve()) in seen:
+            raise ValueError(f"Ledger fork cycle detected at {parent_file}")
+        for record in iter_ledger_records(parent_file, seen):
+            if _inherited(record, fork):
+                yield record
+
+    if not position_file.exists():
+        return
+    with position_file.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = decode_position_record(line)
+            except DecodeError:
+                continue
+            if "fork" not in record:
+                yield record
+
+
+def load_ledger_records(position_file: Path, resolve_forks: bool = True) -> List[Dict[str, Any]]:
+    """
+    Load all records of a position ledger in file order
+
+    Args:
+        position_file: Path to position.jsonl
+        resolve_forks: Include the records a fork inherits from its parent. When False,
+                       only the file's own lines are returned, fork header included.
+
+    Returns:
+        List of ledger records, unparseable lines are skipped
+    """
+    position_file = Path(position_file)
+    if resolve_forks:
+        return list(iter_ledger_records(position_file))
+
+    records = []
+    if not position_file.exists():
+        return records
+
+    with position_file.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                records.append(decode_position_record(line))
+            except Exception:
+                continue
+    return records
+
+
+def fork_ledger(parent_file: Path, child_file: Path, fork_date: str) -> Dict[str, Any]:
+    """
+    Create a copy-on-write fork of a ledger at the end of a historical session
+
+    The child ledger only holds a header referencing the parent's records up to the
+    last record of the chosen session; it appends its own records from there on.
+    Forks point at the end of a session, which compaction always preserves.
+
+    Args:
+        parent_file: Path to the parent's position.jsonl
+        child_file: Path to the new position.jsonl, in the same log directory
+        fork_date: Fork at the last session on or before this date (a date also
+                   matches hourly sessions on that day, e.g. "2025-10-15")
+
+    Returns:
+        {"signature", "parent", "date", "id", "file"} of the new fork,
+        or {"error": ...} if the fork cannot be created
+    """
+    parent_file = Path(parent_file)
+    child_file = Path(child_file)
+
+    if parent_file.parents[2].resolve() != child_file.parents[2].resolve():
+        return {"error": "Parent and fork ledgers must be in the same log directory"}
+    if not parent_file.exists():
+        return {"error": f"Parent ledger {parent_file} does not exist"}
+    if child_file.exists() and child_file.stat().st_size > 0:
+        return {"error": f"Ledger {child_file} already exists"}
+
+    parent_index = get_ledger_index(parent_file)
+    # "\uffff" sorts after any time suffix, so "2025-10-15" covers "2025-10-15 15:00:00"
+    date = parent_index.max_key(below=fork_date + "\uffff")
+    if date is None:
+        return {"error": f"No parent records on or before {fork_date}"}
+    record_id = max(record.get("id", -1) for record in parent_index.records(date))
+
+    fork = {"signature": parent_file.parents[1].name, "date": date, "id": record_id}
+    child_file.parent.mkdir(parents=True, exist_ok=True)
+    # Exclusive create: two runners forking the same signature cannot both write a header
+    with child_file.open("x" if not child_file.exists() else "w", encoding="utf-8") as f:
+        f.write(dumps({"fork": fork, "schema": POSITION_SCHEMA_VERSION}) + "\n")
+
+    return {
+        "signature": child_file.parents[1].name,
+        "parent": fork["signature"],
+        "date": date,
+        "id": record_id,
+        "file": str(child_file),
+    }
+
+
+def replay_ledger(records: List[Dict[str, Any]]) -> Dict[str, Tuple[int, Dict[str, float]]]:
+    """
+    Replay ledger records into the end-of-session state of every date
+
+    This is the view every reader relies on: for each date, the record with the
+    largest id holds the positions at the end of that session.
+
+    Args:
+        records: Ledger records
+
+    Returns:
+        {date: (max_id, positions)} dictionary
+    """
+    sessions: Dict[str, Tuple[int, Dict[str, float]]] = {}
+    for record in records:
+        date = record.get("date")
+        if not date:
+            continue
+        record_id = record.get("id", -1)
+        if date not in sessions or record_id > sessions[date][0]:
+            sessions[date] = (record_id, record.get("positions", {}))
+    return sessions
+
+
+def compact_records(
+    records: List[Dict[str, Any]],
+    keep_intraday: bool = False,
+    sparse: bool = False,
+    live_from: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Rewrite ledger records into canonical form: one end-of-session record per date
+
+    Args:
+        records: Ledger records in file order
+        keep_intraday: Keep the session's individual actions as an "intraday" list
+                       ({"id", "action", "symbol", "amount"} entries, without positions)
+        sparse: Convert positions to the sparse schema (see POSITION_SCHEMA_VERSION)
+        live_from: Sessions on or after this date are kept as written. The trade tools
+                   rebuild today's buys (T+1) from the session's actions, which a
+                   compacted session no longer lists in full.
+
+    Returns:
+        Compacted records, dates in order of first appearance
+    """
+    sessions: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        date = record.get("date")
+        if not date:
+            continue
+        sessions.setdefault(date, []).append(record)
+
+    compacted = []
+    for date, session_records in sessions.items():
+        if live_from and date >= live_from:
+            compacted.extend(session_records)
+            continue
+        session_records = sorted(session_records, key=lambda x: x.get("id", -1))
+        last_record = session_records[-1]
+
+        compacted_record = {"date": date, "id": last_record.get("id", -1)}
+        if sparse or "schema" in last_record:
+            compacted_record["schema"] = POSITION_SCHEMA_VERSION if sparse else last_record["schema"]
+        if "this_action" in last_record:
+            compacted_record["this_action"] = last_record["this_action"]
+        if keep_intraday:
+            intraday = []
+            for record in session_records:
+                this_action = record.get("this_action")
+                if this_action:
+                    intraday.append({"id": record.get("id", -1), **this_action})
+                for action in record.get("intraday", []):
+                    # Already compacted sessions carry their detail forward
+                    if action.get("id") != record.get("id", -1):
+                        intraday.append(action)
+            if len(intraday) > 1:
+                intraday.sort(key=lambda x: x.get("id", -1))
+                compacted_record["intraday"] = intraday
+        positions = last_record.get("positions", {})
+        compacted_record["positions"] = to_sparse_positions(positions) if sparse else positions
+        for key, value in last_record.items():
+            if key not in LEDGER_KEYS:
+                compacted_record[key] = value
+        compacted.append(compacted_record)
+
+    return compacted
+
+
+def parse_raw_ledger(lines: List[str]) -> List[Dict[str, Any]]:
+    """
+    Parse ledger lines with the stdlib json module, keeping every key and value as written
+
+    Args:
+        lines: Lines of a position.jsonl file
+
+    Returns:
+        Records of the non-blank lines, in file order
+
+    Raises:
+        ValueError: A non-blank line is not a JSON object
+    """
+    records = []
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {line_number} is not valid JSON: {e}") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_number} is not a JSON object")
+        records.append(record)
+    return records
+
+
+def verify_compaction(original_lines: List[str], compacted_file: Path) -> Optional[str]:
+    """
+    Verify that a compacted ledger file replays to the same state as the original lines
+
+    Both sides are parsed from their raw text, so a line or key the compaction lost is
+    reported rather than silently matched.
+
+    Args:
+        original_lines: Lines of the original position.jsonl
+        compacted_file: Compacted ledger as written to disk
+
+    Returns:
+        None if equivalent, otherwise a description of the first mismatch
+    """
+    try:
+        original = parse_raw_ledger(original_lines)
+        with Path(compacted_file).open("r", encoding="utf-8") as f:
+            compacted = parse_raw_ledger(f.readlines())
+    except ValueError as e:
+        return str(e)
+
+    headers = [record for record in original if "fork" in record]
+    if headers != [record for record in compacted if "fork" in record]:
+        return "Fork header differs"
+
+    compacted_by_date: Dict[str, List[Dict[str, Any]]] = {}
+    for record in compacted:
+        if record.get("date"):
+            compacted_by_date.setdefault(record["date"], []).append(record)
+    for record in original:
+        if "fork" in record:
+            continue
+        date = record.get("date")
+        if not date:
+            return f"Record without a date would be dropped: {sorted(record)}"
+        # Keys compaction does not rewrite must survive unchanged on the session's records
+        session_records = compacted_by_date.get(date, [])
+        for key, value in record.items():
+            if key not in LEDGER_KEYS and not any(key in kept and kept[key] == value for kept in session_records):
+                return f"Key {key!r} of {date} id {record.get('id')} would be dropped"
+
+    original_sessions = replay_ledger(original)
+    compacted_sessions = replay_ledger(compacted)
+
+    if original_sessions.keys() != compacted_sessions.keys():
+        missing = sorted(set(original_sessions) ^ set(compacted_sessions))
+        return f"Session dates differ: {missing[:5]}"
+
+    for date, (record_id, positions) in original_sessions.items():
+        compacted_id, compacted_positions = compacted_sessions[date]
+        if record_id != compacted_id:
+            return f"Last id differs on {date}: {record_id} != {compacted_id}"
+        # Sparse and dense forms of the same holdings are equivalent
+        if to_sparse_positions(positions) != to_sparse_positions(compacted_positions):
+            return f"Positions differ on {date}"
+    return None
+
+
+def compact_ledger(
+    position_file: Path,
+    keep_intraday: bool = False,
+    sparse: bool = False,
+    backup: bool = True,
+    dry_run: bool = False,
+    live_from: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Compact a position.jsonl ledger in place, verified equivalent by replay
+
+    The ledger is read with the stdlib json module, so every line and key is seen as
+    written; a line that does not parse, or a key compaction would drop, aborts without
+    touching the file. The compacted ledger is written to a temporary file, replayed
+    against the original lines, and moved into place with an atomic rename under the
+    signature's position lock, so concurrent trade tools never see a partial file.
+
+    Args:
+        position_file: Path to position.jsonl
+        keep_intraday: Keep per-session action detail (see compact_records)
+        sparse: Convert positions to the sparse schema
+        backup: Keep the original ledger as position.jsonl.bak
+        dry_run: Only compute and verify, do not rewrite the file
+        live_from: Keep sessions on or after this date as written (see compact_records),
+                   defaults to the current TODAY_DATE so a running session keeps its T+1 detail
+
+    Returns:
+        Dictionary with record and byte counts before and after compaction,
+        or {"error": ...} if the file is missing, unparseable or verification failed
+    """
+    position_file = Path(position_file)
+    if not position_file.exists():
+        return {"error": f"Position file {position_file} does not exist"}
+
+    # Same lock file as the trade tools use for this signature
+    lock_path = position_file.parent.parent / ".position.lock"
+    with open(lock_path, "a+") as lock_fh:
+        fcntl.flock(lock_fh.fileno(), fcntl.LOCK_EX)
+        tmp_file = position_file.with_name(position_file.name + ".tmp")
+        try:
+            with position_file.open("r", encoding="utf-8") as f:
+                lines = f.readlines()
+            try:
+                records = parse_raw_ledger(lines)
+            except ValueError as e:
+                return {"error": f"Cannot compact {position_file}: {e}", "file": str(position_file)}
+
+            # Compact only this file's own records; a fork keeps its header and parent reference
+            headers = [record for record in records if "fork" in record]
+            compacted = headers + compact_records(
+                records,
+                keep_intraday=keep_intraday,
+                sparse=sparse,
+                live_from=live_from or get_config_value("TODAY_DATE"),
+            )
+
+            payload = "".join(dumps(record) + "\n" for record in compacted)
+            with tmp_file.open("w", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+
+            mismatch = verify_compaction(lines, tmp_file)
+            if mismatch:
+                return {"error": f"Compaction verification failed: {mismatch}", "file": str(position_file)}
+
+            result = {
+                "file": str(position_file),
+                "records_before": len(records),
+                "records_after": len(compacted),
+                "bytes_before": position_file.stat().st_size,
+                "bytes_after": len(payload.encode("utf-8")),
+            }
+            if dry_run:
+                return result
+
+            if backup:
+                backup_file = position_file.with_name(position_file.name + ".bak")
+                os.replace(position_file, backup_file)
+                result["backup"] = str(backup_file)
+            os.replace(tmp_file, position_file)
+            return result
+        finally:
+            if tmp_file.exists():
+                tmp_file.unlink()
+            fcntl.flock(lock_fh.fileno(), fcntl.LOCK_UN)
+
+
+def fork_from_config(log_dir: Path, signature: str, fork_from: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Create a model's ledger from a config "fork_from" entry unless it already exists
+
+    Args:
+        log_dir: Log directory holding the signatures (log_config.log_path)
+        signature: Model signature of the fork
+        fork_from: {"signature": parent signature, "date": fork date}
+
+    Returns:
+        Result of fork_ledger, or None if the ledger already exists (resumed run)
+    """
+    child_file = Path(log_dir) / signature / "position" / "position.jsonl"
+    if child_file.exists() and child_file.stat().st_size > 0:
+        return None
+    parent_file = Path(log_dir) / fork_from["signature"] / "position" / "position.jsonl"
+    return fork_ledger(parent_file, child_file, fork_from["date"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact position.jsonl ledgers to one record per session")
+    parser.add_argument("targets", nargs="+", help="Model signatures or paths to position.jsonl files")
+    parser.add_argument("--fork-from", help="Instead of compacting, fork the targets from this signature's ledger")
+    parser.add_argument("--fork-date", help="Fork at the last session on or before this date (with --fork-from)")
+    parser.add_argument("--intraday", action="store_true", help="Keep per-session action detail")
+    parser.add_argument("--sparse", action="store_true", help="Convert positions to the sparse schema")
+    parser.add_argument("--no-backup", action="store_true", help="Do not keep position.jsonl.bak")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the expected savings")
+    parser.add_argument("--live-from", help="Keep sessions on or after this date as written (default: TODAY_DATE)")
+    args = parser.parse_args()
+
+    if args.fork_from:
+        if not args.fork_date:
+            parser.error("--fork-from requires --fork-date")
+        parent_path = Path(args.fork_from) if args.fork_from.endswith(".jsonl") else get_position_file_path(args.fork_from)
+        for target in args.targets:
+            path = Path(target) if target.endswith(".jsonl") else get_position_file_path(target)
+            result = fork_ledger(parent_path, path, args.fork_date)
+            if "error" in result:
+                print(f"❌ {result['error']}")
+                continue
+            print(f"🌱 {result['signature']} forked from {result['parent']} at {result['date']} (id {result['id']})")
+        sys.exit(0)
+
+    for target in args.targets:
+        path = Path(target) if target.endswith(".jsonl") else get_position_file_path(target)
+        result = compact_ledger(
+            path,
+            keep_intraday=args.intraday,
+            sparse=args.sparse,
+            backup=not args.no_backup,
+            dry_run=args.dry_run,
+            live_from=args.live_from,
+        )
+        if "error" in result:
+            print(f"❌ {result['error']}")
+            continue
+        saved = 1 - result["bytes_after"] / result["bytes_before"] if result["bytes_before"] else 0.0
+        print(
+            f"{'🔍' if args.dry_run else '✅'} {result['file']}: "
+            f"{result['records_before']} -> {result['records_after']} records, "
+            f"{result['bytes_before']:,} -> {result['bytes_after']:,} bytes ({saved:.1%} smaller)"
+        )
@@ -0,0 +1,300 @@
+"""
+Local archive of Alpha Vantage NEWS_SENTIMENT articles for backtests
+
+Articles are stored once per URL in a SQLite file (NEWS_ARCHIVE_PATH, default
+data/news_archive.sqlite) and indexed by ticker, topic and publish time. The archive also
+records which (ticker or topic, time range) windows were downloaded completely, so a query
+can tell whether it is covered; get_market_news answers covered queries locally, applying
+the session's point-in-time cutoff, and calls the API only for the rest.
+
+The archive is filled by data/prefetch_news.py. NEWS_ARCHIVE selects how it is used:
+- on (default): serve covered queries from the archive, fetch the rest live
+- offline: archive only, uncovered queries fail instead of calling the API
+- off: always fetch live
+"""
+
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Add project root directory to Python path to allow running this file from subdirectories
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tools.json_codec import dumps, loads
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Topic labels in articles -> topic names accepted by the API's topics parameter
+TOPIC_LABELS = {
+    "Blockchain": "blockchain",
+    "Earnings": "earnings",
+    "IPO": "ipo",
+    "Mergers & Acquisitions": "mergers_and_acquisitions",
+    "Financial Markets": "financial_markets",
+    "Economy - Fiscal": "economy_fiscal",
+    "Economy - Monetary": "economy_monetary",
+    "Economy - Macro": "economy_macro",
+    "Energy & Transportation": "energy_transportation",
+    "Finance": "finance",
+    "Life Sciences": "life_sciences",
+    "Manufacturing": "manufacturing",
+    "Real Estate & Construction": "real_estate",
+    "Retail & Wholesale": "retail_wholesale",
+    "Technology": "technology",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    published TEXT NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+CREATE TABLE IF NOT EXISTS article_keys (
+    key TEXT NOT NULL,
+    id TEXT NOT NULL,
+    published TEXT NOT NULL,
+    PRIMARY KEY (key, id)
+);
+CREATE INDEX IF NOT EXISTS article_keys_time ON article_keys (key, published);
+CREATE TABLE IF NOT EXISTS coverage (
+    key TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_key ON coverage (key);
+"""
+
+
+def news_archive_mode() -> str:
+    """Archive mode from NEWS_ARCHIVE: "on", "offline" or "off" """
+    mode = os.getenv("NEWS_ARCHIVE", "on").lower()
+    if mode in ("off", "0", "false"):
+        return "off"
+    return "offline" if mode == "offline" else "on"
+
+
+def ticker_key(ticker: str) -> str:
+    return f"ticker:{ticker.strip().upper()}"
+
+
+def topic_key(topic: str) -> str:
+    return f"topic:{topic.strip().lower()}"
+
+
+def _split(values: Optional[str]) -> List[str]:
+    return [value for value in (values or "").split(",") if value.strip()]
+
+
+def parse_published(value: str) -> Optional[str]:
+    """Convert an article's time_published ("20250410T013000" or "20250410T0130") to YYYY-MM-DD HH:MM:SS"""
+    for time_format in ("%Y%m%dT%H%M%S", "%Y%m%dT%H%M"):
+        try:
+            return datetime.strptime(value, time_format).strftime(TIME_FORMAT)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def article_keys(article: Dict[str, Any]) -> List[str]:
+    """Ticker and topic keys an article is indexed under"""
+    keys = {ticker_key(item["ticker"]) for item in article.get("ticker_sentiment", []) if item.get("ticker")}
+    for item in article.get("topics", []):
+        label = item.get("topic", "")
+        keys.add(topic_key(TOPIC_LABELS.get(label, label.lower().replace(" ", "_"))))
+    return sorted(keys)
+
+
+class NewsArchive:
+    """SQLite store of news articles and of the windows downloaded completely"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared by the tool threads under a lock; WAL lets the prefetcher write while servers read
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def add_articles(self, articles: Iterable[Dict[str, Any]], extra_key: Optional[str] = None) -> int:
+        """
+        Store articles, skipping ones already archived
+
+        Args:
+            articles: Articles as returned in the API's "feed"
+            extra_key: Key the articles were fetched for (e.g. "ticker:AAPL"), indexed even if
+                the article's own tags miss it
+
+        Returns:
+            Number of new articles
+        """
+        added = 0
+        with self._lock, self._conn:
+            for article in articles:
+                published = parse_published(article.get("time_published", ""))
+                url = article.get("url")
+                if not published or not url:
+                    continue
+                article_id = hashlib.sha1(url.encode("utf-8")).hexdigest()
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO articles (id, published, payload) VALUES (?, ?, ?)",
+                    (article_id, published, zlib.compress(dumps(article).encode("utf-8"))),
+                )
+                added += cursor.rowcount
+                keys = article_keys(article) + ([extra_key] if extra_key else [])
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO article_keys (key, id, published) VALUES (?, ?, ?)",
+                    [(key, article_id, published) for key in keys],
+                )
+        return added
+
+    def add_coverage(self, key: str, start: str, end: str) -> None:
+        """Record that every article of key published in [start, end] is archived"""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO coverage (key, start, end) VALUES (?, ?, ?)", (key, start, end))
+
+    def is_covered(self, key: str, start: str, end: str) -> bool:
+        """Whether [start, end] lies within the downloaded windows of key (adjacent windows merged)"""
+        with self._lock:
+            windows = self._conn.execute(
+                "SELECT start, end FROM coverage WHERE key = ? AND end >= ? AND start <= ? ORDER BY start",
+                (key, start, end),
+            ).fetchall()
+        reached = start
+        for window_start, window_end in windows:
+            if window_start > reached:
+                # Windows are requested with minute precision, a one-minute gap is no gap
+                gap = datetime.strptime(window_start, TIME_FORMAT) - datetime.strptime(reached, TIME_FORMAT)
+                if gap.total_seconds() > 60:
+                    return False
+            reached = max(reached, window_end)
+            if reached >= end:
+                return True
+        return reached >= end
+
+    def covering_key(self, tickers: Optional[str], topics: Optional[str], start: str, end: str) -> Optional[str]:
+        """
+        Find a downloaded key that holds every article a query can match
+
+        Articles must mention all requested tickers and topics, so any one of them whose
+        window is covered will do.
+
+        Returns:
+            Key such as "ticker:AAPL", or None when the query needs the API
+        """
+        for key in [ticker_key(t) for t in _split(tickers)] + [topic_key(t) for t in _split(topics)]:
+            if self.is_covered(key, start, end):
+                return key
+        return None
+
+    def query(
+        self, key: str, tickers: Optional[str], topics: Optional[str], start: str, end: str, limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Latest articles of a covered key published in [start, end) that match all tickers and topics
+
+        Args:
+            key: Covering key from covering_key
+            tickers: Comma-separated tickers, as for the API
+            topics: Comma-separated topics, as for the API
+            start: Window start, YYYY-MM-DD HH:MM:SS
+            end: Cutoff, articles published at or after it are excluded
+            limit: Maximum articles
+
+        Returns:
+            Articles, newest first
+        """
+        required = {ticker_key(t) for t in _split(tickers)} | {topic_key(t) for t in _split(topics)}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT k.id, a.payload FROM article_keys k JOIN articles a ON a.id = k.id "
+                "WHERE k.key = ? AND k.published >= ? AND k.published < ? ORDER BY k.published DESC",
+                (key, start, end),
+            ).fetchall()
+            articles = []
+            for article_id, payload in rows:
+                others = required - {key}
+                if others:
+                    found = {
+                        row[0]
+                        for row in self._conn.execute(
+                            f"SELECT key FROM article_keys WHERE id = ? AND key IN ({','.join('?' * len(others))})",
+                            (article_id, *others),
+                        )
+                    }
+                    if found != others:
+                        continue
+                articles.append(loads(zlib.decompress(payload)))
+                if len(articles) >= limit:
+                    break
+        return articles
+
+
+def prefetch_key(
+    archive: NewsArchive,
+    fetch: Callable[[str, str, int], List[Dict[str, Any]]],
+    key: str,
+    start: datetime,
+    end: datetime,
+    limit: int = 1000,
+) -> int:
+    """
+    Download every article of a key published in [start, end] into the archive
+
+    Windows already covered are skipped. A window that comes back full (limit articles) may
+    have been cut off, so it is split in half and fetched again until each part fits.
+
+    Args:
+        archive: Target archive
+        fetch: fetch(time_from, time_to, limit) -> articles, times in the API's YYYYMMDDTHHMM format
+        key: "ticker:..." or "topic:..."
+        start: Window start
+        end: Window end
+        limit: Maximum articles the API returns per request
+
+    Returns:
+        Number of new articles archived
+    """
+    start_text, end_text = start.strftime(TIME_FORMAT), end.strftime(TIME_FORMAT)
+    if archive.is_covered(key, start_text, end_text):
+        return 0
+    articles = fetch(start.strftime("%Y%m%dT%H%M"), end.strftime("%Y%m%dT%H%M"), limit)
+    if len(articles) >= limit and (end - start).total_seconds() > 3600:
+        middle = start + (end - start) / 2
+        middle = middle.replace(second=0, microsecond=0)
+        return prefetch_key(archive, fetch, key, start, middle, limit) + prefetch_key(
+            archive, fetch, key, middle, end, limit
+        )
+    added = archive.add_articles(articles, extra_key=key)
+    archive.add_coverage(key, start_text, end_text)
+    return added
+
+
+_archives: Dict[str, NewsArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def get_news_archive() -> Optional[NewsArchive]:
+    """
+    Get the process-wide news archive, opened on first use
+
+    Returns:
+        NewsArchive, or None when NEWS_ARCHIVE is off
+    """
+    if news_archive_mode() == "off":
+        return None
+    path = os.getenv("NEWS_ARCHIVE_PATH", str(Path(project_root) / "data" / "news_archive.sqlite"))
+    with _archives_lock:
+        archive = _archives.get(path)
+        if archive is None:
+            archive = _archives[path] = NewsArchive(path)
+        return archive
@@ -0,0 +1,282 @@
+"""
+In-memory price store for the merged.jsonl price files
+
+Every price lookup used to decode the whole merged.jsonl file. PriceStore decodes it once
+per process and keeps the documents by symbol, together with the sorted bar times used as
+the trading calendar. Each lookup re-checks the file's (size, mtime), so a regenerated
+price file is picked up without restarting the tool servers.
+"""
+
+import os
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Add project root directory to Python path to allow running this file from subdirectories
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tools.json_codec import DecodeError, decode_price_doc
+
+
+class PriceStore:
+    """
+    Decoded price documents of one merged.jsonl file, keyed by symbol
+
+    Documents are shared between callers and must not be modified.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Initialize store
+
+        Args:
+            path: merged.jsonl path
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._stat: Optional[Tuple[int, int]] = None
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        # Derived views, rebuilt lazily after each reload
+        self._timestamps: Dict[str, List[str]] = {}
+        self._hourly: Optional[List[datetime]] = None
+        self._bar_times: Dict[Tuple[str, str], List[str]] = {}
+
+    def refresh(self) -> "PriceStore":
+        """
+        Reload the file if it changed since the last load
+
+        Returns:
+            self, for chaining
+        """
+        try:
+            stat = self.path.stat()
+            stat_key = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            stat_key = None
+        if stat_key == self._stat:
+            return self
+
+        with self._lock:
+            if stat_key == self._stat:
+                return self
+            docs: Dict[str, Dict[str, Any]] = {}
+            if stat_key is not None:
+                with self.path.open("rb") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            doc = decode_price_doc(line)
+                        except DecodeError:
+                            continue
+                        symbol = doc.get("Meta Data", {}).get("2. Symbol")
+                        # First document wins, as in the line-by-line readers this replaces
+                        if symbol and symbol not in docs:
+                            docs[symbol] = doc
+            self._docs = docs
+            self._timestamps = {}
+            self._hourly = None
+            self._bar_times = {}
+            self._stat = stat_key
+        return self
+
+    @property
+    def version(self) -> Optional[Tuple[int, int]]:
+        """(size, mtime) of the loaded file, changes whenever the data is reloaded"""
+        return self._stat
+
+    def exists(self) -> bool:
+        """Whether the price file exists"""
+        return self._stat is not None
+
+    def symbols(self) -> List[str]:
+        """Symbols in the file"""
+        return list(self._docs)
+
+    def get_doc(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Get the full price document of a symbol, or None"""
+        return self._docs.get(symbol)
+
+    def get_series(self, symbol: str, series_key: Optional[str] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Get a symbol's time series
+
+        Args:
+            symbol: Stock symbol
+            series_key: Exact key such as "Time Series (Daily)"; by default the first
+                "Time Series ..." key of the document
+
+        Returns:
+            {bar time: bar} or None if the symbol or series is missing
+        """
+        doc = self._docs.get(symbol)
+        if doc is None:
+            return None
+        if series_key is not None:
+            series = doc.get(series_key)
+            return series if isinstance(series, dict) else None
+        for key, value in doc.items():
+            if key.startswith("Time Series"):
+                return value if isinstance(value, dict) else None
+        return None
+
+    def get_bar(self, symbol: str, date: str) -> Optional[Dict[str, Any]]:
+        """Get a symbol's bar at a date or bar time, or None"""
+        series = self.get_series(symbol)
+        if series is None:
+            return None
+        bar = series.get(date)
+        return bar if isinstance(bar, dict) else None
+
+    def get_bars(self, symbols: List[str], date: str) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get the bars of many symbols at one date or bar time
+
+        Args:
+            symbols: Stock symbols
+            date: Date or bar time
+
+        Returns:
+            {symbol: bar or None}, in the order of symbols
+        """
+        return {symbol: self.get_bar(symbol, date) for symbol in symbols}
+
+    def get_range(
+        self, symbol: str, start: str, end: str, series_key: Optional[str] = None
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Get a symbol's bars with start <= bar time <= end, oldest first
+
+        Bar times compare as strings, so a date-only start covers that whole day; pass
+        "YYYY-MM-DD 23:59:59" as end to include a whole day of intraday bars.
+
+        Args:
+            symbol: Stock symbol
+            start: Inclusive lower bound
+            end: Inclusive upper bound
+            series_key: Exact series key, by default the document's first "Time Series ..." key
+
+        Returns:
+            [(bar time, bar)], empty if the symbol or series is missing
+        """
+        series = self.get_series(symbol, series_key)
+        if not series:
+            return []
+        cache_key = (symbol, series_key or "")
+        bar_times = self._bar_times.get(cache_key)
+        if bar_times is None:
+            bar_times = self._bar_times[cache_key] = sorted(series)
+        first = bisect_left(bar_times, start)
+        last = bisect_right(bar_times, end)
+        return [(bar_time, series[bar_time]) for bar_time in bar_times[first:last]]
+
+    def timestamps(self, series_key: Optional[str] = None) -> List[str]:
+        """
+        Sorted union of the bar times of all symbols (the trading calendar)
+
+        Args:
+            series_key: Exact series key, by default each document's first "Time Series ..." key
+
+        Returns:
+            Sorted list of bar times
+        """
+        cache_key = series_key or ""
+        timestamps = self._timestamps.get(cache_key)
+        if timestamps is None:
+            all_timestamps = set()
+            for symbol in self._docs:
+                series = self.get_series(symbol, series_key)
+                if series:
+                    all_timestamps.update(series.keys())
+            timestamps = self._timestamps[cache_key] = sorted(all_timestamps)
+        return timestamps
+
+    def previous_hourly_timestamp(self, before: datetime) -> Optional[datetime]:
+        """
+        Get the latest intraday bar time strictly before a datetime
+
+        Only "YYYY-MM-DD HH:MM:SS" bar times are considered, date-only bars are ignored.
+
+        Args:
+            before: Exclusive upper bound
+
+        Returns:
+            Bar time, or None if there is none
+        """
+        if self._hourly is None:
+            hourly = []
+            for timestamp in self.timestamps():
+                try:
+                    hourly.append(datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S"))
+                except ValueError:
+                    continue
+            self._hourly = sorted(hourly)
+        position = bisect_left(self._hourly, before)
+        return self._hourly[position - 1] if position > 0 else None
+
+    def stock_names(self) -> Dict[str, str]:
+        """Map symbols to display names ("2.1. Name" in Meta Data), where available"""
+        names = {}
+        for symbol, doc in self._docs.items():
+            name = doc.get("Meta Data", {}).get("2.1. Name", "")
+            if name:
+                names[symbol] = name
+        return names
+
+
+_stores: Dict[str, PriceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_price_store(path: Union[str, Path]) -> PriceStore:
+    """
+    Get the up-to-date price store of a merged.jsonl file, shared within the process
+
+    Args:
+        path: merged.jsonl path
+
+    Returns:
+        Refreshed PriceStore
+    """
+    cache_key = str(Path(path).resolve())
+    store = _stores.get(cache_key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(cache_key, PriceStore(path))
+    return store.refresh()
+
+
+def price_data_version() -> Tuple[Optional[Tuple[int, int]], ...]:
+    """Versions of the US and A-share price files, for keying caches of price-derived results"""
+    data_dir = Path(project_root) / "data"
+    return tuple(get_price_store(path).version for path in (data_dir / "merged.jsonl", data_dir / "A_stock" / "merged.jsonl"))
+
+
+def warm_up_price_stores(paths: Optional[List[Union[str, Path]]] = None) -> int:
+    """
+    Load price files and build their calendars ahead of the first request
+
+    Args:
+        paths: merged.jsonl paths, defaults to the US and A-share files under data/
+
+    Returns:
+        Number of symbols loaded
+    """
+    if paths is None:
+        data_dir = Path(project_root) / "data"
+        paths = [data_dir / "merged.jsonl", data_dir / "A_stock" / "merged.jsonl"]
+    symbols = 0
+    for path in paths:
+        store = get_price_store(path)
+        if not store.exists():
+            continue
+        store.timestamps()
+        store.timestamps("Time Series (Daily)")
+        store.previous_hourly_timestamp(datetime.max)
+        symbols += len(store.symbols())
+    return symbols
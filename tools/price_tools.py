@@ -3,7 +3,6 @@ import os
 from dotenv import load_dotenv
 
 load_dotenv()
-import json
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -14,6 +13,9 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 from tools.general_tools import get_config_value
+from tools.json_codec import dumps
+from tools.ledger_tools import get_ledger_index, make_position_record
+from tools.price_store import get_price_store
 
 
 def get_market_type() -> str:
@@ -225,27 +227,13 @@ def is_trading_day(date: str, market: str = "us") -> bool:
         True if the date exists in merged.jsonl (is a trading day), False otherwise
     """
     merged_file_path = get_merged_file_path(market)
+    store = get_price_store(merged_file_path)
 
-    if not merged_file_path.exists():
+    if not store.exists():
         print(f"⚠️  Warning: {merged_file_path} not found, cannot validate trading day")
         return False
 
-    try:
-        with open(merged_file_path, "r", encoding="utf-8") as f:
-            # Read first line to check if date exists
-            for line in f:
-                try:
-                    data = json.loads(line.strip())
-                    time_series = data.get("Time Series (Daily)", {})
-                    if date in time_series:
-                        return True
-                except json.JSONDecodeError:
-                    continue
-            # If we get here, checked all stocks and date was not found in any
-            return False
-    except Exception as e:
-        print(f"⚠️  Error checking trading day: {e}")
-        return False
+    return date in store.timestamps("Time Series (Daily)")
 
 
 def get_all_trading_days(market: str = "us") -> List[str]:
@@ -258,26 +246,13 @@ def get_all_trading_days(market: str = "us") -> List[str]:
         Sorted list of trading dates in "YYYY-MM-DD" format
     """
     merged_file_path = get_merged_file_path(market)
+    store = get_price_store(merged_file_path)
 
-    if not merged_file_path.exists():
+    if not store.exists():
         print(f"⚠️  Warning: {merged_file_path} not found")
         return []
 
-    trading_days = set()
-    try:
-        with open(merged_file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    data = json.loads(line.strip())
-                    time_series = data.get("Time Series (Daily)", {})
-                    # Add all dates from this stock's time series
-                    trading_days.update(time_series.keys())
-                except json.JSONDecodeError:
-                    continue
-        return sorted(list(trading_days))
-    except Exception as e:
-        print(f"⚠️  Error reading trading days: {e}")
-        return []
+    return list(store.timestamps("Time Series (Daily)"))
 
 
 def get_stock_name_mapping(market: str = "us") -> Dict[str, str]:
@@ -289,28 +264,7 @@ def get_stock_name_mapping(market: str = "us") -> Dict[str, str]:
     Returns:
         Dictionary mapping symbols to names, e.g. {"600519.SH": "贵州茅台"}
     """
-    merged_file_path = get_merged_file_path(market)
-
-    if not merged_file_path.exists():
-        return {}
-
-    name_map = {}
-    try:
-        with open(merged_file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    data = json.loads(line.strip())
-                    meta = data.get("Meta Data", {})
-                    symbol = meta.get("2. Symbol")
-                    name = meta.get("2.1. Name", "")
-                    if symbol and name:
-                        name_map[symbol] = name
-                except json.JSONDecodeError:
-                    continue
-        return name_map
-    except Exception as e:
-        print(f"⚠️  Error reading stock names: {e}")
-        return {}
+    return get_price_store(get_merged_file_path(market)).stock_names()
 
 
 def format_price_dict_with_names(
@@ -376,7 +330,8 @@ def get_yesterday_date(today_date: str, merged_path: Optional[str] = None, marke
     else:
         merged_file = Path(merged_path)
     
-    if not merged_file.exists():
+    store = get_price_store(merged_file)
+    if not store.exists():
         # 如果文件不存在，根据输入类型回退
         print(f"merged.jsonl file does not exist at {merged_file}")
         if date_only:
@@ -388,46 +343,8 @@ def get_yesterday_date(today_date: str, merged_path: Optional[str] = None, marke
             yesterday_dt = input_dt - timedelta(hours=1)
             return yesterday_dt.strftime("%Y-%m-%d %H:%M:%S")
     
-    # 从 merged.jsonl 读取所有可用的交易时间
-    all_timestamps = set()
-    
-    with merged_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-                # 查找所有以 "Time Series" 开头的键
-                for key, value in doc.items():
-                    if key.startswith("Time Series"):
-                        if isinstance(value, dict):
-                            all_timestamps.update(value.keys())
-                        break
-            except Exception:
-                continue
-    
-    if not all_timestamps:
-        # 如果没有找到任何时间戳，根据输入类型回退
-        if date_only:
-            yesterday_dt = input_dt - timedelta(days=1)
-            while yesterday_dt.weekday() >= 5:
-                yesterday_dt -= timedelta(days=1)
-            return yesterday_dt.strftime("%Y-%m-%d")
-        else:
-            yesterday_dt = input_dt - timedelta(hours=1)
-            return yesterday_dt.strftime("%Y-%m-%d %H:%M:%S")
-    
-    # 将所有时间戳转换为 datetime 对象，并找到小于 today_date 的最大时间戳
-    previous_timestamp = None
-    
-    for ts_str in all_timestamps:
-        try:
-            ts_dt = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-            if ts_dt < input_dt:
-                if previous_timestamp is None or ts_dt > previous_timestamp:
-                    previous_timestamp = ts_dt
-        except Exception:
-            continue
+    # 找到小于 today_date 的最大时间戳 (只考虑 YYYY-MM-DD HH:MM:SS 格式的时间戳)
+    previous_timestamp = store.previous_hourly_timestamp(input_dt)
     
     # 如果没有找到更早的时间戳，根据输入类型回退
     if previous_timestamp is None:
@@ -470,38 +387,22 @@ def get_open_prices(
     else:
         merged_file = Path(merged_path)
 
-    if not merged_file.exists():
+    store = get_price_store(merged_file)
+    if not store.exists():
         return results
 
-    with merged_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
+    # File order, as when reading merged.jsonl line by line
+    for sym in store.symbols():
+        if sym not in wanted:
+            continue
+        bar = store.get_bar(sym, today_date)
+        if isinstance(bar, dict):
+            open_val = bar.get("1. buy price")
+
             try:
-                doc = json.loads(line)
+                results[f"{sym}_price"] = float(open_val) if open_val is not None else None
             except Exception:
-                continue
-            meta = doc.get("Meta Data", {}) if isinstance(doc, dict) else {}
-            sym = meta.get("2. Symbol")
-            if sym not in wanted:
-                continue
-            # 查找所有以 "Time Series" 开头的键
-            series = None
-            for key, value in doc.items():
-                if key.startswith("Time Series"):
-                    series = value
-                    break
-            if not isinstance(series, dict):
-                continue
-            bar = series.get(today_date)
-            
-            if isinstance(bar, dict):
-                open_val = bar.get("1. buy price")
-                
-                try:
-                    results[f"{sym}_price"] = float(open_val) if open_val is not None else None
-                except Exception:
-                    results[f"{sym}_price"] = None
+                results[f"{sym}_price"] = None
 
     return results
 
@@ -529,83 +430,70 @@ def get_yesterday_open_and_close_price(
     else:
         merged_file = Path(merged_path)
 
-    if not merged_file.exists():
+    store = get_price_store(merged_file)
+    if not store.exists():
         return buy_results, sell_results
 
     yesterday_date = get_yesterday_date(today_date, merged_path=merged_path, market=market)
 
-    with merged_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
+    # File order, as when reading merged.jsonl line by line
+    for sym in store.symbols():
+        if sym not in wanted:
+            continue
+        if store.get_series(sym) is None:
+            continue
+
+        # 尝试获取昨日买入价和卖出价
+        bar = store.get_bar(sym, yesterday_date)
+        if isinstance(bar, dict):
+            buy_val = bar.get("1. buy price")  # 买入价字段
+            sell_val = bar.get("4. sell price")  # 卖出价字段
+
             try:
-                doc = json.loads(line)
+                buy_price = float(buy_val) if buy_val is not None else None
+                sell_price = float(sell_val) if sell_val is not None else None
+                buy_results[f"{sym}_price"] = buy_price
+                sell_results[f"{sym}_price"] = sell_price
             except Exception:
-                continue
-            meta = doc.get("Meta Data", {}) if isinstance(doc, dict) else {}
-            sym = meta.get("2. Symbol")
-            if sym not in wanted:
-                continue
-            # 查找所有以 "Time Series" 开头的键
-            series = None
-            for key, value in doc.items():
-                if key.startswith("Time Series"):
-                    series = value
-                    break
-            if not isinstance(series, dict):
-                continue
-
-            # 尝试获取昨日买入价和卖出价
-            bar = series.get(yesterday_date)
-            if isinstance(bar, dict):
-                buy_val = bar.get("1. buy price")  # 买入价字段
-                sell_val = bar.get("4. sell price")  # 卖出价字段
-
-                try:
-                    buy_price = float(buy_val) if buy_val is not None else None
-                    sell_price = float(sell_val) if sell_val is not None else None
-                    buy_results[f"{sym}_price"] = buy_price
-                    sell_results[f"{sym}_price"] = sell_price
-                except Exception:
-                    buy_results[f"{sym}_price"] = None
-                    sell_results[f"{sym}_price"] = None
-            else:
-                # 如果昨日没有数据，尝试向前查找最近的交易日
-                # raise ValueError(f"No data found for {sym} on {yesterday_date}")
-                # print(f"No data found for {sym} on {yesterday_date}")
-                buy_results[f'{sym}_price'] = None
-                sell_results[f'{sym}_price'] = None
-                # today_dt = datetime.strptime(today_date, "%Y-%m-%d")
-                # yesterday_dt = today_dt - timedelta(days=1)
-                # current_date = yesterday_dt
-                # found_data = False
+                buy_results[f"{sym}_price"] = None
+                sell_results[f"{sym}_price"] = None
+        else:
+            # 如果昨日没有数据，尝试向前查找最近的交易日
+            # raise ValueError(f"No data found for {sym} on {yesterday_date}")
+            # print(f"No data found for {sym} on {yesterday_date}")
+            buy_results[f'{sym}_price'] = None
+            sell_results[f'{sym}_price'] = None
+            # today_dt = datetime.strptime(today_date, "%Y-%m-%d")
+            # yesterday_dt = today_dt - timedelta(days=1)
+            # current_date = yesterday_dt
+            # found_data = False
+            
+            # # 最多向前查找5个交易日
+            # for _ in range(5):
+            #     current_date -= timedelta(days=1)
+            #     # 跳过周末
+            #     while current_date.weekday() >= 5:
+            #         current_date -= timedelta(days=1)
                 
-                # # 最多向前查找5个交易日
-                # for _ in range(5):
-                #     current_date -= timedelta(days=1)
-                #     # 跳过周末
-                #     while current_date.weekday() >= 5:
-                #         current_date -= timedelta(days=1)
+            #     check_date = current_date.strftime("%Y-%m-%d")
+            #     bar = series.get(check_date)
+            #     if isinstance(bar, dict):
+            #         buy_val = bar.get("1. buy price")
+            #         sell_val = bar.get("4. sell price")
                     
-                #     check_date = current_date.strftime("%Y-%m-%d")
-                #     bar = series.get(check_date)
-                #     if isinstance(bar, dict):
-                #         buy_val = bar.get("1. buy price")
-                #         sell_val = bar.get("4. sell price")
-                        
-                #         try:
-                #             buy_price = float(buy_val) if buy_val is not None else None
-                #             sell_price = float(sell_val) if sell_val is not None else None
-                #             buy_results[f'{sym}_price'] = buy_price
-                #             sell_results[f'{sym}_price'] = sell_price
-                #             found_data = True
-                #             break
-                #         except Exception:
-                #             continue
-                
-                # if not found_data:
-                #     buy_results[f'{sym}_price'] = None
-                #     sell_results[f'{sym}_price'] = None
+            #         try:
+            #             buy_price = float(buy_val) if buy_val is not None else None
+            #             sell_price = float(sell_val) if sell_val is not None else None
+            #             buy_results[f'{sym}_price'] = buy_price
+            #             sell_results[f'{sym}_price'] = sell_price
+            #             found_data = True
+            #             break
+            #         except Exception:
+            #             continue
+            
+            # if not found_data:
+            #     buy_results[f'{sym}_price'] = None
+            #     sell_results[f'{sym}_price'] = None
 
     return buy_results, sell_results
 
@@ -655,6 +543,23 @@ def get_yesterday_profit(
 
     return profit_dict
 
+def _get_max_id_record(records: List[Dict]) -> Optional[Dict]:
+    """
+    获取一组持仓记录中 id 最大的一条（id 相同时取文件中靠前的一条）。
+
+    Args:
+        records: 同一日期的持仓记录列表
+
+    Returns:
+        id 最大的记录；列表为空时返回 None
+    """
+    latest_record = None
+    for record in records:
+        if latest_record is None or record.get("id", -1) > latest_record.get("id", -1):
+            latest_record = record
+    return latest_record
+
+
 def get_today_init_position(today_date: str, signature: str) -> Dict[str, float]:
     """
     获取今日开盘时的初始持仓（即文件中上一个交易日代表的持仓）。从../data/agent_data/{signature}/position/position.jsonl中读取。
@@ -683,33 +588,16 @@ def get_today_init_position(today_date: str, signature: str) -> Dict[str, float]
         print(f"Position file {position_file} does not exist")
         return {}
     
-    # 获取市场类型，智能判断
-    market = get_market_type()
-    yesterday_date = get_yesterday_date(today_date, market=market)
-    
-    max_id = -1
-    latest_positions = {}
-    all_records = []
-  
-    with position_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-                record_date = doc.get("date")
-                if record_date and record_date < today_date:
-                    all_records.append(doc)
-            except Exception:
-                continue
-
-    if not all_records:
+    # 按日期索引，直接定位今天之前最近的一个日期
+    index = get_ledger_index(position_file)
+    latest_date = index.max_key(below=today_date)
+    if latest_date is None:
         return {}
 
-    # Sort by date (descending) then by id (descending) to get the most recent record
-    all_records.sort(key=lambda x: (x.get("date", ""), x.get("id", 0)), reverse=True)
-
-    return all_records[0].get("positions", {})
+    latest_record = _get_max_id_record(index.records(latest_date))
+    if latest_record is None:
+        return {}
+    return latest_record.get("positions", {})
 
 
 def get_latest_position(today_date: str, signature: str) -> Tuple[Dict[str, float], int]:
@@ -744,68 +632,32 @@ def get_latest_position(today_date: str, signature: str) -> Tuple[Dict[str, floa
     # 获取市场类型，智能判断
     market = get_market_type()
     
+    index = get_ledger_index(position_file)
+
     # Step 1: 先查找当天的记录
-    max_id_today = -1
-    latest_positions_today: Dict[str, float] = {}
-    
-    with position_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-                if doc.get("date") == today_date:
-                    current_id = doc.get("id", -1)
-                    if current_id > max_id_today:
-                        max_id_today = current_id
-                        latest_positions_today = doc.get("positions", {})
-            except Exception:
-                continue
-    
+    today_record = _get_max_id_record(index.records(today_date))
+    max_id_today = today_record.get("id", -1) if today_record else -1
+    latest_positions_today: Dict[str, float] = today_record.get("positions", {}) if today_record else {}
+
     # 如果当天有记录，直接返回
     if max_id_today >= 0 and latest_positions_today:
         return latest_positions_today, max_id_today
-    
+
     # Step 2: 当天没有记录，则回退到上一个交易日
     prev_date = get_yesterday_date(today_date, market=market)
-    
-    max_id_prev = -1
-    latest_positions_prev: Dict[str, float] = {}
 
-    with position_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-                if doc.get("date") == prev_date:
-                    current_id = doc.get("id", -1)
-                    if current_id > max_id_prev:
-                        max_id_prev = current_id
-                        latest_positions_prev = doc.get("positions", {})
-            except Exception:
-                continue
-    
-    # 如果前一天也没有记录，尝试找文件中最新的记录（按日期和id排序）
+    prev_record = _get_max_id_record(index.records(prev_date))
+    max_id_prev = prev_record.get("id", -1) if prev_record else -1
+    latest_positions_prev: Dict[str, float] = prev_record.get("positions", {}) if prev_record else {}
+
+    # 如果前一天也没有记录，尝试找文件中最新的记录（今天之前最近日期中 id 最大的一条）
     if max_id_prev < 0 or not latest_positions_prev:
-        all_records = []
-        with position_file.open("r", encoding="utf-8") as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    doc = json.loads(line)
-                    if doc.get("date") and doc.get("date") < today_date:
-                        all_records.append(doc)
-                except Exception:
-                    continue
-        
-        if all_records:
-            # 按日期和id排序，取最新的一条
-            all_records.sort(key=lambda x: (x.get("date", ""), x.get("id", 0)), reverse=True)
-            latest_positions_prev = all_records[0].get("positions", {})
-            max_id_prev = all_records[0].get("id", -1)
-    
+        latest_date = index.max_key(below=today_date)
+        latest_record = _get_max_id_record(index.records(latest_date)) if latest_date else None
+        if latest_record:
+            latest_positions_prev = latest_record.get("positions", {})
+            max_id_prev = latest_record.get("id", -1)
+
     return latest_positions_prev, max_id_prev
 
 def add_no_trade_record(today_date: str, signature: str):
@@ -818,14 +670,11 @@ def add_no_trade_record(today_date: str, signature: str):
     Returns:
         None
     """
-    save_item = {}
     current_position, current_action_id = get_latest_position(today_date, signature)
-    
-    save_item["date"] = today_date
-    save_item["id"] = current_action_id + 1
-    save_item["this_action"] = {"action": "no_trade", "symbol": "", "amount": 0}
 
-    save_item["positions"] = current_position
+    save_item = make_position_record(
+        today_date, current_action_id + 1, current_position, {"action": "no_trade", "symbol": "", "amount": 0}
+    )
 
     from tools.general_tools import get_config_value
 
@@ -839,7 +688,7 @@ def add_no_trade_record(today_date: str, signature: str):
     position_file = base_dir / "data" / log_path / signature / "position" / "position.jsonl"
 
     with position_file.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(save_item) + "\n")
+        f.write(dumps(save_item) + "\n")
     return
 
 
@@ -1,4 +1,3 @@
-import json
 import os
 import sys
 from datetime import datetime, timedelta
@@ -14,6 +13,9 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from tools.general_tools import get_config_value
+from tools.json_codec import decode_metrics_record, decode_price_doc, dumps
+from tools.jsonl_index import read_last_record
+from tools.ledger_tools import get_ledger_index, load_ledger_records
 from tools.price_tools import (all_nasdaq_100_symbols, get_latest_position,
                                get_open_prices, get_today_init_position,
                                get_yesterday_date,
@@ -76,24 +78,11 @@ def get_available_date_range(signature: str) -> Tuple[str, str]:
     if not position_file.exists():
         return "", ""
 
-    dates = []
-
-    with position_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-                date = doc.get("date")
-                if date:
-                    dates.append(date)
-            except Exception:
-                continue
-
+    # Date index resolves forked ledgers to the parent's history
+    dates = get_ledger_index(position_file).keys()
     if not dates:
         return "", ""
 
-    dates.sort()
     return dates[0], dates[-1]
 
 
@@ -140,17 +129,8 @@ def get_daily_portfolio_values(
         if end_date is None:
             end_date = latest_date
 
-    # Read position data
-    position_data = []
-    with position_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-                position_data.append(doc)
-            except Exception:
-                continue
+    # Read position data (forked ledgers include the parent's records up to the fork)
+    position_data = load_ledger_records(position_file)
 
     # Read price data
     price_data = {}
@@ -159,7 +139,7 @@ def get_daily_portfolio_values(
             if not line.strip():
                 continue
             try:
-                doc = json.loads(line)
+                doc = decode_price_doc(line)
                 meta = doc.get("Meta Data", {})
                 symbol = meta.get("2. Symbol")
                 if symbol:
@@ -616,18 +596,9 @@ def get_next_id(filepath: Path) -> int:
     if not filepath.exists():
         return 0
 
-    max_id = -1
-    with filepath.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                data = json.loads(line)
-                current_id = data.get("id", -1)
-                if current_id > max_id:
-                    max_id = current_id
-            except Exception:
-                continue
+    # IDs are assigned in append order, so the last record holds the max id
+    last_record = read_last_record(filepath, decode_metrics_record)
+    max_id = last_record.get("id", -1) if last_record else -1
 
     return max_id + 1
 
@@ -709,7 +680,7 @@ def save_metrics_to_jsonl(metrics: Dict[str, any], signature: str, output_dir: O
 
     # Incrementally save to JSONL file (append mode)
     with filepath.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(save_data, ensure_ascii=False) + "\n")
+        f.write(dumps(save_data) + "\n")
 
     return str(filepath)
 
@@ -743,21 +714,8 @@ def get_latest_metrics(signature: str, output_dir: Optional[str] = None) -> Opti
     if not filepath.exists():
         return None
 
-    latest_record = None
-    max_id = -1
-
-    with filepath.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                data = json.loads(line)
-                current_id = data.get("id", -1)
-                if current_id > max_id:
-                    max_id = current_id
-                    latest_record = data
-            except Exception:
-                continue
+    # Records are appended with increasing ids, so the latest one is at the end of the file
+    latest_record = read_last_record(filepath, decode_metrics_record)
 
     return latest_record
 
@@ -801,7 +759,7 @@ def get_metrics_history(
             if not line.strip():
                 continue
             try:
-                data = json.loads(line)
+                data = decode_metrics_record(line)
                 records.append(data)
             except Exception:
                 continue
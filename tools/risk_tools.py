@@ -0,0 +1,115 @@
+"""
+Portfolio risk figures from a covariance matrix
+
+Pure NumPy helpers used by the portfolio_risk tool: volatility and risk contributions of a
+weight vector, and long-only minimum-variance and risk-parity weight suggestions.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+def risk_contributions(covariance: np.ndarray, weights: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Volatility of a portfolio and how much each holding adds to it
+
+    Args:
+        covariance: Covariance matrix of the holdings' returns (annualized)
+        weights: Portfolio weights of the holdings (cash excluded)
+
+    Returns:
+        {"volatility": portfolio volatility, "marginal": d volatility / d weight per holding,
+         "contribution": weight * marginal, summing to the volatility}
+    """
+    variance = float(weights @ covariance @ weights)
+    volatility = np.sqrt(max(variance, 0.0))
+    if volatility == 0:
+        zeros = np.zeros_like(weights)
+        return {"volatility": 0.0, "marginal": zeros, "contribution": zeros}
+    marginal = covariance @ weights / volatility
+    return {"volatility": volatility, "marginal": marginal, "contribution": weights * marginal}
+
+
+def correlation_matrix(covariance: np.ndarray) -> np.ndarray:
+    """Correlation matrix from a covariance matrix (NaN where a variance is zero or missing)"""
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return covariance / np.outer(std, std)
+
+
+def top_correlated_pairs(symbols: List[str], covariance: np.ndarray, limit: int = 5) -> List[Tuple[str, str, float]]:
+    """
+    Most correlated pairs of holdings, by absolute correlation
+
+    Args:
+        symbols: Symbols aligned with the covariance matrix
+        covariance: Covariance matrix
+        limit: Number of pairs
+
+    Returns:
+        [(symbol, symbol, correlation)]
+    """
+    correlation = correlation_matrix(covariance)
+    first, second = np.triu_indices(len(symbols), k=1)
+    values = correlation[first, second]
+    valid = np.flatnonzero(np.isfinite(values))
+    top = valid[np.argsort(-np.abs(values[valid]), kind="stable")[:limit]]
+    return [(symbols[first[i]], symbols[second[i]], float(values[i])) for i in top]
+
+
+def _shrink(covariance: np.ndarray, shrinkage: float = 0.1) -> np.ndarray:
+    """Shrink towards the diagonal, so short windows with many holdings stay invertible"""
+    return (1 - shrinkage) * covariance + shrinkage * np.diag(np.diag(covariance))
+
+
+def min_variance_weights(covariance: np.ndarray) -> np.ndarray:
+    """
+    Long-only minimum-variance weights summing to 1
+
+    Solves the unconstrained minimum-variance portfolio and drops holdings that come out
+    negative until all weights are non-negative.
+
+    Args:
+        covariance: Covariance matrix without NaN
+
+    Returns:
+        Weights aligned with the covariance matrix
+    """
+    covariance = _shrink(covariance)
+    active = np.arange(len(covariance))
+    weights = np.zeros(len(covariance))
+    while len(active):
+        inverse_ones = np.linalg.pinv(covariance[np.ix_(active, active)]) @ np.ones(len(active))
+        solution = inverse_ones / inverse_ones.sum()
+        if (solution >= 0).all():
+            weights[active] = solution
+            break
+        active = active[solution > 0]
+    return weights
+
+
+def risk_parity_weights(covariance: np.ndarray, iterations: int = 500, tolerance: float = 1e-10) -> np.ndarray:
+    """
+    Long-only weights with equal risk contribution from every holding, summing to 1
+
+    Args:
+        covariance: Covariance matrix without NaN
+        iterations: Maximum fixed-point iterations
+        tolerance: Stop when weights change less than this
+
+    Returns:
+        Weights aligned with the covariance matrix
+    """
+    covariance = _shrink(covariance)
+    volatility = np.sqrt(np.clip(np.diag(covariance), 1e-12, None))
+    weights = (1 / volatility) / (1 / volatility).sum()
+    for _ in range(iterations):
+        contribution = weights * (covariance @ weights)
+        target = contribution.sum() / len(weights)
+        updated = weights * np.sqrt(target / np.clip(contribution, 1e-18, None))
+        updated /= updated.sum()
+        if np.abs(updated - weights).max() < tolerance:
+            return updated
+        weights = updated
+    return weights
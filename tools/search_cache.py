@@ -0,0 +1,196 @@
+"""
+Persistent cache of Jina search hits and scraped pages, shared by all runs and processes
+
+Search hits are keyed by (normalized query, TODAY_DATE), scraped pages by URL; both live in
+one SQLite file (SEARCH_CACHE_PATH, default data/search_cache.sqlite), page content is
+zlib-compressed. Entries older than SEARCH_CACHE_TTL_DAYS (default 30, 0 keeps them forever)
+are refetched, and the least recently used pages are evicted once the file's page content
+exceeds SEARCH_CACHE_MAX_MB (default 512).
+
+SEARCH_CACHE selects the mode:
+- on (default): read through the cache, fetch and store on a miss
+- replay: serve from the cache only, never touch the network; a miss is reported as such,
+  so a backtest rerun sees exactly the results of the recorded run
+- off: always fetch, store nothing
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add project root directory to Python path to allow running this file from subdirectories
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tools.json_codec import dumps, loads
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    query TEXT NOT NULL,
+    cutoff TEXT NOT NULL,
+    urls TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (query, cutoff)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed);
+"""
+
+
+def search_cache_mode() -> str:
+    """Cache mode from SEARCH_CACHE: "on", "replay" or "off" """
+    mode = os.getenv("SEARCH_CACHE", "on").lower()
+    if mode in ("off", "0", "false"):
+        return "off"
+    return "replay" if mode == "replay" else "on"
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query"""
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+class SearchCache:
+    """SQLite store of search hits and scraped pages"""
+
+    def __init__(self, path: Path, ttl_days: float = 30.0, max_bytes: int = 512 * 1024 * 1024):
+        self.path = Path(path)
+        self.ttl = ttl_days * 86400
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per process, used by the tool threads under a lock; WAL lets several
+        # tool server processes read and write the same file
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _fresh(self, created: float, replay: bool) -> bool:
+        return replay or not self.ttl or time.time() - created < self.ttl
+
+    def get_search(self, query: str, cutoff: Optional[str], replay: bool = False) -> Optional[List[str]]:
+        """
+        Get the cached search hits of a query
+
+        Args:
+            query: Search query
+            cutoff: Session cutoff (TODAY_DATE) the hits were filtered for
+            replay: Ignore the TTL
+
+        Returns:
+            URLs, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT urls, created FROM searches WHERE query = ? AND cutoff = ?",
+                (normalize_query(query), cutoff or ""),
+            ).fetchone()
+        if row is None or not self._fresh(row[1], replay):
+            return None
+        return loads(row[0])
+
+    def put_search(self, query: str, cutoff: Optional[str], urls: List[str]) -> None:
+        """Store the search hits of a query"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (query, cutoff, urls, created) VALUES (?, ?, ?, ?)",
+                (normalize_query(query), cutoff or "", dumps(urls), time.time()),
+            )
+
+    def get_page(self, url: str, replay: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached scraped page
+
+        Args:
+            url: Page URL
+            replay: Ignore the TTL
+
+        Returns:
+            Scraped page ({"url", "title", "description", "content", "publish_time"}), or None on a miss
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT payload, created FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None or not self._fresh(row[1], replay):
+                return None
+            self._conn.execute("UPDATE pages SET accessed = ? WHERE url = ?", (time.time(), url))
+        return loads(zlib.decompress(row[0]))
+
+    def put_page(self, url: str, page: Dict[str, Any]) -> None:
+        """Store a scraped page, evicting least recently used pages beyond max_bytes"""
+        payload = zlib.compress(dumps(page).encode("utf-8"))
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, payload, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (url, payload, len(payload), now, now),
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(total)
+
+    def _evict(self, total: int) -> None:
+        """Delete least recently used pages until the content is back under 90% of max_bytes"""
+        target = self.max_bytes * 0.9
+        evicted = []
+        for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY accessed"):
+            if total <= target:
+                break
+            evicted.append((url,))
+            total -= size
+        self._conn.executemany("DELETE FROM pages WHERE url = ?", evicted)
+        print(f"🧹 Search cache evicted {len(evicted)} pages")
+
+    def purge_expired(self) -> int:
+        """
+        Delete entries older than the TTL
+
+        Returns:
+            Number of entries deleted
+        """
+        if not self.ttl:
+            return 0
+        expired_before = time.time() - self.ttl
+        with self._lock, self._conn:
+            deleted = self._conn.execute("DELETE FROM searches WHERE created < ?", (expired_before,)).rowcount
+            deleted += self._conn.execute("DELETE FROM pages WHERE created < ?", (expired_before,)).rowcount
+        return deleted
+
+
+_caches: Dict[str, SearchCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """
+    Get the process-wide search cache, opened on first use
+
+    Returns:
+        SearchCache, or None when SEARCH_CACHE is off
+    """
+    if search_cache_mode() == "off":
+        return None
+    path = os.getenv("SEARCH_CACHE_PATH", str(Path(project_root) / "data" / "search_cache.sqlite"))
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = SearchCache(
+                path,
+                ttl_days=float(os.getenv("SEARCH_CACHE_TTL_DAYS", "30")),
+                max_bytes=int(float(os.getenv("SEARCH_CACHE_MAX_MB", "512")) * 1024 * 1024),
+            )
+            if search_cache_mode() != "replay":
+                cache.purge_expired()
+        return cache
@@ -0,0 +1,219 @@
+"""
+Memoization of read-only MCP tool results, shared across sessions and retries
+
+Results are keyed by (tool, canonical arguments, session cutoff TODAY_DATE), so every model
+trading the same date gets the same answer without repeating the lookup, and a retried
+session replays its lookups from cache. Tools whose answer also depends on other session
+config (e.g. MARKET when an argument defaults to it) name those keys in session_keys. Two tiers:
+
+- memory: per-process LRU (TOOL_CACHE_SIZE entries, default 4096); entries are deep copies,
+  so a caller mutating a returned dict or list cannot change what later calls get
+- disk: one JSON file per entry under TOOL_CACHE_DIR (default data/tool_cache), shared by all
+  processes and runs; only for tools decorated with disk=True (the web search tools)
+
+Error results are never cached, nor are calls without a session cutoff (their answer would
+change over time). Set TOOL_CACHE=off to disable both tiers. Hits and misses per tier are
+counted in tools.tool_metrics.
+
+Usage:
+    @mcp.tool()
+    @instrument
+    @request_session
+    @memoize(disk=True)
+    def get_information(query: str) -> str: ...
+"""
+
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+# Add project root directory to Python path to allow running this file from subdirectories
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tools.general_tools import get_config_value
+from tools.json_codec import DecodeError, dumps, loads
+from tools.tool_metrics import record_cache
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU map"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """Get a value and mark it recently used, or _MISSING"""
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entries beyond max_entries"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_memory = LRUCache(int(os.getenv("TOOL_CACHE_SIZE", "4096")))
+
+
+def cache_enabled() -> bool:
+    """Whether memoization is on (TOOL_CACHE is not off/0/false)"""
+    return os.getenv("TOOL_CACHE", "on").lower() not in ("off", "0", "false")
+
+
+def _cache_dir() -> Path:
+    return Path(os.getenv("TOOL_CACHE_DIR", Path(project_root) / "data" / "tool_cache"))
+
+
+def is_cacheable(result: Any) -> bool:
+    """Default check for results worth caching: not an {"error": ...} dict or a "❌"/"⚠️" failure or warning message"""
+    if isinstance(result, dict) and "error" in result:
+        return False
+    # Warnings such as "no results, may be a network issue" often reflect a degraded provider
+    if isinstance(result, str) and result.startswith(("❌", "⚠️")):
+        return False
+    return result is not None
+
+
+def make_cache_key(tool: str, arguments: dict, cutoff: str, version: Any = None, session: Optional[dict] = None) -> str:
+    """
+    Build the cache key of a tool call
+
+    Args:
+        tool: Tool name
+        arguments: Bound arguments, defaults applied
+        cutoff: Session cutoff (TODAY_DATE)
+        version: Extra value that invalidates entries when it changes (e.g. data file version)
+        session: Other session config values the result depends on, e.g. {"MARKET": "cn"}
+
+    Returns:
+        Hex digest identifying the call
+    """
+    key = {"tool": tool, "args": arguments, "cutoff": cutoff, "version": version}
+    if session:
+        key["session"] = session
+    canonical = json.dumps(
+        key,
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _read_disk(tool: str, key: str) -> Any:
+    path = _cache_dir() / tool / key[:2] / f"{key}.json"
+    try:
+        return loads(path.read_bytes())["result"]
+    except (FileNotFoundError, KeyError, TypeError) + DecodeError:
+        return _MISSING
+
+
+def _write_disk(tool: str, key: str, arguments: dict, cutoff: str, result: Any) -> None:
+    path = _cache_dir() / tool / key[:2] / f"{key}.json"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file and rename, so concurrent readers never see a partial entry
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(dumps({"tool": tool, "args": arguments, "cutoff": cutoff, "result": result}), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except (OSError, TypeError) as e:
+        print(f"⚠️ Could not write tool cache entry for {tool}: {e}")
+
+
+def memoize(
+    func: Optional[Callable] = None,
+    *,
+    disk: bool = False,
+    version: Optional[Callable[[], Any]] = None,
+    session_keys: Tuple[str, ...] = (),
+    cacheable: Callable[[Any], bool] = is_cacheable,
+) -> Callable:
+    """
+    Decorator for read-only MCP tools: reuse results of identical calls with the same cutoff
+
+    Apply below @request_session, so the key sees the calling session's TODAY_DATE.
+
+    Args:
+        func: Tool function (when used without arguments)
+        disk: Also keep results on disk, shared by all processes
+        version: Returns a value to include in the key, e.g. the price file version
+        session_keys: Session config keys the result depends on besides TODAY_DATE, e.g. ("MARKET",)
+        cacheable: Decides whether a result may be stored
+
+    Returns:
+        Wrapped function
+    """
+
+    def decorator(func: Callable) -> Callable:
+        tool = func.__name__
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cutoff = get_config_value("TODAY_DATE")
+            if not cutoff or not cache_enabled():
+                return func(*args, **kwargs)
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                return func(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            session = {name: get_config_value(name) for name in session_keys}
+            key = make_cache_key(tool, arguments, cutoff, version() if version else None, session)
+
+            result = _memory.get(key)
+            if result is not _MISSING:
+                record_cache(tool, "memory")
+                return copy.deepcopy(result)
+            if disk:
+                result = _read_disk(tool, key)
+                if result is not _MISSING:
+                    record_cache(tool, "disk")
+                    _memory.put(key, copy.deepcopy(result))
+                    return result
+
+            record_cache(tool, "miss")
+            result = func(*args, **kwargs)
+            if cacheable(result):
+                _memory.put(key, copy.deepcopy(result))
+                if disk:
+                    _write_disk(tool, key, arguments, cutoff, result)
+            return result
+
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+def clear_memory_cache() -> None:
+    """Drop all in-memory entries (the disk tier is kept)"""
+    _memory.clear()
+
@@ -0,0 +1,305 @@
+"""
+Per-tool call metrics for the MCP tool servers
+
+Each tool wrapped with @instrument records call count, error count (exceptions and
+{"error": ...} results), a latency histogram and a response size histogram. Servers
+expose the numbers in Prometheus text format at GET /metrics (see enable_metrics) and
+append a snapshot per tool to a JSONL file when the process exits. The state of the
+circuit breakers in tools.circuit_breaker is exported alongside.
+
+Usage:
+    @mcp.tool()
+    @instrument
+    @request_session
+    def buy(symbol: str, amount: int) -> Dict[str, Any]: ...
+
+    enable_metrics(mcp, "trade")
+"""
+
+import atexit
+import functools
+import os
+import signal
+import sys
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add project root directory to Python path to allow running this file from subdirectories
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tools.circuit_breaker import get_breaker_snapshot
+from tools.json_codec import dumps
+
+# Histogram upper bounds (Prometheus "le" labels), +Inf is implicit
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class _Histogram:
+    """Cumulative-on-render histogram with fixed buckets"""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def cumulative(self) -> List[int]:
+        result, running = [], 0
+        for count in self.counts:
+            running += count
+            result.append(running)
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None for the +Inf bucket or no data)"""
+        cumulative = self.cumulative()
+        if not cumulative[-1]:
+            return None
+        rank = q * cumulative[-1]
+        for bound, count in zip(self.buckets, cumulative):
+            if count >= rank:
+                return bound
+        return None
+
+
+class _ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.response_bytes = _Histogram(SIZE_BUCKETS)
+        # Memoization outcomes (see tools/tool_cache.py)
+        self.cache = {"memory": 0, "disk": 0, "miss": 0}
+
+
+_stats: Dict[str, _ToolStats] = {}
+_stats_lock = threading.Lock()
+_server_name = "tools"
+_dump_registered = False
+
+
+def _response_size(result: Any) -> int:
+    """Size in bytes of a tool result as sent to the client (JSON, or text for str results)"""
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    try:
+        return len(dumps(result).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(str(result).encode("utf-8"))
+
+
+def record_call(tool: str, seconds: float, result: Any = None, error: bool = False) -> None:
+    """
+    Record one tool call
+
+    Args:
+        tool: Tool name
+        seconds: Wall time of the call
+        result: Tool result, used for the response size (ignored when error is True)
+        error: The call raised an exception
+    """
+    if not error and isinstance(result, dict) and "error" in result:
+        error = True
+    size = None if result is None else _response_size(result)
+    with _stats_lock:
+        stats = _stats.get(tool)
+        if stats is None:
+            stats = _stats[tool] = _ToolStats()
+        stats.calls += 1
+        stats.errors += int(error)
+        stats.latency.observe(seconds)
+        if size is not None:
+            stats.response_bytes.observe(size)
+
+
+def record_cache(tool: str, outcome: str) -> None:
+    """
+    Record one memoization lookup
+
+    Args:
+        tool: Tool name
+        outcome: "memory" or "disk" for a hit in that tier, "miss" otherwise
+    """
+    with _stats_lock:
+        stats = _stats.get(tool)
+        if stats is None:
+            stats = _stats[tool] = _ToolStats()
+        stats.cache[outcome] += 1
+
+
+def instrument(func: Callable) -> Callable:
+    """Decorator for MCP tools: record latency, errors and response size under the function's name."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            record_call(func.__name__, time.perf_counter() - start, error=True)
+            raise
+        record_call(func.__name__, time.perf_counter() - start, result)
+        return result
+
+    return wrapper
+
+
+def get_metrics_snapshot() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the current metrics of every tool
+
+    Returns:
+        {tool: {"calls", "errors", "latency_sum", "latency_p50", "latency_p95", "response_bytes_sum",
+                "latency_buckets", "size_buckets", "cache"}}, quantiles as bucket upper bounds in seconds,
+        "cache" with memoization hits per tier, misses and hit rate
+    """
+    snapshot = {}
+    with _stats_lock:
+        for tool, stats in sorted(_stats.items()):
+            snapshot[tool] = {
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "latency_sum": round(stats.latency.total, 6),
+                "latency_p50": stats.latency.quantile(0.5),
+                "latency_p95": stats.latency.quantile(0.95),
+                "response_bytes_sum": int(stats.response_bytes.total),
+                "latency_buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], stats.latency.cumulative())),
+                "size_buckets": dict(zip([*map(str, SIZE_BUCKETS), "+Inf"], stats.response_bytes.cumulative())),
+            }
+            lookups = sum(stats.cache.values())
+            if lookups:
+                snapshot[tool]["cache"] = {
+                    **stats.cache,
+                    "hit_rate": round((lookups - stats.cache["miss"]) / lookups, 4),
+                }
+    return snapshot
+
+
+def render_prometheus() -> str:
+    """
+    Render all tool metrics in Prometheus text exposition format
+
+    Returns:
+        Metrics text
+    """
+    lines = [
+        "# HELP mcp_tool_calls_total Tool calls",
+        "# TYPE mcp_tool_calls_total counter",
+    ]
+    with _stats_lock:
+        items = sorted(_stats.items())
+        for tool, stats in items:
+            lines.append(f'mcp_tool_calls_total{{server="{_server_name}",tool="{tool}"}} {stats.calls}')
+        lines += [
+            "# HELP mcp_tool_errors_total Tool calls that raised or returned an error",
+            "# TYPE mcp_tool_errors_total counter",
+        ]
+        for tool, stats in items:
+            lines.append(f'mcp_tool_errors_total{{server="{_server_name}",tool="{tool}"}} {stats.errors}')
+        lines += [
+            "# HELP mcp_tool_cache_lookups_total Memoized tool lookups by result (memory/disk hit or miss)",
+            "# TYPE mcp_tool_cache_lookups_total counter",
+        ]
+        for tool, stats in items:
+            for outcome, count in stats.cache.items():
+                if sum(stats.cache.values()):
+                    lines.append(
+                        f'mcp_tool_cache_lookups_total{{server="{_server_name}",tool="{tool}",result="{outcome}"}} {count}'
+                    )
+        for metric, attr, help_text in (
+            ("mcp_tool_latency_seconds", "latency", "Tool call latency"),
+            ("mcp_tool_response_bytes", "response_bytes", "Tool response size"),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for tool, stats in items:
+                histogram = getattr(stats, attr)
+                labels = f'server="{_server_name}",tool="{tool}"'
+                cumulative = histogram.cumulative()
+                for bound, count in zip([*map(str, histogram.buckets), "+Inf"], cumulative):
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{metric}_sum{{{labels}}} {histogram.total}")
+                lines.append(f"{metric}_count{{{labels}}} {cumulative[-1]}")
+
+    breakers = get_breaker_snapshot()
+    if breakers:
+        lines += [
+            "# HELP mcp_circuit_state Circuit breaker state of an external dependency (0 closed, 1 half-open, 2 open)",
+            "# TYPE mcp_circuit_state gauge",
+        ]
+        states = {"closed": 0, "half_open": 1, "open": 2}
+        for name, breaker in breakers.items():
+            lines.append(f'mcp_circuit_state{{server="{_server_name}",dependency="{name}"}} {states[breaker["state"]]}')
+        for metric, key, help_text in (
+            ("mcp_circuit_trips_total", "trips", "Times the circuit breaker opened"),
+            ("mcp_circuit_rejections_total", "rejections", "Calls rejected by an open circuit breaker"),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for name, breaker in breakers.items():
+                lines.append(f'{metric}{{server="{_server_name}",dependency="{name}"}} {breaker[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def dump_metrics(path: Optional[Path] = None) -> Optional[Path]:
+    """
+    Append one JSONL record per tool and per circuit breaker with the current metrics
+
+    Args:
+        path: Output file, defaults to logs/metrics/{server}.jsonl under the project root
+
+    Returns:
+        Path written, or None if no tool was called
+    """
+    snapshot = get_metrics_snapshot()
+    if not snapshot:
+        return None
+    breakers = get_breaker_snapshot()
+    if path is None:
+        metrics_dir = Path(os.getenv("TOOL_METRICS_DIR", Path(project_root) / "logs" / "metrics"))
+        path = metrics_dir / f"{_server_name}.jsonl"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    with path.open("a", encoding="utf-8") as f:
+        for tool, metrics in snapshot.items():
+            record = {"timestamp": timestamp, "server": _server_name, "pid": os.getpid(), "tool": tool, **metrics}
+            f.write(dumps(record) + "\n")
+        for name, breaker in breakers.items():
+            record = {"timestamp": timestamp, "server": _server_name, "pid": os.getpid(), "dependency": name, **breaker}
+            f.write(dumps(record) + "\n")
+    return path
+
+
+def enable_metrics(mcp: Any, server_name: str) -> None:
+    """
+    Serve GET /metrics on a FastMCP server and dump metrics to JSONL at process exit
+
+    Args:
+        mcp: FastMCP server
+        server_name: Name used in metric labels and the dump file name
+    """
+    global _server_name, _dump_registered
+    _server_name = server_name
+
+    from starlette.requests import Request
+    from starlette.responses import PlainTextResponse
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_endpoint(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    if not _dump_registered:
+        atexit.register(dump_metrics)
+        # uvicorn re-raises SIGTERM after its graceful shutdown; exit normally so atexit runs
+        if threading.current_thread() is threading.main_thread() and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+        _dump_registered = True